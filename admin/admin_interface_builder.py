@@ -3,6 +3,7 @@ from tkinter import ttk, filedialog
 import time
 from video_client import VideoClient
 from audio_client import AudioClient
+from broadcast_intercom import BroadcastIntercom
 from audio_hints import AudioHints
 from setup_stats_panel import setup_stats_panel, update_volume_meter
 from hint_functions import save_manual_hint, clear_manual_hint, send_hint
@@ -16,6 +17,7 @@ import json
 import io
 import base64
 import datetime
+from startup_profiler import profiler
 
 
 class AdminInterfaceBuilder:
@@ -38,12 +40,14 @@ class AdminInterfaceBuilder:
         self.audio_active = {}
         self.speaking = {}
         self.preferred_audio_device_index = {}
+        self.broadcast = None # BroadcastIntercom while speaking to all listening kiosks
         self.current_hint_image = None
         self.hint_manager = ManagerSettings(app, self)  # Initialize hint manager
         self.auto_reset_timer_ids = {}
         self.no_kiosks_label = None  # Initialize reference to no kiosks label
         self.audio_manager = AdminAudioManager()
-        self.setup_ui()
+        with profiler.measure("AdminInterfaceBuilder.setup_ui"):
+            self.setup_ui()
         
         # Start timer update loop using app's root
         self.app.root.after(1000, self.update_timer_display)
@@ -821,6 +825,14 @@ class AdminInterfaceBuilder:
             # Log error but don't stop the process, the next status update will correct the state
             print(f"[interface builder] Error during optimistic video_playing update: {e}")
 
+    def preload_video(self, computer_name):
+        """Tells the kiosk to warm-start the video currently selected in the dropdown."""
+        try:
+            video_type = self.stats_elements['video_type'].get().lower().split()[0]
+            self.app.network_handler.send_preload_video_command(computer_name, video_type)
+        except Exception as e:
+            print(f"[interface builder] Error requesting video preload: {e}")
+
     def handle_intro_video_complete(self, computer_name):
         """Handle the 'intro_video_completed' message"""
         print(f"[AdminInterfaceBuilder] Intro video completed by {computer_name}")
@@ -1623,6 +1635,10 @@ class AdminInterfaceBuilder:
             self.selected_kiosk = computer_name
             # ***** MODIFICATION END *****
 
+            # The warm microphone follows the selection
+            for name, client in list(self.audio_clients.items()):
+                client.set_keep_warm(name == computer_name)
+
 
             # Setup stats panel (this clears and rebuilds the stats frame)
             if(self.select_kiosk_debug):
@@ -1791,6 +1807,62 @@ class AdminInterfaceBuilder:
             except Exception as e:
                 print(f"[interface builder] Error updating hints_received_label: {e}")
 
+        # Video A/V sync stats of the current or last video
+        video_stats_label = self.stats_elements.get('video_stats_label')
+        if video_stats_label and hasattr(video_stats_label, 'winfo_exists') and video_stats_label.winfo_exists():
+            video_stats = stats.get('video_stats')
+            if video_stats:
+                video_stats_text = (f"{video_stats.get('dropped_frames', 0)} dropped, {video_stats.get('late_frames', 0)} late\n"
+                                    f"max drift {video_stats.get('max_drift_ms', 0):.0f} ms")
+            else:
+                video_stats_text = "N/A"
+            try:
+                video_stats_label.config(text=f"Video Sync:\n{video_stats_text}")
+            except Exception as e:
+                print(f"[interface builder] Error updating video_stats_label: {e}")
+
+        # Kiosk audio engine: mixing time as a share of each output buffer
+        audio_engine_label = self.stats_elements.get('audio_engine_label')
+        if audio_engine_label and hasattr(audio_engine_label, 'winfo_exists') and audio_engine_label.winfo_exists():
+            engine_stats = stats.get('audio_engine_stats')
+            if engine_stats:
+                engine_text = (f"load {engine_stats.get('load_avg', 0) * 100:.0f}% avg, {engine_stats.get('load_max', 0) * 100:.0f}% max\n"
+                               f"{engine_stats.get('underflows', 0)} underflows, {engine_stats.get('buffer_ms', 0)} ms buffer")
+            else:
+                engine_text = "N/A"
+            try:
+                audio_engine_label.config(text=f"Audio Engine:\n{engine_text}")
+            except Exception as e:
+                print(f"[interface builder] Error updating audio_engine_label: {e}")
+
+        # Voice link jitter buffers: 'in' is kiosk -> admin (our AudioClient), 'out' is admin -> kiosk
+        voice_stats_label = self.stats_elements.get('voice_stats_label')
+        if voice_stats_label and hasattr(voice_stats_label, 'winfo_exists') and voice_stats_label.winfo_exists():
+            audio_client = self.audio_clients.get(computer_name)
+            voice_lines = []
+            for direction, voice_stats in (('in', audio_client.get_jitter_stats() if audio_client else None),
+                                           ('out', stats.get('voice_stats'))):
+                if voice_stats:
+                    voice_lines.append(f"{direction}: {voice_stats.get('underruns', 0)} underruns, "
+                                       f"{voice_stats.get('overruns', 0)} overruns, {voice_stats.get('latency_ms', 0)} ms")
+            talk_stats = audio_client.get_talk_stats() if audio_client else None
+            if talk_stats and talk_stats['last_ms'] is not None:
+                voice_lines.append(f"talk: {talk_stats['last_ms']} ms ({'warm' if talk_stats['warm'] else 'cold'}), "
+                                   f"avg {talk_stats['avg_ms']} ms")
+            elif talk_stats and talk_stats['mic_warm']:
+                voice_lines.append("talk: mic warm")
+            if self.broadcast:
+                broadcast_stats = self.broadcast.get_stats().get(computer_name)
+                if broadcast_stats:
+                    voice_lines.append(f"bcast: {broadcast_stats['latency_ms']:.0f} ms (max {broadcast_stats['max_latency_ms']:.0f}), "
+                                       f"{broadcast_stats['dropped']} dropped")
+            try:
+                codec_name = getattr(audio_client, 'codec_name', None) or (stats.get('voice_stats') or {}).get('codec')
+                title = f"Voice Link ({codec_name}):" if codec_name else "Voice Link:"
+                voice_stats_label.config(text=title + "\n" + ("\n".join(voice_lines) if voice_lines else "N/A"))
+            except Exception as e:
+                print(f"[interface builder] Error updating voice_stats_label: {e}")
+
         # Music button state update
         music_button = self.stats_elements.get('music_button')
         if music_button and hasattr(music_button, 'winfo_exists') and music_button.winfo_exists():
@@ -2120,6 +2192,9 @@ class AdminInterfaceBuilder:
 
     def cleanup(self):
         """Clean up resources before closing"""
+        if self.broadcast:
+            self.broadcast.stop()
+            self.broadcast = None
         print("[interface builder] Cleaning up audio clients...")
         for computer_name, client in self.audio_clients.items():
             print(f"[interface builder] Disconnecting audio client for {computer_name}")
@@ -2166,6 +2241,9 @@ class AdminInterfaceBuilder:
                     print(f"[interface builder] Audio is being stopped, also stopping speaking for {computer_name}")
                     self.toggle_speaking(computer_name) 
 
+                if self.broadcast:
+                    self.broadcast.remove_target(computer_name)
+
                 if audio_client: 
                     audio_client.disconnect()
 
@@ -2228,7 +2306,11 @@ class AdminInterfaceBuilder:
             def connect():
                 try:
                     print(f"[interface builder] Attempting audio connection to {computer_name}")
-                    if audio_client.connect(computer_name): 
+                    # Only kiosks that advertise codecs understand the codec offer
+                    voice_codecs = self.app.kiosk_tracker.kiosk_stats.get(computer_name, {}).get('voice_codecs')
+                    # Only the selected kiosk keeps the mic warm between talk presses
+                    audio_client.keep_warm = computer_name == self.selected_kiosk
+                    if audio_client.connect(computer_name, codecs=voice_codecs): 
                         print(f"[interface builder] Audio connected for {computer_name}")
                         self.audio_active[computer_name] = True
                         
@@ -2817,6 +2899,49 @@ class AdminInterfaceBuilder:
             # No additional error message needed here, as _on_browser_thumbnail_select
             # already provided feedback if it failed to load the image.
 
+    def toggle_broadcast(self):
+        """
+        Starts or stops speaking to every kiosk that is currently being listened to.
+        The microphone is captured once and fanned out over the existing audio connections.
+        """
+        broadcast_btn = self.stats_elements.get('broadcast_btn')
+        if self.broadcast:
+            self.broadcast.stop()
+            self.broadcast = None
+            self.toggle_red_overlay(False)
+            if broadcast_btn and broadcast_btn.winfo_exists():
+                broadcast_btn.config(text="Broadcast", bg='systemButtonFace', activebackground='systemButtonFace')
+            return
+
+        clients = {name: client for name, client in self.audio_clients.items()
+                   if self.audio_active.get(name, False) and client.running}
+        if not clients:
+            print("[interface builder] Broadcast: no kiosks are being listened to.")
+            return
+
+        # A kiosk can't take a broadcast and a one-to-one mic at the same time
+        for name in clients:
+            if self.speaking.get(name, False):
+                self.toggle_speaking(name)
+
+        # Use the mic the selected kiosk already has open, so the broadcast shares that device
+        # handle; else the mic chosen for it, else any chosen mic, else the default
+        selected_client = clients.get(self.selected_kiosk)
+        device_index = selected_client.selected_input_device_index if selected_client else None
+        if device_index is None:
+            device_index = self.preferred_audio_device_index.get(self.selected_kiosk)
+        if device_index is None:
+            device_index = next((i for i in self.preferred_audio_device_index.values() if i is not None), None)
+
+        broadcast = BroadcastIntercom()
+        if not broadcast.start(clients, input_device_index=device_index):
+            print("[interface builder] Broadcast: could not start.")
+            return
+        self.broadcast = broadcast
+        self.toggle_red_overlay(True)
+        if broadcast_btn and broadcast_btn.winfo_exists():
+            broadcast_btn.config(text="Stop Broadcast", bg='#ffcccc', activebackground='#ffcccc')
+
     def toggle_red_overlay(self, should_be_red):
         """Toggles the red overlay on the root window and stats frame."""
         color = '#f50202' if should_be_red else 'systemButtonFace'
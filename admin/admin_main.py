@@ -1,5 +1,7 @@
 # --- START OF FILE admin_main.py ---
 
+# First, so that with --profile-startup every later import is timed
+from startup_profiler import profiler
 import tkinter as tk
 from tkinter import ttk
 import traceback
@@ -71,12 +73,14 @@ try:
             print("[kiosk main] Console logging initialized.", flush=True)
 
 
-            self.root = tk.Tk()
+            with profiler.measure("tk.Tk"):
+                self.root = tk.Tk()
             
             
             # Initialize pygame mixer globally for admin app (if not done elsewhere)
             try:
-                pygame.mixer.init()
+                with profiler.measure("pygame.mixer.init"):
+                    pygame.mixer.init()
                 print("[Main Admin] Pygame mixer initialized.")
             except Exception as e:
                 print(f"[Main Admin] Failed to initialize pygame mixer: {e}")
@@ -117,27 +121,37 @@ try:
             }
             
             # Initialize components (existing code)
-            self.interface_builder = AdminInterfaceBuilder(self)
-            self.prop_control = PropControl(self)
-            self.kiosk_tracker = KioskStateTracker(self)
-            self.network_handler = NetworkBroadcastHandler(self)
-            self.bug_report_manager = BugReportManager(self)
+            with profiler.measure("AdminInterfaceBuilder"):
+                self.interface_builder = AdminInterfaceBuilder(self)
+            with profiler.measure("PropControl"):
+                self.prop_control = PropControl(self)
+            with profiler.measure("KioskStateTracker"):
+                self.kiosk_tracker = KioskStateTracker(self)
+            with profiler.measure("NetworkBroadcastHandler"):
+                self.network_handler = NetworkBroadcastHandler(self)
+            with profiler.measure("BugReportManager"):
+                self.bug_report_manager = BugReportManager(self)
 
             # Initialize password manager (existing code)
-            self.password_manager = AdminPasswordManager(self)
+            with profiler.measure("AdminPasswordManager"):
+                self.password_manager = AdminPasswordManager(self)
             
             # Initialize the sync manager (existing code)
-            self.sync_manager = AdminSyncManager(self)
+            with profiler.measure("AdminSyncManager"):
+                self.sync_manager = AdminSyncManager(self)
             
             # Set up prop panel synchronization (existing code)
-            self.setup_prop_panel_sync()
+            with profiler.measure("setup_prop_panel_sync"):
+                self.setup_prop_panel_sync()
 
             # --- Add screenshot handler --- (existing code)
-            from screenshot_handler import ScreenshotHandler
-            self.screenshot_handler = ScreenshotHandler(self)
+            with profiler.measure("ScreenshotHandler"):
+                from screenshot_handler import ScreenshotHandler
+                self.screenshot_handler = ScreenshotHandler(self)
             
             # Start network handling (existing code)
-            self.network_handler.start()
+            with profiler.measure("NetworkBroadcastHandler.start"):
+                self.network_handler.start()
             
             # Set up update timers (existing code)
             self.root.after(5000, self.kiosk_tracker.check_timeouts)
@@ -168,6 +182,9 @@ try:
 
             print("[main]Starting admin application...") # This is the ADMIN_SUCCESS_MARKER
 
+            # With --profile-startup, report once the window is up and the event loop runs
+            self.root.after(0, lambda: profiler.write_report("admin"))
+
         # --- Add the heartbeat method ---
         def _send_heartbeat(self):
             """Sends a heartbeat signal to stdout for the watchdog."""
@@ -303,6 +320,8 @@ try:
                 print("[Admin Main] Cancelling periodic screenshot timer...")
                 self.root.after_cancel(self._periodic_screenshot_timer_id)
                 self._periodic_screenshot_timer_id = None
+            if hasattr(self, 'screenshot_handler'):
+                self.screenshot_handler.stop()
 
     if __name__ == '__main__':
         app = AdminApplication()
@@ -9,21 +9,226 @@ import time
 import traceback
 import sys
 import subprocess # For calling external script
+import json
+import queue
+from collections import deque
+from jitter_buffer import JitterBuffer
+import voice_codec
+
+class AudioDeviceWatcher:
+    """
+    Notices Windows audio endpoint changes (a device plugged in or removed, a
+    default device changed). Windows records these under the MMDevices registry
+    keys, so polling their last-write times every few seconds detects a change
+    without resolving any device names. Listeners are called from the watcher thread.
+    """
+    POLL_SECONDS = 3.0
+    MMDEVICES_KEYS = (r"SOFTWARE\Microsoft\Windows\CurrentVersion\MMDevices\Audio\Render",
+                      r"SOFTWARE\Microsoft\Windows\CurrentVersion\MMDevices\Audio\Capture")
+
+    def __init__(self):
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._signature = None
+        self.changes = 0
+
+    def add_listener(self, callback):
+        """Registers callback(); starts polling on first use. Does nothing off Windows."""
+        if sys.platform != 'win32':
+            return
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+            if self._thread is None:
+                self._signature = self._read_signature()
+                self._thread = threading.Thread(target=self._poll_loop, daemon=True, name="AudioDeviceWatcher")
+                self._thread.start()
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _read_signature(self):
+        """Last-write times of every render/capture endpoint key, or None if the registry can't be read."""
+        try:
+            import winreg
+            signature = []
+            for path in self.MMDEVICES_KEYS:
+                with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, path) as key:
+                    subkey_count, _, modified = winreg.QueryInfoKey(key)
+                    signature.append((path, modified))
+                    for i in range(subkey_count):
+                        name = winreg.EnumKey(key, i)
+                        with winreg.OpenKey(key, name) as endpoint:
+                            signature.append((name, winreg.QueryInfoKey(endpoint)[2]))
+            return tuple(signature)
+        except Exception as e:
+            print(f"[audio client] Device watcher could not read audio endpoints: {e}")
+            return None
+
+    def _poll_loop(self):
+        while True:
+            time.sleep(self.POLL_SECONDS)
+            signature = self._read_signature()
+            if signature is None or signature == self._signature:
+                continue
+            self._signature = signature
+            self.changes += 1
+            print("[audio client] Audio devices changed.")
+            with self._lock:
+                listeners = list(self._listeners)
+            for callback in listeners:
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"[audio client] Error handling audio device change: {e}")
+
+device_watcher = AudioDeviceWatcher()
+
+class MicrophoneTap:
+    """One consumer of a SharedMicrophone device; callback(data) gets every captured chunk."""
+    def __init__(self, microphone, device_index, callback, name):
+        self.microphone = microphone
+        self.device_index = device_index
+        self.callback = callback
+        self.name = name
+        self.closed = False
+
+    def close(self):
+        self.microphone.close_tap(self)
+
+class SharedMicrophone:
+    """
+    The admin's microphone, opened once per input device and shared. A kiosk's
+    talk stream and the broadcast intercom each take a tap; the PortAudio
+    callback hands every chunk to every tap on that device, so talking to one
+    kiosk and broadcasting to all of them never open the device twice. The
+    device is closed when its last tap closes. Tap callbacks run on the
+    PortAudio thread and must only hand the chunk off.
+    """
+    CHUNK = 1024
+    FORMAT = pyaudio.paFloat32
+    CHANNELS = 1
+    RATE = 44100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._audio = None
+        self._devices = {} # device index -> {'stream': input stream, 'taps': tuple of taps}
+        self.device_opens = 0
+        self.callback_errors = 0
+
+    def open_tap(self, device_index, callback, name):
+        """
+        Subscribes callback to the device (None for the default input), opening
+        it if nobody else has. Raises if the device can't be opened.
+        """
+        with self._lock:
+            if self._audio is None:
+                self._audio = pyaudio.PyAudio()
+            if device_index is None:
+                device_index = self._audio.get_default_input_device_info()['index']
+            device = self._devices.get(device_index)
+            if device is None:
+                device = {'stream': None, 'taps': ()}
+                device['stream'] = self._audio.open(
+                    format=self.FORMAT,
+                    channels=self.CHANNELS,
+                    rate=self.RATE,
+                    input=True,
+                    frames_per_buffer=self.CHUNK,
+                    input_device_index=device_index,
+                    stream_callback=lambda in_data, frame_count, time_info, status: self._dispatch(device, in_data)
+                )
+                self._devices[device_index] = device
+                self.device_opens += 1
+                print(f"[audio client] Microphone opened on device {device_index}.")
+            tap = MicrophoneTap(self, device_index, callback, name)
+            # Replaced, never mutated, so the callback can iterate without locking
+            device['taps'] = device['taps'] + (tap,)
+            count = len(device['taps'])
+        print(f"[audio client] '{name}' tapped microphone {device_index} ({count} taps).")
+        return tap
+
+    def close_tap(self, tap):
+        stream_to_close = None
+        with self._lock:
+            if tap.closed:
+                return
+            tap.closed = True
+            device = self._devices.get(tap.device_index)
+            if device is None:
+                return
+            device['taps'] = tuple(t for t in device['taps'] if t is not tap)
+            if not device['taps']:
+                stream_to_close = device['stream']
+                del self._devices[tap.device_index]
+        if stream_to_close:
+            try:
+                if stream_to_close.is_active():
+                    stream_to_close.stop_stream()
+                stream_to_close.close()
+                print(f"[audio client] Microphone closed on device {tap.device_index}.")
+            except Exception as e:
+                print(f"[audio client] Error closing microphone: {e}")
+
+    def _dispatch(self, device, in_data):
+        for tap in device['taps']:
+            try:
+                tap.callback(in_data)
+            except Exception:
+                self.callback_errors += 1
+        return (None, pyaudio.paContinue)
+
+    def is_open(self, device_index):
+        with self._lock:
+            return device_index in self._devices
+
+shared_microphone = SharedMicrophone()
 
 class AudioClient:
+    # Keep a microphone tap open (muted) while this kiosk is selected, so talk starts without opening the device
+    WARM_MIC = True
+    CAPTURE_QUEUE_CHUNKS = 20
+
+    # Name of the Windows Default Communication Device, shared by every client. Resolving it
+    # runs an external script, so it's done once and redone only after a device change.
+    _comm_device_name = None
+    _comm_device_resolved = False
+    _comm_device_lock = threading.Lock()
+
     def __init__(self):
         """Initializes the AudioClient."""
         self.running = False
         self.current_socket = None
         self.audio = None
-        self.input_stream = None
+        self.input_stream = None # MicrophoneTap on the shared microphone while the mic is open
         self.output_stream = None
         self.speaking = False
         self.current_volume = 0.0
         self.selected_input_device_index = None
         self._pyaudio_initialized = False
         self._lock = threading.Lock() # Lock for protecting stream/speaking state
-        self._cached_output_device_index = None # NEW: Cache for Windows communication device index
+        self._send_lock = threading.Lock() # Keeps packets from send_audio and a broadcast from interleaving
+        self._cached_output_device_index = None # PyAudio index of the communication device for this client's PyAudio instance
+        self.jitter_buffer = None # Playout buffer for audio from the kiosk, replaced per connection
+        self.codec_name = None # Voice codec negotiated with the kiosk for the current connection
+        self._send_codec = None # Per-direction codec instances; both carry resampler/predictor state
+        self._receive_codec = None
+        self._pending_header = None # First audio size header from a legacy kiosk, read during negotiation
+        self._input_is_warm = False # True when input_stream stays open between talk presses
+        self.keep_warm = False # Set for the selected kiosk's client; see set_keep_warm()
+        self._capture_queue = queue.Queue(maxsize=self.CAPTURE_QUEUE_CHUNKS) # Filled by the microphone tap while speaking
+        self._talk_generation = 0 # Lets a send thread from an earlier press notice it has been superseded
+        self.capture_overflows = 0
+
+        # Talk press to first packet on the wire
+        self._talk_pressed_at = None
+        self._talk_press_warm = False
+        self.talk_latency_ms = None
+        self._talk_latencies = deque(maxlen=20)
 
         # Audio parameters
         self.CHUNK = 1024
@@ -36,6 +241,8 @@ class AudioClient:
             self.audio = pyaudio.PyAudio()
             self._pyaudio_initialized = True
             print("[audio client] PyAudio initialized successfully.")
+            if sys.platform == 'win32':
+                AudioClient.prefetch_comm_device()
         except Exception as e:
             print(f"[audio client] FATAL ERROR: Failed to initialize PyAudio: {e}")
             traceback.print_exc()
@@ -43,7 +250,8 @@ class AudioClient:
             self._pyaudio_initialized = False
             print("[audio client] Audio functionality is disabled.")
 
-    def _run_windows_comm_device_script(self):
+    @staticmethod
+    def _run_windows_comm_device_script():
         """
         Executes the external script to get the Windows Default Communication Device name.
         Returns the device name string on success, None on failure.
@@ -148,30 +356,63 @@ class AudioClient:
         return pyaudio_index
 
 
+    @classmethod
+    def _resolve_comm_device_name(cls):
+        """Returns the Windows Default Communication Device name, running the script only when the cache is empty."""
+        with cls._comm_device_lock:
+            if not cls._comm_device_resolved:
+                print("[audio client] Cache empty. Attempting to determine Windows Default Communication Device for output.")
+                cls._comm_device_name = cls._run_windows_comm_device_script()
+                cls._comm_device_resolved = True
+                device_watcher.add_listener(cls.invalidate_comm_device_cache)
+            return cls._comm_device_name
+
+    @classmethod
+    def prefetch_comm_device(cls):
+        """Resolves the communication device in the background so the first connect doesn't wait for the script."""
+        if not cls._comm_device_resolved:
+            threading.Thread(target=cls._resolve_comm_device_name, daemon=True, name="CommDevicePrefetch").start()
+
+    @classmethod
+    def invalidate_comm_device_cache(cls):
+        with cls._comm_device_lock:
+            if cls._comm_device_resolved:
+                print("[audio client] Communication device cache invalidated.")
+            cls._comm_device_resolved = False
+            cls._comm_device_name = None
+
     def _determine_output_device_index_for_windows_comm_device(self):
         """
         Determines the PyAudio output device index for Windows' Default Communication Device.
-        Uses a cached value if available, otherwise runs external script and finds PyAudio match.
+        The device name is cached across clients; the index is cached per PyAudio instance.
         Returns: PyAudio device index (int) or None.
         """
         if self._cached_output_device_index is not None:
             print(f"[audio client] Using cached Windows communication device index: {self._cached_output_device_index}")
             return self._cached_output_device_index
 
-        print("[audio client] Cache empty. Attempting to determine Windows Default Communication Device for output.")
-        comm_device_name_from_script = self._run_windows_comm_device_script()
-        
-        if comm_device_name_from_script:
-            comm_pyaudio_index = self._get_pyaudio_index_from_device_name(comm_device_name_from_script)
+        comm_device_name = self._resolve_comm_device_name()
+        if comm_device_name:
+            comm_pyaudio_index = self._get_pyaudio_index_from_device_name(comm_device_name)
             self._cached_output_device_index = comm_pyaudio_index # Cache the result
             return comm_pyaudio_index
         else:
             print("[audio client] Could not determine Windows Default Communication Device name via script. Falling back to PyAudio default.")
             return None
 
+    def _on_audio_devices_changed(self):
+        """Device watcher callback: forget the resolved index and reopen a warm microphone."""
+        self._cached_output_device_index = None
+        if self._release_warm_microphone():
+            self.prewarm_microphone()
 
-    def connect(self, host, port=8090):
-        """Connects to the audio server and starts the receiving stream."""
+
+    def connect(self, host, port=8090, codecs=None):
+        """
+        Connects to the audio server and starts the receiving stream. codecs is
+        the list the kiosk advertised in its stats; without one the kiosk may
+        predate codec negotiation, so raw PCM is used without a handshake.
+        """
         if not self._pyaudio_initialized or self.audio is None:
              print("[audio client] PyAudio was not initialized or instance is missing. Cannot connect.")
              return False
@@ -191,6 +432,8 @@ class AudioClient:
             self.running = True # Set running flag only after successful socket connection
             print("[audio client] Socket connected successfully.")
 
+            self._negotiate_codec(codecs)
+
             # Initialize output stream for receiving audio
             if self.audio is None: # Double check audio instance
                 print("[audio client] PyAudio instance is None after socket connect. Critical error.")
@@ -204,17 +447,27 @@ class AudioClient:
             else:
                  print("[audio client] Not on Windows. Using PyAudio default output device.")
             
+            # The output stream's callback drains a jitter buffer filled by the receive thread,
+            # so network hiccups are absorbed or concealed instead of blocking playback
+            jitter_buffer = JitterBuffer(self.RATE, self.CHANNELS)
+            self.jitter_buffer = jitter_buffer
             self.output_stream = self.audio.open(
                 format=self.FORMAT,
                 channels=self.CHANNELS,
                 rate=self.RATE,
                 output=True,
                 frames_per_buffer=self.CHUNK,
-                output_device_index=output_device_idx_to_use # PyAudio handles None as default
+                output_device_index=output_device_idx_to_use, # PyAudio handles None as default
+                stream_callback=lambda in_data, frame_count, time_info, status: (jitter_buffer.read(frame_count), pyaudio.paContinue)
             )
+            jitter_buffer.output_latency = self.output_stream.get_output_latency()
             selected_dev_msg = f"(Device index: {output_device_idx_to_use})" if output_device_idx_to_use is not None else "(PyAudio Default)"
             print(f"[audio client] Output stream opened {selected_dev_msg}.")
 
+            device_watcher.add_listener(self._on_audio_devices_changed)
+            if self.WARM_MIC and self.keep_warm:
+                self.prewarm_microphone()
+
             # Start receiving thread
             print("[audio client] Starting receive thread...")
             threading.Thread(target=self._safe_receive_loop, daemon=True).start()
@@ -231,6 +484,42 @@ class AudioClient:
             self.disconnect() # Ensure cleanup on other errors
             return False
 
+    def _negotiate_codec(self, kiosk_codecs, preferred=voice_codec.PREFERRED_CODECS):
+        """
+        Offers our codecs to the kiosk and reads back its choice. A kiosk that
+        didn't advertise codecs would read the offer as an audio chunk size and
+        drop the connection, so it gets raw PCM and no offer. A kiosk that
+        answers with audio instead of a codec reply is treated the same way,
+        keeping the size header it sent for the receive loop.
+        """
+        self.codec_name = voice_codec.FALLBACK_CODEC
+        self._pending_header = None
+        if not kiosk_codecs:
+            print("[audio client] Kiosk did not advertise voice codecs (older version), using raw PCM.")
+        else:
+            self._exchange_hello(preferred)
+        self._send_codec = voice_codec.create_codec(self.codec_name, self.RATE)
+        self._receive_codec = voice_codec.create_codec(self.codec_name, self.RATE)
+        print(f"[audio client] Voice codec: {self.codec_name}")
+
+    def _exchange_hello(self, preferred):
+        """Sends the codec offer and sets codec_name from the kiosk's reply."""
+        try:
+            self.current_socket.sendall(voice_codec.build_hello({'codecs': list(preferred)}))
+            header = self._recv_exactly(struct.calcsize("Q"))
+            if header and struct.unpack("Q", header)[0] == voice_codec.HELLO_MAGIC:
+                length_data = self._recv_exactly(struct.calcsize("Q"))
+                length = struct.unpack("Q", length_data)[0] if length_data else 0
+                reply_data = self._recv_exactly(length) if 0 < length <= 4096 else None
+                reply = json.loads(bytes(reply_data).decode('utf-8')) if reply_data else {}
+                if reply.get('codec') in voice_codec.CODECS:
+                    self.codec_name = reply['codec']
+            elif header:
+                print("[audio client] Kiosk did not negotiate a codec (older version), using raw PCM.")
+                self._pending_header = header
+        except Exception as e:
+            print(f"[audio client] Codec negotiation failed, using raw PCM: {e}")
+
     def _safe_receive_loop(self):
         """Wrapper for receive_audio to handle exceptions within the thread."""
         try:
@@ -250,7 +539,9 @@ class AudioClient:
         while self.running:
             try:
                 # 1. Receive chunk size (blocking with timeout via _recv_exactly)
-                size_data = self._recv_exactly(struct.calcsize("Q"))
+                size_data, self._pending_header = self._pending_header, None
+                if not size_data:
+                    size_data = self._recv_exactly(struct.calcsize("Q"))
                 if not size_data:
                     if self.running: # Avoid log noise if disconnect was intentional
                         print("[audio client] Receive loop: Failed to get size data (connection closed?).")
@@ -270,19 +561,10 @@ class AudioClient:
                         print("[audio client] Receive loop: Failed to get audio data (connection closed?).")
                     break # Exit loop
 
-                # 3. Play audio data
-                current_output_stream = self.output_stream # Local ref for safety
-                if current_output_stream and self.running:
-                    try:
-                        # Check if stream is active *before* writing
-                        if current_output_stream.is_active():
-                             current_output_stream.write(bytes(audio_data))
-                    except OSError as e:
-                         # Common error if stream is closed unexpectedly
-                         print(f"[audio client] Receive loop: OSError writing to output stream: {e}")
-                         break # Exit loop on stream write errors
-                    except Exception as e:
-                         print(f"[audio client] Receive loop: Error playing audio chunk: {e}")
+                # 3. Queue for playout; the output stream callback drains the jitter buffer
+                jitter_buffer = self.jitter_buffer # Local ref for safety
+                if jitter_buffer and self.running:
+                    jitter_buffer.push(self._receive_codec.decode(audio_data))
 
             except socket.error as e:
                 if self.running: # Only log if not intentionally stopped
@@ -296,13 +578,92 @@ class AudioClient:
 
         print("[audio client] Audio reception loop ended.")
 
+    def _open_input_stream(self):
+        """Taps the shared microphone with a callback that only queues audio while speaking."""
+        return shared_microphone.open_tap(self.selected_input_device_index, self._on_microphone_chunk, f"talk-{id(self):x}")
+
+    def _on_microphone_chunk(self, in_data):
+        # While muted the chunk is simply dropped, so a warm tap costs almost nothing
+        if self.speaking:
+            try:
+                self._capture_queue.put_nowait(in_data)
+            except queue.Full:
+                self.capture_overflows += 1
+
+    def prewarm_microphone(self):
+        """
+        Opens the input stream muted so the next talk press only has to open the gate.
+        Returns True if a warm stream is open.
+        """
+        if not self._pyaudio_initialized or self.audio is None or not self.running:
+            return False
+        if self.selected_input_device_index is None:
+            self.get_input_devices() # Sets the default device if possible
+        with self._lock:
+            if self.input_stream is not None:
+                return self._input_is_warm
+            if self.selected_input_device_index is None:
+                print("[audio client] No input device available to pre-warm.")
+                return False
+            try:
+                self.input_stream = self._open_input_stream()
+                self._input_is_warm = True
+                print(f"[audio client] Microphone pre-warmed on device {self.selected_input_device_index} (muted).")
+                return True
+            except Exception as e:
+                print(f"[audio client] Could not pre-warm microphone on device {self.selected_input_device_index}: {e}")
+                self.input_stream = None
+                self._input_is_warm = False
+                return False
+
+    def _release_microphone(self):
+        """Closes the input stream, warm or not."""
+        with self._lock:
+            stream_to_close = self.input_stream
+            self.input_stream = None
+            self._input_is_warm = False
+        if stream_to_close:
+            print("[audio client] Closing input stream...")
+            stream_to_close.close()
+            print("[audio client] Input stream closed.")
+
+    def _release_warm_microphone(self):
+        """
+        Closes the input stream only if it is warm and muted. The check and the
+        detach happen under the lock, so a talk press can't start on a stream
+        that is about to be closed. Returns True if a stream was released.
+        """
+        with self._lock:
+            if not self._input_is_warm or self.speaking or self.input_stream is None:
+                return False
+            stream_to_close = self.input_stream
+            self.input_stream = None
+            self._input_is_warm = False
+        print("[audio client] Releasing warm microphone...")
+        stream_to_close.close()
+        return True
+
+    def set_keep_warm(self, keep_warm):
+        """Keeps the microphone warm (while connected) or lets it go once talking stops."""
+        self.keep_warm = keep_warm
+        if keep_warm:
+            if self.WARM_MIC and self.running:
+                self.prewarm_microphone()
+        else:
+            self._release_warm_microphone()
+
     def start_speaking(self):
-        """Starts capturing and sending audio. Protected by lock."""
+        """Starts sending microphone audio, opening the device only if it isn't already warm. Protected by lock."""
         print("[audio client] Attempting to start speaking...")
+        pressed_at = time.perf_counter()
         if not self.running:
             print("[audio client] Cannot start speaking: Not connected.")
             return False
 
+        if self.selected_input_device_index is None:
+            print("[audio client] No input device selected. Attempting to find default.")
+            self.get_input_devices() # Sets default if possible (takes the lock itself)
+
         # Acquire lock to ensure atomic start operation
         with self._lock:
             if self.speaking:
@@ -315,65 +676,55 @@ class AudioClient:
                 return False
 
             if self.selected_input_device_index is None:
-                print("[audio client] No input device selected. Attempting to find default.")
-                self.get_input_devices() # Sets default if possible (also uses lock briefly)
-                if self.selected_input_device_index is None:
-                    print("[audio client] Error: No input device available or selected.")
-                    return False # Still no device after checking
-
-            print(f"[audio client] Starting microphone on device {self.selected_input_device_index} (lock acquired).")
-
-            # --- Attempt to open stream ---
-            try:
-                # Ensure any previous stream reference is definitely cleared before opening
-                if self.input_stream is not None:
-                    print("[audio client] Warning: input_stream was not None before opening. Cleaning up.")
-                    try:
-                        # No need to check is_active here, just try close
-                        self.input_stream.close()
-                    except Exception as e_clean:
-                         print(f"[audio client] Info: Error during pre-cleanup: {e_clean}")
-                    finally:
-                         self.input_stream = None
-
-                print("[audio client] Opening input stream...")
-                self.input_stream = self.audio.open(
-                    format=self.FORMAT,
-                    channels=self.CHANNELS,
-                    rate=self.RATE,
-                    input=True,
-                    frames_per_buffer=self.CHUNK,
-                    input_device_index=self.selected_input_device_index
-                )
-                print("[audio client] Input stream opened successfully.")
-
-                # --- Stream opened successfully ---
-                self.speaking = True # Set flag *after* stream is confirmed open
-                self.current_volume = 0.0
-                print("[audio client] Starting send thread...")
-                threading.Thread(target=self._safe_send_loop, daemon=True).start()
-                print("[audio client] Send thread started. Microphone active.")
-                return True # Success
+                print("[audio client] Error: No input device available or selected.")
+                return False
 
-            except Exception as e:
-                # --- Failed to open stream ---
-                print(f"[audio client] Failed to open input stream on device {self.selected_input_device_index}: {e}")
-                traceback.print_exc()
-                # Clean up potentially partially opened stream
-                if self.input_stream:
-                    try: self.input_stream.close()
-                    except: pass
-                self.input_stream = None
-                self.speaking = False # Ensure flag is false
-                print("[audio client] Microphone start failed.")
-                # Removed remediation logic for simplicity and stability
-                return False # Failure
+            warm = self.input_stream is not None and self._input_is_warm
+            if not warm:
+                print(f"[audio client] Starting microphone on device {self.selected_input_device_index} (lock acquired).")
+                # --- Attempt to open stream ---
+                try:
+                    # Ensure any previous stream reference is definitely cleared before opening
+                    if self.input_stream is not None:
+                        print("[audio client] Warning: input_stream was not None before opening. Cleaning up.")
+                        try:
+                            self.input_stream.close()
+                        except Exception as e_clean:
+                             print(f"[audio client] Info: Error during pre-cleanup: {e_clean}")
+                        finally:
+                             self.input_stream = None
+
+                    print("[audio client] Opening input stream...")
+                    self.input_stream = self._open_input_stream()
+                    self._input_is_warm = False
+                    print("[audio client] Input stream opened successfully.")
+                except Exception as e:
+                    # --- Failed to open stream ---
+                    print(f"[audio client] Failed to open input stream on device {self.selected_input_device_index}: {e}")
+                    traceback.print_exc()
+                    self.input_stream = None
+                    self.speaking = False # Ensure flag is false
+                    print("[audio client] Microphone start failed.")
+                    return False # Failure
+
+            # Drop anything a previous press left behind, then open the gate
+            while not self._capture_queue.empty():
+                try: self._capture_queue.get_nowait()
+                except queue.Empty: break
+            self._talk_generation += 1
+            self._talk_pressed_at = pressed_at
+            self._talk_press_warm = warm
+            self.speaking = True # Set flag *after* stream is confirmed open
+            self.current_volume = 0.0
+            threading.Thread(target=self._safe_send_loop, args=(self._talk_generation,), daemon=True).start()
+            print(f"[audio client] Send thread started. Microphone active ({'warm' if warm else 'cold'} start).")
+            return True # Success
         # Lock released automatically here
 
-    def _safe_send_loop(self):
+    def _safe_send_loop(self, generation):
         """Wrapper for send_audio to handle exceptions within the thread."""
         try:
-            self.send_audio()
+            self.send_audio(generation)
         except Exception as e:
             print(f"[audio client] Send thread CRASHED: {e}")
             traceback.print_exc()
@@ -385,7 +736,7 @@ class AudioClient:
 
 
     def stop_speaking(self):
-        """Stops capturing and sending audio. Protected by lock."""
+        """Stops sending microphone audio. A warm stream stays open, muted. Protected by lock."""
         print("[audio client] Attempting to stop microphone...")
         # Acquire lock to ensure atomic stop operation
         with self._lock:
@@ -394,114 +745,98 @@ class AudioClient:
                 return # Already stopped
 
             print("[audio client] Stopping microphone (lock acquired).")
-            self.speaking = False # Signal send thread to stop *first*
+            self.speaking = False # Closes the gate in the input callback
             self.current_volume = 0.0
+            self._talk_pressed_at = None
+            # Keep the stream even if this press opened it cold (e.g. pre-warming failed while the
+            # device was busy), so later presses on the selected kiosk start warm
+            keep_warm = self.WARM_MIC and self.keep_warm and self.running and self.input_stream is not None
+            if keep_warm:
+                self._input_is_warm = True
 
-            stream_to_close = self.input_stream # Get reference
-            self.input_stream = None # Clear the shared reference immediately
+        try:
+            self._capture_queue.put_nowait(None) # Wake the send thread
+        except queue.Full:
+            pass
 
-        # --- Close stream (outside primary lock section, closing can block) ---
-        if stream_to_close:
-            print("[audio client] Closing input stream...")
-            try:
-                # Check activity before stopping, might prevent some errors on some platforms
-                if stream_to_close.is_active():
-                     stream_to_close.stop_stream()
-                     print("[audio client] Input stream stopped.")
-                stream_to_close.close()
-                print("[audio client] Input stream closed.")
-            except Exception as e:
-                print(f"[audio client] Error closing input stream: {e}")
-                # traceback.print_exc() # Can be noisy, error is common if closed abruptly
+        if keep_warm:
+            print("[audio client] Microphone muted; input stream kept warm.")
         else:
-             # This case shouldn't happen if self.speaking was true, but log if it does
-             print("[audio client] Warning: stop_speaking called but input_stream was already None.")
+            self._release_microphone()
 
         print("[audio client] Stop speaking finished.")
-        # Lock was released after clearing self.input_stream and self.speaking
 
 
-    def send_audio(self):
-        """Reads audio from the input stream and sends it over the socket."""
+    def send_audio(self, generation=None):
+        """Sends queued microphone audio over the socket until speaking stops."""
         print("[audio client] Starting audio transmission loop.")
+        if generation is None:
+            generation = self._talk_generation
 
-        # Check initial state
-        with self._lock: # Briefly lock to get consistent initial stream reference
-            initial_stream = self.input_stream
-
-        if not initial_stream:
-             print("[audio client] Send loop: Started with no input stream. Exiting.")
-             return
-
-        while True: # Loop relies on self.speaking flag and stream state
-            # --- Check state before blocking read ---
-            # Read speaking flag without lock (volatile read is okay here)
-            if not self.speaking:
-                 print("[audio client] Send loop: speaking flag is false. Exiting.")
-                 break
-            # Read stream ref without lock (it's set to None atomically in stop_speaking)
-            current_stream = self.input_stream
-            if current_stream is None:
-                 print("[audio client] Send loop: input_stream is None. Exiting.")
-                 break
-
-            # --- Blocking Read ---
+        while self.speaking and generation == self._talk_generation:
             try:
-                # Use the stream reference captured at the start of the loop iteration
-                data = current_stream.read(self.CHUNK, exception_on_overflow=False)
-            except IOError as e:
-                # This is the *expected* way to exit when stop_speaking closes the stream
-                # Check the speaking flag again to differentiate expected vs unexpected IOErrors
-                if not self.speaking:
-                    print(f"[audio client] Send loop: IOError reading audio (expected on stop): {e}")
-                else:
-                    # If speaking is still true, this might be an unexpected error
-                    print(f"[audio client] Send loop: IOError reading audio unexpectedly: {e}")
-                break # Exit loop on IOError
-            except AttributeError as e:
-                # Handles case where current_stream becomes None *between* check and read (rare)
-                 print(f"[audio client] Send loop: AttributeError (stream likely became None): {e}")
-                 break
-            except Exception as e:
-                print(f"[audio client] Send loop: Unexpected error reading audio stream: {e}")
-                traceback.print_exc()
-                break # Exit loop on other errors
+                data = self._capture_queue.get(timeout=0.5)
+            except queue.Empty:
+                if self.input_stream is None:
+                    print("[audio client] Send loop: input_stream is None. Exiting.")
+                    break
+                continue
+            if data is None or not self.speaking or generation != self._talk_generation:
+                break
 
             # --- Process and Send Data ---
-            if data:
-                # Calculate volume
-                self.current_volume = self._calculate_volume(data)
-
-                # Send data - check socket existence too
-                current_sock = self.current_socket
-                if current_sock and self.running:
-                    try:
-                        size = len(data)
-                        # Pack size and data together for efficiency
-                        packet = struct.pack("Q", size) + data
+            # Calculate volume
+            self.current_volume = self._calculate_volume(data)
+
+            # Send data - check socket existence too
+            current_sock = self.current_socket
+            if current_sock and self.running:
+                try:
+                    payload = self._send_codec.encode(data)
+                    # Pack size and data together for efficiency
+                    packet = struct.pack("Q", len(payload)) + payload
+                    with self._send_lock:
                         current_sock.sendall(packet)
-                    except socket.error as e:
-                        print(f"[audio client] Send loop: Socket error sending audio packet: {e}")
-                        # Assume connection is lost, trigger disconnect
-                        if self.running: self.disconnect()
-                        break # Exit send loop
-                    except Exception as e:
-                        print(f"[audio client] Send loop: Unexpected error sending audio packet: {e}")
-                        traceback.print_exc()
-                        if self.running: self.disconnect() # Assume fatal error
-                        break # Exit send loop
-                else:
-                    # Socket closed or client stopped during send attempt
-                    print("[audio client] Send loop: Socket closed or client stopped. Cannot send.")
+                except socket.error as e:
+                    print(f"[audio client] Send loop: Socket error sending audio packet: {e}")
+                    # Assume connection is lost, trigger disconnect
+                    if self.running: self.disconnect()
                     break # Exit send loop
+                except Exception as e:
+                    print(f"[audio client] Send loop: Unexpected error sending audio packet: {e}")
+                    traceback.print_exc()
+                    if self.running: self.disconnect() # Assume fatal error
+                    break # Exit send loop
+
+                pressed_at = self._talk_pressed_at
+                if pressed_at is not None:
+                    # First packet of this press is on the wire
+                    self._talk_pressed_at = None
+                    self.talk_latency_ms = (time.perf_counter() - pressed_at) * 1000.0
+                    self._talk_latencies.append(self.talk_latency_ms)
+                    print(f"[audio client] Talk press to first packet: {self.talk_latency_ms:.0f} ms "
+                          f"({'warm' if self._talk_press_warm else 'cold'}).")
             else:
-                # read() returned empty data without error? Should not happen with blocking read.
-                print("[audio client] Send loop: Read returned empty data. Exiting.")
-                break
+                # Socket closed or client stopped during send attempt
+                print("[audio client] Send loop: Socket closed or client stopped. Cannot send.")
+                break # Exit send loop
 
         print("[audio client] Audio transmission loop ended.")
         self.current_volume = 0.0 # Reset volume when transmission stops
 
+    def send_packet(self, payload):
+        """Sends one already-encoded voice payload (used by the broadcast intercom). Returns False on failure."""
+        current_sock = self.current_socket
+        if not current_sock or not self.running:
+            return False
+        try:
+            with self._send_lock:
+                current_sock.sendall(struct.pack("Q", len(payload)) + payload)
+            return True
+        except Exception as e:
+            print(f"[audio client] Error sending broadcast packet: {e}")
+            return False
+
     def _recv_exactly(self, size):
         """Helper to receive exactly 'size' bytes or return None on failure/timeout."""
         data = bytearray()
@@ -549,7 +884,7 @@ class AudioClient:
         """Disconnects, closes streams, and cleans up resources."""
         print("[audio client] Disconnecting audio client...")
         self.running = False # Signal all loops to stop *first*
-        self._cached_output_device_index = None # NEW: Clear cache on disconnect
+        device_watcher.remove_listener(self._on_audio_devices_changed)
 
         # Close socket - triggers threads blocked on socket ops to exit
         socket_to_close = self.current_socket
@@ -565,21 +900,11 @@ class AudioClient:
             except Exception as e:
                  print(f"[audio client] Error closing socket: {e}")
 
-        # Use lock to handle input stream shutdown safely with speaking flag
+        # Close the input stream, warm or not; speaking goes off with it
         with self._lock:
             self.speaking = False # Ensure speaking is off
-            input_stream_to_close = self.input_stream
-            self.input_stream = None # Clear reference within lock
-
-        # Close input stream (outside lock)
-        if input_stream_to_close:
-            print("[audio client] Closing input stream during disconnect...")
-            try:
-                if input_stream_to_close.is_active(): input_stream_to_close.stop_stream()
-                input_stream_to_close.close()
-                print("[audio client] Input stream closed.")
-            except Exception as e:
-                print(f"[audio client] Error closing input stream during disconnect: {e}")
+            self._talk_pressed_at = None
+        self._release_microphone()
 
         # Close output stream (doesn't need the input stream lock)
         output_stream_to_close = self.output_stream
@@ -695,20 +1020,42 @@ class AudioClient:
 
             print(f"[audio client] Changing selected input device index to {index} (lock acquired).")
             was_speaking = self.speaking
+            was_warm = self._input_is_warm
             old_index = self.selected_input_device_index
             self.selected_input_device_index = index # Change index
 
         # Perform stop/start outside the main index change lock section
         # Stop/Start methods acquire the lock themselves.
-        if was_speaking:
-            print(f"[audio client] Restarting microphone for new device {index} (was {old_index})...")
-            self.stop_speaking() # This will acquire lock, stop stream, release lock
+        if was_speaking or was_warm:
+            print(f"[audio client] Reopening microphone for new device {index} (was {old_index})...")
+            self.stop_speaking() # This will acquire lock, stop sending, release lock
+            self._release_microphone() # A warm stream is still on the old device
             # Give a moment for OS/driver to release the old device handle
             time.sleep(0.1) # Adjust delay if needed
-            self.start_speaking() # This will acquire lock, start stream, release lock
+            if self.WARM_MIC and self.keep_warm:
+                self.prewarm_microphone()
+            if was_speaking:
+                self.start_speaking() # This will acquire lock, start sending, release lock
         else:
              print(f"[audio client] Input device set to {index}. Not restarting as microphone was off.")
 
+    def get_jitter_stats(self):
+        """Jitter buffer counters for audio received from the kiosk, or None if never connected."""
+        if self.jitter_buffer is None:
+            return None
+        stats = self.jitter_buffer.get_stats()
+        stats['codec'] = self.codec_name
+        return stats
+
+    def get_talk_stats(self):
+        """Talk press to first sent packet for recent presses (None before the first press) and whether the mic is warm."""
+        return {
+            'last_ms': round(self.talk_latency_ms) if self.talk_latency_ms is not None else None,
+            'avg_ms': round(sum(self._talk_latencies) / len(self._talk_latencies)) if self._talk_latencies else None,
+            'warm': self._talk_press_warm,
+            'mic_warm': self._input_is_warm and self.input_stream is not None,
+        }
+
     def get_current_volume(self):
         """Returns the current normalized microphone volume (0.0 to 1.0)."""
         # Reading a float is generally atomic, no lock needed
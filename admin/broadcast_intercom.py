@@ -0,0 +1,196 @@
+# broadcast_intercom.py: speak to several kiosks at once over their existing voice connections
+import queue
+import threading
+import time
+import traceback
+from collections import deque
+
+import numpy as np
+
+import voice_codec
+from audio_client import shared_microphone
+
+class BroadcastTarget:
+    """
+    One kiosk receiving the broadcast. Packets wait in a short queue drained by
+    this target's own sender thread, so a kiosk on a slow link only delays (and
+    eventually drops) its own audio. Latency is measured from the capture
+    callback to the end of sendall() for that packet.
+    """
+    QUEUE_PACKETS = 10 # ~230 ms of 1024-frame chunks; older packets are dropped beyond this
+    LATENCY_SMOOTHING = 0.1
+
+    def __init__(self, name, client):
+        self.name = name
+        self.client = client
+        self.codec_name = client.codec_name or voice_codec.FALLBACK_CODEC
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self.active = True
+        self.sent = 0
+        self.dropped = 0
+        self.latency_ms = 0.0
+        self.max_latency_ms = 0.0
+        self._thread = threading.Thread(target=self._send_loop, daemon=True, name=f"Broadcast-{name}")
+        self._thread.start()
+
+    def enqueue(self, payload, captured_at):
+        with self._cond:
+            self._queue.append((payload, captured_at))
+            while len(self._queue) > self.QUEUE_PACKETS:
+                self._queue.popleft()
+                self.dropped += 1
+            self._cond.notify()
+
+    def _send_loop(self):
+        while True:
+            with self._cond:
+                while self.active and not self._queue:
+                    self._cond.wait()
+                if not self.active:
+                    return
+                payload, captured_at = self._queue.popleft()
+            if not self.client.send_packet(payload):
+                print(f"[broadcast intercom] Send to {self.name} failed, removing it from the broadcast.")
+                self.close()
+                return
+            latency = (time.perf_counter() - captured_at) * 1000.0
+            self.sent += 1
+            self.latency_ms += self.LATENCY_SMOOTHING * (latency - self.latency_ms)
+            self.max_latency_ms = max(self.max_latency_ms, latency)
+
+    def close(self):
+        with self._cond:
+            self.active = False
+            self._queue.clear()
+            self._cond.notify()
+
+    def get_stats(self):
+        with self._cond:
+            queued = len(self._queue)
+        return {
+            'active': self.active,
+            'codec': self.codec_name,
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'queued': queued,
+            'latency_ms': round(self.latency_ms, 1),
+            'max_latency_ms': round(self.max_latency_ms, 1),
+        }
+
+class BroadcastIntercom:
+    """
+    Sends the admin microphone to every target kiosk. Capture comes from a tap
+    on the shared microphone, the same device handle a kiosk's warm talk
+    stream already holds, so broadcasting never opens the mic a second time.
+    Each chunk is encoded once per distinct negotiated codec and the same
+    payload is queued to every target using that codec. Targets reuse their
+    AudioClient's connection, so joining the broadcast needs no reconnect.
+    """
+    RATE = shared_microphone.RATE
+    CAPTURE_QUEUE_CHUNKS = 20
+
+    def __init__(self):
+        self.tap = None
+        self._capture_queue = queue.Queue(maxsize=self.CAPTURE_QUEUE_CHUNKS)
+        self.capture_overflows = 0
+        self.running = False
+        self.current_volume = 0.0
+        self.targets = {}
+        self._targets_lock = threading.Lock()
+        self._encoders = {} # codec name -> codec instance shared by all targets using it
+        self._thread = None
+
+    def start(self, clients, input_device_index=None):
+        """Starts broadcasting to {kiosk name: AudioClient}. Returns False if the microphone can't be opened."""
+        if self.running:
+            return True
+        try:
+            self.tap = shared_microphone.open_tap(input_device_index, self._on_microphone_chunk, "broadcast")
+        except Exception as e:
+            print(f"[broadcast intercom] Failed to open microphone: {e}")
+            traceback.print_exc()
+            self.tap = None
+            return False
+
+        for name, client in clients.items():
+            self.add_target(name, client)
+        self.running = True
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True, name="BroadcastCapture")
+        self._thread.start()
+        print(f"[broadcast intercom] Broadcasting to {', '.join(self.targets) or 'no kiosks'}.")
+        return True
+
+    def add_target(self, name, client):
+        with self._targets_lock:
+            old = self.targets.get(name)
+            if old:
+                old.close()
+            self.targets[name] = BroadcastTarget(name, client)
+
+    def remove_target(self, name):
+        with self._targets_lock:
+            target = self.targets.pop(name, None)
+        if target:
+            target.close()
+
+    def _on_microphone_chunk(self, data):
+        # Runs on the PortAudio thread: timestamp and hand off, encoding happens on the capture thread
+        try:
+            self._capture_queue.put_nowait((data, time.perf_counter()))
+        except queue.Full:
+            self.capture_overflows += 1
+
+    def _capture_loop(self):
+        while self.running:
+            try:
+                item = self._capture_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+            data, captured_at = item
+            samples = np.frombuffer(data, dtype=np.float32)
+            self.current_volume = float(np.sqrt(np.mean(samples * samples))) if samples.size else 0.0
+
+            with self._targets_lock:
+                targets = [t for t in self.targets.values() if t.active]
+            payloads = {}
+            for target in targets:
+                payload = payloads.get(target.codec_name)
+                if payload is None:
+                    encoder = self._encoders.get(target.codec_name)
+                    if encoder is None:
+                        encoder = self._encoders[target.codec_name] = voice_codec.create_codec(target.codec_name, self.RATE)
+                    payload = payloads[target.codec_name] = encoder.encode(data)
+                target.enqueue(payload, captured_at)
+        self.current_volume = 0.0
+
+    def get_stats(self):
+        """Per-target send counters and latency, keyed by kiosk name."""
+        with self._targets_lock:
+            targets = dict(self.targets)
+        return {name: target.get_stats() for name, target in targets.items()}
+
+    def _close_audio(self):
+        if self.tap:
+            self.tap.close() # The device itself stays open while a kiosk's talk stream still taps it
+            self.tap = None
+
+    def stop(self):
+        self.running = False
+        self._close_audio()
+        try:
+            self._capture_queue.put_nowait(None) # Wake the capture thread
+        except queue.Full:
+            pass
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        with self._targets_lock:
+            targets = list(self.targets.values())
+            self.targets = {}
+        for target in targets:
+            target.close()
+        self._encoders = {}
+        print("[broadcast intercom] Broadcast stopped.")
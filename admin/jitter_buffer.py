@@ -0,0 +1,148 @@
+# jitter_buffer.py
+# Shared by the kiosk (AudioServer) and the admin (AudioClient); keep both copies identical.
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+class JitterBuffer:
+    """
+    Adaptive playout buffer between a voice socket and a callback-driven
+    output stream.
+
+    The network thread push()es float32 chunks as they arrive; the output
+    stream's callback read()s fixed-size blocks. Playout starts once the
+    buffer holds the target depth, which follows the smoothed inter-arrival
+    jitter (RFC 3550 style estimator). When the buffer runs dry the last
+    block is repeated with a decaying gain for a few blocks, then playout
+    goes silent and rebuffers. A backlog well past the target (e.g. after a
+    stall that delivered a burst) is trimmed back to the target.
+
+    Starvation only counts as an underrun if audio resumes within
+    SPURT_GAP seconds; longer gaps are the end of a talk spurt.
+    """
+    MIN_TARGET_MS = 30.0
+    MAX_TARGET_MS = 400.0
+    JITTER_MULTIPLIER = 3.0 # Target = one chunk + this many times the smoothed jitter
+    CONCEAL_BLOCKS = 3 # Faded repeats of the last block before going silent
+    SPURT_GAP = 0.5 # Seconds without audio that end a talk spurt
+
+    def __init__(self, rate, channels=1):
+        self.rate = rate
+        self.channels = channels
+        self._lock = threading.Lock()
+        self._chunks = deque() # float32 sample arrays, oldest first
+        self._offset = 0 # Samples already played from _chunks[0]
+        self._buffered = 0 # Samples queued
+        self._target = int(rate * self.MIN_TARGET_MS / 1000.0) * channels
+        self._jitter = 0.0 # Smoothed inter-arrival jitter in seconds
+        self._last_arrival = None
+        self._playing = False # False while (re)buffering up to the target
+        self._last_block = None
+        self._conceal_count = 0
+        self._starved_at = None # When playout last ran dry
+        self.output_latency = 0.0 # Device latency reported by the output stream, seconds
+
+        # Counters
+        self.underruns = 0
+        self.overruns = 0
+        self.concealed_samples = 0
+        self.dropped_samples = 0
+        self.max_latency_ms = 0.0
+
+    def push(self, data):
+        """Queues a chunk of float32 audio received from the network."""
+        samples = np.frombuffer(bytes(data), dtype=np.float32)
+        if samples.size == 0:
+            return
+        now = time.perf_counter()
+        chunk_seconds = samples.size / float(self.rate * self.channels)
+        with self._lock:
+            if self._starved_at is not None:
+                if now - self._starved_at < self.SPURT_GAP:
+                    self.underruns += 1 # Audio resumed: the gap was a network hiccup
+                self._starved_at = None
+
+            if self._last_arrival is not None and now - self._last_arrival < self.SPURT_GAP:
+                deviation = abs((now - self._last_arrival) - chunk_seconds)
+                self._jitter += (deviation - self._jitter) / 16.0
+            self._last_arrival = now
+
+            target_ms = (chunk_seconds + self.JITTER_MULTIPLIER * self._jitter) * 1000.0
+            target_ms = max(self.MIN_TARGET_MS, min(self.MAX_TARGET_MS, target_ms))
+            self._target = int(self.rate * target_ms / 1000.0) * self.channels
+
+            self._chunks.append(samples)
+            self._buffered += samples.size
+
+            # Trim a backlog far beyond the target so latency doesn't stay high
+            limit = max(2 * self._target, self._target + 2 * samples.size)
+            if self._buffered > limit:
+                self.overruns += 1
+                while self._buffered - (self._chunks[0].size - self._offset) >= self._target:
+                    dropped = self._chunks.popleft()
+                    self._buffered -= dropped.size - self._offset
+                    self.dropped_samples += dropped.size - self._offset
+                    self._offset = 0
+
+            latency_ms = self._latency_ms_locked()
+            if latency_ms > self.max_latency_ms:
+                self.max_latency_ms = latency_ms
+
+    def read(self, frame_count):
+        """Returns frame_count frames of float32 audio for the output stream. Never blocks."""
+        wanted = frame_count * self.channels
+        out = np.zeros(wanted, dtype=np.float32)
+        with self._lock:
+            if not self._playing:
+                if self._buffered < self._target:
+                    return out.tobytes() # Still buffering: silence
+                self._playing = True
+
+            filled = 0
+            while filled < wanted and self._chunks:
+                chunk = self._chunks[0]
+                take = min(wanted - filled, chunk.size - self._offset)
+                out[filled:filled + take] = chunk[self._offset:self._offset + take]
+                filled += take
+                self._offset += take
+                self._buffered -= take
+                if self._offset >= chunk.size:
+                    self._chunks.popleft()
+                    self._offset = 0
+
+            if filled < wanted:
+                # Ran dry: conceal with a fading repeat of the last block, then rebuffer
+                if self._starved_at is None:
+                    self._starved_at = time.perf_counter()
+                if self._last_block is not None and self._conceal_count < self.CONCEAL_BLOCKS:
+                    gain = 0.5 ** (self._conceal_count + 1)
+                    out[filled:] = np.resize(self._last_block, wanted - filled) * gain
+                    self.concealed_samples += wanted - filled
+                self._conceal_count += 1
+                if self._conceal_count >= self.CONCEAL_BLOCKS:
+                    self._playing = False
+                    self._last_block = None
+            else:
+                self._conceal_count = 0
+                self._last_block = out.copy()
+        return out.tobytes()
+
+    def _latency_ms_locked(self):
+        return (self._buffered / float(self.rate * self.channels) + self.output_latency) * 1000.0
+
+    def get_stats(self):
+        """Counters for the stats panel; durations in milliseconds."""
+        per_ms = self.rate * self.channels / 1000.0
+        with self._lock:
+            return {
+                'underruns': self.underruns,
+                'overruns': self.overruns,
+                'concealed_ms': round(self.concealed_samples / per_ms),
+                'dropped_ms': round(self.dropped_samples / per_ms),
+                'jitter_ms': round(self._jitter * 1000.0, 1),
+                'target_ms': round(self._target / per_ms),
+                'latency_ms': round(self._latency_ms_locked()),
+                'max_latency_ms': round(self.max_latency_ms),
+            }
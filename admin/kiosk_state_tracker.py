@@ -22,6 +22,10 @@ class KioskStateTracker:
             'music_volume_level': msg.get('music_volume_level', 7),
             'hint_volume_level': msg.get('hint_volume_level', 7),
             'video_playing': msg.get('video_playing', False),
+            'video_stats': msg.get('video_stats', None),
+            'voice_stats': msg.get('voice_stats', None),
+            'voice_codecs': msg.get('voice_codecs', None),
+            'audio_engine_stats': msg.get('audio_engine_stats', None),
             'current_hint_text': msg.get('current_hint_text', None),
             'current_hint_image': msg.get('current_hint_image', None),
         }
@@ -501,6 +501,16 @@ class NetworkBroadcastHandler:
         }
         self._send_tracked_message(message, computer_name)
 
+    def send_preload_video_command(self, computer_name, video_type):
+        """Asks the kiosk to warm-start a video so a following video_command plays instantly."""
+        message = {
+            'type': 'preload_video',
+            'command_id': str(uuid.uuid4()),
+            'computer_name': computer_name,
+            'video_type': video_type
+        }
+        self._send_tracked_message(message, computer_name)
+
     def send_clear_hints_command(self, computer_name):
         """Sends a command to clear hints on the kiosk."""
         message = {
@@ -0,0 +1,162 @@
+# screenshot_client.py
+import socket
+import struct
+import threading
+import io
+import json
+from time import time
+
+import numpy as np # type: ignore
+from PIL import Image
+
+# Must match the kiosk's screenshot_server.py
+FRAME_FULL = 1
+FRAME_DELTA = 2
+FRAME_HEADER = struct.Struct("<BHHHH")
+
+class ScreenshotClient:
+    """
+    Receives a kiosk's tile-diff screenshot stream and keeps the assembled
+    frame. The kiosk only sends frames while this client holds a lease, see
+    subscribe(). on_frame((width, height), rgb_bytes) is called from the
+    receive thread with a copy of the frame whenever any tile changed.
+    """
+    def __init__(self, on_frame=None):
+        self.on_frame = on_frame
+        self.running = False
+        self.current_socket = None
+        self.connection_timeout = 3
+        self.connecting = False # Set by callers that connect from a background thread
+        self.canvas = None # Padded (rows*tile, cols*tile, 3) frame being assembled
+        self.frame_size = None # (width, height) of the real frame inside the canvas
+        self.last_activity = 0 # Time of the last frame or "unchanged" marker
+        self.lease_expires = 0 # When our current lease runs out (by our clock)
+        self._send_lock = threading.Lock()
+        self.frames = 0
+        self.bytes_received = 0
+
+    def connect(self, host, port=8092):
+        if self.current_socket:
+            self.disconnect()
+
+        try:
+            self.current_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.current_socket.settimeout(self.connection_timeout)
+            self.current_socket.connect((host, port))
+            self.current_socket.settimeout(None)
+            self.current_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.running = True
+            self.canvas = None
+            self.last_activity = time()
+            self.lease_expires = 0
+            threading.Thread(target=self.receive_frames, daemon=True).start()
+            return True
+        except Exception as e:
+            print(f"[screenshot client] Connection to {host}:{port} failed: {e}")
+            self.disconnect()
+            return False
+        finally:
+            self.connecting = False
+
+    def _send_request(self, request):
+        body = json.dumps(request).encode('utf-8')
+        current_socket = self.current_socket
+        if current_socket is None:
+            return False
+        try:
+            with self._send_lock:
+                current_socket.sendall(struct.pack("Q", len(body)) + body)
+            return True
+        except Exception as e:
+            print(f"[screenshot client] Error sending {request.get('type')} request: {e}")
+            self.disconnect()
+            return False
+
+    def subscribe(self, interval, height, seconds):
+        """
+        Takes or renews a lease: the kiosk pushes a frame every interval seconds,
+        height pixels high, for the next seconds seconds.
+        """
+        if self._send_request({'type': 'subscribe', 'interval': interval, 'height': height, 'seconds': seconds}):
+            self.lease_expires = time() + seconds
+            return True
+        return False
+
+    def cancel(self):
+        """Ends the lease early; the connection stays open."""
+        if self._send_request({'type': 'cancel'}):
+            self.lease_expires = 0
+
+    def lease_remaining(self):
+        return max(0.0, self.lease_expires - time())
+
+    def receive_frames(self):
+        try:
+            while self.running:
+                size_data = self._recv_exactly(struct.calcsize("Q"))
+                if not size_data:
+                    break
+                size = struct.unpack("Q", size_data)[0]
+                self.last_activity = time()
+                if size == 0:
+                    continue # Nothing changed on the kiosk
+
+                payload = self._recv_exactly(size)
+                if not payload:
+                    break
+                self.bytes_received += size + len(size_data)
+                frame = self.apply_frame(bytes(payload))
+                if frame is not None and self.on_frame:
+                    self.on_frame(*frame)
+        except Exception as e:
+            if self.running:
+                print(f"[screenshot client] Receive error: {e}")
+        finally:
+            self.disconnect()
+
+    def apply_frame(self, payload):
+        """Pastes the tiles of one frame into the canvas. Returns ((width, height), RGB bytes), or None."""
+        kind, width, height, size, count = FRAME_HEADER.unpack_from(payload)
+        offset = FRAME_HEADER.size
+        indexes = np.frombuffer(payload, dtype='<u2', count=count, offset=offset).astype(np.intp)
+        offset += count * 2
+
+        rows = -(-height // size)
+        cols = -(-width // size)
+        if kind == FRAME_FULL or self.canvas is None or self.frame_size != (width, height) \
+                or self.canvas.shape[:2] != (rows * size, cols * size):
+            if kind != FRAME_FULL:
+                return None # A delta without the frame it applies to; wait for the next full refresh
+            self.canvas = np.zeros((rows * size, cols * size, 3), dtype=np.uint8)
+            self.frame_size = (width, height)
+
+        grid = np.asarray(Image.open(io.BytesIO(payload[offset:])).convert('RGB'))
+        grid_rows = grid.shape[0] // size
+        tiles = grid.reshape(grid_rows, size, cols, size, 3).swapaxes(1, 2).reshape(grid_rows * cols, size, size, 3)
+        canvas_tiles = self.canvas.reshape(rows, size, cols, size, 3)
+        for slot, index in enumerate(indexes):
+            row, col = divmod(int(index), cols)
+            canvas_tiles[row, :, col, :, :] = tiles[slot]
+        self.frames += 1
+        return (width, height), np.ascontiguousarray(self.canvas[:height, :width]).tobytes()
+
+    def _recv_exactly(self, size):
+        data = bytearray()
+        while len(data) < size:
+            current_socket = self.current_socket
+            if current_socket is None:
+                return None
+            packet = current_socket.recv(min(size - len(data), 65536))
+            if not packet:
+                return None
+            data.extend(packet)
+        return data
+
+    def disconnect(self):
+        self.running = False
+        if self.current_socket:
+            try:
+                self.current_socket.close()
+            except:
+                pass
+            self.current_socket = None
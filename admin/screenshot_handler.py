@@ -5,15 +5,86 @@ import io
 import base64
 import time
 import json
+import threading
+from screenshot_client import ScreenshotClient
+
+class ScreenshotDecodeWorker:
+    """
+    Decodes base64 JPEG screenshots off the network threads. Only the newest
+    undecoded payload per kiosk is kept, so a burst of screenshots costs one
+    decode. on_ready(computer_name, (width, height), rgb_bytes) is called
+    from the worker thread.
+    """
+    def __init__(self, on_ready):
+        self.on_ready = on_ready
+        self._pending = {} # computer_name -> newest base64 payload not yet decoded
+        self._cond = threading.Condition()
+        self.running = True
+        self.decoded = 0
+        self.superseded = 0
+        self._thread = threading.Thread(target=self._run, daemon=True, name="ScreenshotDecode")
+        self._thread.start()
+
+    def submit(self, computer_name, image_data):
+        with self._cond:
+            if computer_name in self._pending:
+                self.superseded += 1
+            self._pending[computer_name] = image_data
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self.running and not self._pending:
+                    self._cond.wait()
+                if not self.running:
+                    return
+                computer_name = next(iter(self._pending))
+                image_data = self._pending.pop(computer_name)
+            try:
+                image = Image.open(io.BytesIO(base64.b64decode(image_data))).convert('RGB')
+                self.decoded += 1
+                self.on_ready(computer_name, image.size, image.tobytes())
+            except Exception as e:
+                print(f"[screenshot handler] Error decoding screenshot from {computer_name}: {e}")
+
+    def stop(self):
+        with self._cond:
+            self.running = False
+            self._pending.clear()
+            self._cond.notify()
 
 class ScreenshotHandler:
+    STREAM_RETRY_SECONDS = 30 # How long to use UDP requests after a kiosk refuses the stream (older kiosk)
+    STREAM_STALE_SECONDS = 10 # No frame or keepalive for this long means the stream is dead
+    # Preview lease: the kiosk pushes a frame this often, at this height, until the lease lapses.
+    # The periodic request renews it once less than half is left.
+    PREVIEW_INTERVAL = 1.0
+    PREVIEW_HEIGHT = 330
+    LEASE_SECONDS = 15
+
     def __init__(self, app):
         self.app = app
         self.last_request_time = {}
         self.request_interval = 1  # seconds
+        self.stream_client = None # Screenshot stream of the selected kiosk
+        self.stream_kiosk = None
+        self._stream_failed_at = {} # computer_name -> time the stream last failed to connect
+        self._stream_lock = threading.Lock()
+
+        # Decoded frames wait here for the Tk thread; only the newest per kiosk is kept
+        self.decode_worker = ScreenshotDecodeWorker(self._frame_ready)
+        self._ready = {} # computer_name -> ((width, height), rgb_bytes)
+        self._ready_lock = threading.Lock()
+        self._flush_scheduled = False
+        self._photo = None # PhotoImage currently shown; reused while the frame size is unchanged
+        self._photo_label = None
 
     def request_screenshot(self, computer_name, force=False):
         """Request a screenshot from a specific kiosk.
+        Non-forced requests keep a screenshot stream open to the kiosk instead and
+        renew its preview lease, falling back to a UDP request when the kiosk has
+        no stream server.
         Args:
             computer_name (str): The name of the target kiosk.
             force (bool): If True, request will bypass video playing checks on kiosk.
@@ -22,6 +93,9 @@ class ScreenshotHandler:
             print("[screenshot handler] No computer_name provided for screenshot request.")
             return
 
+        if not force and self._ensure_stream(computer_name):
+            return
+
         current_time = time.time()
         last_req_time = self.last_request_time.get(computer_name, 0)
 
@@ -36,28 +110,108 @@ class ScreenshotHandler:
         self.last_request_time[computer_name] = current_time
         #print(f"[screenshot handler] Requested screenshot from {computer_name} (Force: {force})")
 
+    def _ensure_stream(self, computer_name):
+        """
+        Keeps the stream pointed at computer_name. Returns True if a stream is
+        (or is being) connected, False when UDP requests should be used instead.
+        """
+        with self._stream_lock:
+            client = self.stream_client
+            if self.stream_kiosk == computer_name and client is not None:
+                if client.connecting:
+                    return True
+                if client.running and time.time() - client.last_activity < self.STREAM_STALE_SECONDS:
+                    if client.lease_remaining() < self.LEASE_SECONDS / 2:
+                        client.subscribe(self.PREVIEW_INTERVAL, self.PREVIEW_HEIGHT, self.LEASE_SECONDS)
+                    return True
+
+            if client is not None:
+                client.disconnect()
+                self.stream_client = None
+                self.stream_kiosk = None
+
+            if time.time() - self._stream_failed_at.get(computer_name, 0) < self.STREAM_RETRY_SECONDS:
+                return False
+
+            client = ScreenshotClient(on_frame=lambda size, rgb, cn=computer_name: self._frame_ready(cn, size, rgb))
+            client.connecting = True
+            self.stream_client = client
+            self.stream_kiosk = computer_name
+
+        def connect():
+            if client.connect(computer_name):
+                print(f"[screenshot handler] Screenshot stream connected to {computer_name}.")
+                client.subscribe(self.PREVIEW_INTERVAL, self.PREVIEW_HEIGHT, self.LEASE_SECONDS)
+            else:
+                self._stream_failed_at[computer_name] = time.time()
+                with self._stream_lock:
+                    if self.stream_client is client:
+                        self.stream_client = None
+                        self.stream_kiosk = None
+
+        threading.Thread(target=connect, daemon=True).start()
+        return True
 
     def handle_screenshot(self, computer_name, image_data):
-        """Handles the received screenshot."""
+        """Handles a screenshot received over UDP. Called from the network thread, so decoding is handed off."""
         if self.app.interface_builder.selected_kiosk != computer_name:
             #print(f"[screenshot handler] Ignoring screenshot from {computer_name} (not selected)")
             return
+        self.decode_worker.submit(computer_name, image_data)
 
+    def _frame_ready(self, computer_name, size, rgb):
+        """
+        Called from the decode worker or a stream's receive thread. Frames that
+        arrive before the Tk thread gets to them replace each other, and only
+        one flush is ever scheduled at a time.
+        """
+        with self._ready_lock:
+            self._ready[computer_name] = (size, rgb)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
         try:
-            image_bytes = base64.b64decode(image_data)
-            image = Image.open(io.BytesIO(image_bytes))
-
-            # Convert to PhotoImage and update the label
-            photo = ImageTk.PhotoImage(image)
+            self.app.root.after(0, self._flush_ready)
+        except Exception:
+            with self._ready_lock:
+                self._flush_scheduled = False # Root is gone (shutting down)
 
-            # Make sure the label exists
-            if 'image_display_label' in self.app.interface_builder.stats_elements:
-                self.app.interface_builder.stats_elements['image_display_label'].config(image=photo)
-                self.app.interface_builder.stats_elements['image_display_label'].image = photo  # Keep reference
-            else:
-                print("[screenshot handler] Error: image_display_label not found in stats_elements")
+    def _flush_ready(self):
+        """Tk thread: shows the newest frame of the selected kiosk and drops the rest."""
+        with self._ready_lock:
+            ready, self._ready = self._ready, {}
+            self._flush_scheduled = False
+        frame = ready.get(self.app.interface_builder.selected_kiosk)
+        if frame:
+            self.show_frame(*frame)
 
+    def show_frame(self, size, rgb):
+        """Tk thread: swaps an RGB buffer into the preview label, pasting into the current PhotoImage when it fits."""
+        label = self.app.interface_builder.stats_elements.get('image_display_label')
+        if label is None:
+            print("[screenshot handler] Error: image_display_label not found in stats_elements")
+            return
+        try:
+            if not label.winfo_exists():
+                return
+            image = Image.frombuffer('RGB', size, rgb, 'raw', 'RGB', 0, 1)
+            photo = self._photo
+            if photo is not None and self._photo_label is label and getattr(label, 'image', None) is photo \
+                    and (photo.width(), photo.height()) == size:
+                photo.paste(image)
+                return
+            photo = ImageTk.PhotoImage(image)
+            label.config(image=photo)
+            label.image = photo  # Keep reference
+            self._photo = photo
+            self._photo_label = label
         except Exception as e:
             print(f"[screenshot handler] Error displaying screenshot: {e}")
-            import traceback
-            traceback.print_exc()
\ No newline at end of file
+
+    def stop(self):
+        self.decode_worker.stop()
+        with self._stream_lock:
+            if self.stream_client:
+                self.stream_client.disconnect()
+            self.stream_client = None
+            self.stream_kiosk = None
@@ -183,6 +183,9 @@ def setup_stats_panel(interface_builder, computer_name):
         width=10
     )
     video_dropdown.pack(side='left', padx=(3,10))
+    # Warm-start the selected video on the kiosk now and whenever the selection changes
+    video_dropdown.bind('<<ComboboxSelected>>', lambda e: interface_builder.preload_video(computer_name))
+    interface_builder.preload_video(computer_name)
 
     # Add skip button
     skip_btn = tk.Button(
@@ -669,6 +672,18 @@ def setup_stats_panel(interface_builder, computer_name):
         speak_btn.disable_mic_icon = disable_mic_icon
     speak_btn.pack(side='left', padx=5)
 
+    # Speak to every kiosk being listened to at once
+    broadcast_btn = tk.Button(
+        control_frame,
+        text="Stop Broadcast" if interface_builder.broadcast else "Broadcast",
+        font=('Arial', 8),
+        command=interface_builder.toggle_broadcast,
+        bg='#ffcccc' if interface_builder.broadcast else 'systemButtonFace',
+        activebackground='#ffcccc' if interface_builder.broadcast else 'systemButtonFace',
+        cursor="hand2"
+    )
+    broadcast_btn.pack(side='left', padx=5)
+
 
     # --- START: Microphone Device Selector Button ---
     mic_control_frame = tk.Frame(control_frame, bg='systemButtonFace')
@@ -692,6 +707,7 @@ def setup_stats_panel(interface_builder, computer_name):
     interface_builder.stats_elements['camera_btn'] = camera_btn
     interface_builder.stats_elements['listen_btn'] = listen_btn
     interface_builder.stats_elements['speak_btn'] = speak_btn
+    interface_builder.stats_elements['broadcast_btn'] = broadcast_btn
 
     # ===========================================
     # Video Solutions Section
@@ -1136,6 +1152,42 @@ def setup_stats_panel(interface_builder, computer_name):
     )
     interface_builder.stats_elements['last_prop_label'].pack(side='top', pady=stats_panel_ypadding, fill='x')
 
+    # Video A/V sync label (filled in by update_stats_display)
+    interface_builder.stats_elements['video_stats_label'] = tk.Label(
+        stats_vertical_frame,
+        text="Video Sync:\nN/A",
+        font=('Arial', 7, 'bold'),
+        fg='black',
+        bg='#E0E0E0',
+        anchor='w',
+        justify='left'
+    )
+    interface_builder.stats_elements['video_stats_label'].pack(side='top', pady=stats_panel_ypadding, fill='x')
+
+    # Voice link jitter buffer label (filled in by update_stats_display)
+    interface_builder.stats_elements['voice_stats_label'] = tk.Label(
+        stats_vertical_frame,
+        text="Voice Link:\nN/A",
+        font=('Arial', 7, 'bold'),
+        fg='black',
+        bg='#E0E0E0',
+        anchor='w',
+        justify='left'
+    )
+    interface_builder.stats_elements['voice_stats_label'].pack(side='top', pady=stats_panel_ypadding, fill='x')
+
+    # Kiosk software mixer load label (filled in by update_stats_display)
+    interface_builder.stats_elements['audio_engine_label'] = tk.Label(
+        stats_vertical_frame,
+        text="Audio Engine:\nN/A",
+        font=('Arial', 7, 'bold'),
+        fg='black',
+        bg='#E0E0E0',
+        anchor='w',
+        justify='left'
+    )
+    interface_builder.stats_elements['audio_engine_label'].pack(side='top', pady=stats_panel_ypadding, fill='x')
+
     # --- Set Initial Device Label (on the button) --- 
     initial_audio_client = interface_builder.audio_clients.get(computer_name)
     # Get the button reference
@@ -15,6 +15,7 @@ class VideoClient:
         self.current_frame = None
         self.frame_ready = threading.Event()
         self.connection_timeout = 3
+        self.last_activity = 0  # Time of the last frame or "unchanged" marker
         
     def connect(self, host, port=8089):
         if self.current_socket:
@@ -42,7 +43,12 @@ class VideoClient:
                 if not size_data:
                     break
                 frame_size = struct.unpack("Q", size_data)[0]
-                
+                self.last_activity = time()
+
+                # Zero-length frame: scene unchanged, keep showing the last frame
+                if frame_size == 0:
+                    continue
+
                 # Get frame data
                 frame_data = self._recv_exactly(frame_size)
                 if not frame_data:
@@ -0,0 +1,277 @@
+# voice_codec.py
+# Shared by the kiosk (AudioServer) and the admin (AudioClient); keep both copies identical.
+"""
+Voice codecs for the kiosk/admin voice link, plus the connect-time handshake
+that picks one.
+
+Both ends capture and play float32 mono at 44.1 kHz. A codec turns one
+captured chunk into one wire payload and back:
+
+    pcm_f32    raw float32 at the device rate (the original wire format, fallback)
+    mulaw16k   resampled to 16 kHz, 8-bit mu-law companding (~128 kbps, 11x smaller)
+    adpcm16k   resampled to 16 kHz, 4-bit IMA ADPCM (~64 kbps, 22x smaller, more CPU)
+
+Handshake: the kiosk lists its codecs in its stats ("voice_codecs"). Only
+then does the admin (the connecting side) send HELLO_MAGIC, a length and a
+JSON offer {"codecs": [...]} in preference order; the kiosk answers the same
+way with {"codec": name}. A kiosk that advertises nothing, or a peer that
+sends anything else, is a legacy peer and gets pcm_f32, so either side can be
+upgraded first.
+
+Run this file to benchmark CPU cost per second of audio for each codec.
+"""
+import json
+import struct
+
+import numpy as np
+
+HELLO_MAGIC = 0x564F494345484C4F # "VOICEHLO"; never a plausible chunk size
+PREFERRED_CODECS = ('mulaw16k', 'adpcm16k', 'pcm_f32')
+FALLBACK_CODEC = 'pcm_f32'
+VOICE_RATE = 16000
+
+def build_hello(message):
+    """Frames a handshake message: magic, JSON length, JSON."""
+    payload = json.dumps(message).encode('utf-8')
+    return struct.pack("Q", HELLO_MAGIC) + struct.pack("Q", len(payload)) + payload
+
+def choose_codec(offered):
+    """Picks the first offered codec this side supports, in the offerer's order."""
+    for name in offered or ():
+        if name in CODECS:
+            return name
+    return FALLBACK_CODEC
+
+def create_codec(name, device_rate):
+    return CODECS.get(name, CODECS[FALLBACK_CODEC])(device_rate)
+
+def _lowpass_taps(cutoff, taps=31):
+    """Windowed-sinc low-pass FIR; cutoff in cycles per input sample."""
+    n = np.arange(taps) - (taps - 1) / 2.0
+    h = np.sinc(2.0 * cutoff * n) * np.hamming(taps)
+    return (h / h.sum()).astype(np.float32)
+
+class StreamResampler:
+    """
+    Chunk-by-chunk linear-interpolation resampler that carries its phase and
+    last sample across chunks, so chunk boundaries don't click. Downsampling
+    runs an anti-aliasing FIR first.
+    """
+    def __init__(self, src_rate, dst_rate):
+        self.step = src_rate / float(dst_rate) # Input samples per output sample
+        self._pos = 0.0
+        self._tail = np.zeros(0, dtype=np.float32)
+        self._taps = _lowpass_taps(0.45 * dst_rate / src_rate) if dst_rate < src_rate else None
+        self._history = np.zeros(len(self._taps) - 1, dtype=np.float32) if self._taps is not None else None
+
+    def process(self, samples):
+        if self._taps is not None:
+            padded = np.concatenate((self._history, samples))
+            self._history = padded[-(len(self._taps) - 1):]
+            samples = np.convolve(padded, self._taps, mode='valid').astype(np.float32)
+
+        buf = np.concatenate((self._tail, samples))
+        last = len(buf) - 1
+        if last < self._pos:
+            self._tail = buf
+            return np.zeros(0, dtype=np.float32)
+        count = int((last - self._pos) // self.step) + 1
+        positions = self._pos + self.step * np.arange(count)
+        out = np.interp(positions, np.arange(len(buf)), buf).astype(np.float32)
+        self._pos = self._pos + self.step * count - last
+        self._tail = buf[-1:]
+        return out
+
+class PcmCodec:
+    """Raw float32 at the device rate."""
+    name = 'pcm_f32'
+
+    def __init__(self, device_rate):
+        self.device_rate = device_rate
+
+    def encode(self, data):
+        return bytes(data)
+
+    def decode(self, payload):
+        return bytes(payload)
+
+class MuLawCodec:
+    """16 kHz, 8-bit mu-law (mu = 255) companding; fully vectorized."""
+    name = 'mulaw16k'
+    MU = 255.0
+
+    def __init__(self, device_rate):
+        self.device_rate = device_rate
+        self._down = StreamResampler(device_rate, VOICE_RATE)
+        self._up = StreamResampler(VOICE_RATE, device_rate)
+        self._log_mu = np.log1p(self.MU)
+
+    def encode(self, data):
+        samples = self._down.process(np.frombuffer(data, dtype=np.float32))
+        x = np.clip(samples, -1.0, 1.0)
+        y = np.sign(x) * np.log1p(self.MU * np.abs(x)) / self._log_mu
+        return np.round((y + 1.0) * 127.5).astype(np.uint8).tobytes()
+
+    def decode(self, payload):
+        y = np.frombuffer(payload, dtype=np.uint8).astype(np.float32) / 127.5 - 1.0
+        x = np.sign(y) * np.expm1(np.abs(y) * self._log_mu) / self.MU
+        return self._up.process(x.astype(np.float32)).tobytes()
+
+_IMA_INDEX_TABLE = (-1, -1, -1, -1, 2, 4, 6, 8, -1, -1, -1, -1, 2, 4, 6, 8)
+_IMA_STEP_TABLE = (
+    7, 8, 9, 10, 11, 12, 13, 14, 16, 17, 19, 21, 23, 25, 28, 31, 34, 37, 41, 45,
+    50, 55, 60, 66, 73, 80, 88, 97, 107, 118, 130, 143, 157, 173, 190, 209, 230,
+    253, 279, 307, 337, 371, 408, 449, 494, 544, 598, 658, 724, 796, 876, 963,
+    1060, 1166, 1282, 1411, 1552, 1707, 1878, 2066, 2272, 2499, 2749, 3024, 3327,
+    3660, 4026, 4428, 4871, 5358, 5894, 6484, 7132, 7845, 8630, 9493, 10442,
+    11487, 12635, 13899, 15289, 16818, 18500, 20350, 22385, 24623, 27086, 29794,
+    32767,
+)
+
+class AdpcmCodec:
+    """
+    16 kHz, 4-bit IMA ADPCM. Each payload starts with the predictor state it
+    was encoded from ('<hBH': predictor, step index, sample count), so packets
+    decode independently. The predictor loop is inherently sequential.
+    """
+    name = 'adpcm16k'
+    HEADER = struct.Struct('<hBH')
+
+    def __init__(self, device_rate):
+        self.device_rate = device_rate
+        self._down = StreamResampler(device_rate, VOICE_RATE)
+        self._up = StreamResampler(VOICE_RATE, device_rate)
+        self._predictor = 0
+        self._index = 0
+
+    def encode(self, data):
+        samples = self._down.process(np.frombuffer(data, dtype=np.float32))
+        pcm = np.clip(np.round(samples * 32767.0), -32768, 32767).astype(np.int32).tolist()
+        header = self.HEADER.pack(self._predictor, self._index, len(pcm))
+        predictor, index = self._predictor, self._index
+        steps, index_table = _IMA_STEP_TABLE, _IMA_INDEX_TABLE
+        codes = bytearray(len(pcm))
+        for i, sample in enumerate(pcm):
+            step = steps[index]
+            diff = sample - predictor
+            code = 0
+            if diff < 0:
+                code = 8
+                diff = -diff
+            delta = step >> 3
+            if diff >= step:
+                code |= 4
+                diff -= step
+                delta += step
+            step >>= 1
+            if diff >= step:
+                code |= 2
+                diff -= step
+                delta += step
+            step >>= 1
+            if diff >= step:
+                code |= 1
+                delta += step
+            predictor = predictor - delta if code & 8 else predictor + delta
+            if predictor > 32767:
+                predictor = 32767
+            elif predictor < -32768:
+                predictor = -32768
+            index += index_table[code]
+            if index < 0:
+                index = 0
+            elif index > 88:
+                index = 88
+            codes[i] = code
+        self._predictor, self._index = predictor, index
+
+        nibbles = np.frombuffer(bytes(codes), dtype=np.uint8)
+        if len(nibbles) % 2:
+            nibbles = np.append(nibbles, np.uint8(0))
+        packed = nibbles[0::2] | (nibbles[1::2] << 4)
+        return header + packed.astype(np.uint8).tobytes()
+
+    def decode(self, payload):
+        predictor, index, count = self.HEADER.unpack_from(payload)
+        packed = np.frombuffer(payload, dtype=np.uint8, offset=self.HEADER.size)
+        nibbles = np.empty(len(packed) * 2, dtype=np.uint8)
+        nibbles[0::2] = packed & 0x0F
+        nibbles[1::2] = packed >> 4
+        steps, index_table = _IMA_STEP_TABLE, _IMA_INDEX_TABLE
+        out = [0] * count
+        for i, code in enumerate(nibbles[:count].tolist()):
+            step = steps[index]
+            delta = step >> 3
+            if code & 4:
+                delta += step
+            if code & 2:
+                delta += step >> 1
+            if code & 1:
+                delta += step >> 2
+            predictor = predictor - delta if code & 8 else predictor + delta
+            if predictor > 32767:
+                predictor = 32767
+            elif predictor < -32768:
+                predictor = -32768
+            index += index_table[code]
+            if index < 0:
+                index = 0
+            elif index > 88:
+                index = 88
+            out[i] = predictor
+        samples = np.array(out, dtype=np.float32) / 32767.0
+        return self._up.process(samples).tobytes()
+
+CODECS = {codec.name: codec for codec in (MuLawCodec, AdpcmCodec, PcmCodec)}
+
+def benchmark(seconds=10.0, device_rate=44100, chunk=1024):
+    """Encodes and decodes synthetic speech-band audio with every codec; returns a list of result dicts."""
+    import time
+    t = np.arange(int(seconds * device_rate)) / float(device_rate)
+    rng = np.random.default_rng(1)
+    # Harmonics of a wobbling 140 Hz voice plus breath noise, at conversational level
+    f0 = 140.0 + 20.0 * np.sin(2 * np.pi * 3.0 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / device_rate
+    signal = sum(0.3 / k * np.sin(k * phase) for k in range(1, 12)) + 0.01 * rng.standard_normal(len(t))
+    signal = (signal * 0.5).astype(np.float32)
+    chunks = [signal[i:i + chunk].tobytes() for i in range(0, len(signal) - chunk + 1, chunk)]
+    audio_seconds = len(chunks) * chunk / float(device_rate)
+
+    results = []
+    for name in CODECS:
+        codec = create_codec(name, device_rate)
+        start = time.process_time()
+        payloads = [codec.encode(c) for c in chunks]
+        encode_cpu = time.process_time() - start
+        start = time.process_time()
+        decoded = [codec.decode(p) for p in payloads]
+        decode_cpu = time.process_time() - start
+
+        wire_bytes = sum(len(p) + 8 for p in payloads) # Including the size header
+        original = np.frombuffer(b"".join(chunks), dtype=np.float32)
+        restored = np.frombuffer(b"".join(decoded), dtype=np.float32)
+        # Align for the resampling filters' delay before measuring SNR
+        delay = 0
+        if name != FALLBACK_CODEC:
+            window = original[:device_rate]
+            lags = range(0, 64)
+            delay = max(lags, key=lambda lag: float(np.dot(window[:-64], restored[lag:lag + len(window) - 64])))
+        length = min(len(original), len(restored) - delay)
+        error = original[:length] - restored[delay:delay + length]
+        snr = 10 * np.log10(np.mean(original[:length] ** 2) / max(np.mean(error ** 2), 1e-12))
+        results.append({
+            'codec': name,
+            'kbps': wire_bytes * 8 / audio_seconds / 1000.0,
+            'encode_ms_per_s': encode_cpu * 1000.0 / audio_seconds,
+            'decode_ms_per_s': decode_cpu * 1000.0 / audio_seconds,
+            'snr_db': float(snr),
+        })
+    return results
+
+if __name__ == "__main__":
+    # python voice_codec.py [seconds]
+    import sys
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    print(f"{'codec':<10} {'kbps':>8} {'encode ms/s':>12} {'decode ms/s':>12} {'SNR dB':>7}")
+    for r in benchmark(seconds):
+        print(f"{r['codec']:<10} {r['kbps']:8.1f} {r['encode_ms_per_s']:12.2f} {r['decode_ms_per_s']:12.2f} {r['snr_db']:7.1f}")
@@ -0,0 +1,289 @@
+# asset_cache.py
+print("[asset cache] Beginning imports ...", flush=True)
+print("[asset cache] Importing PyQt5...", flush=True)
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QPixmap, QPainter, QColor, QPalette, QTransform, QFontMetrics, QTextDocument, QAbstractTextDocumentLayout
+print("[asset cache] Imported PyQt5.", flush=True)
+
+print("[asset cache] Importing os...", flush=True)
+import os
+print("[asset cache] Imported os.", flush=True)
+
+print("[asset cache] Importing threading...", flush=True)
+import threading
+print("[asset cache] Imported threading.", flush=True)
+
+print("[asset cache] Importing collections...", flush=True)
+from collections import OrderedDict
+print("[asset cache] Imported collections.", flush=True)
+print("[asset cache] Ending imports ...", flush=True)
+
+class AssetCache:
+    """
+    Scaled overlay images keyed by (path, target size, scale mode).
+
+    Images are read and scaled as QImages, which is safe off the GUI thread,
+    so prewarm() can do the slow part in the background. QPixmaps can only be
+    made on the GUI thread: get_pixmap() and promote_pending() convert once and
+    keep the pixmap, so later lookups hand back a ready pixmap.
+
+    Every entry remembers the file's mtime and size. A lookup whose file has
+    changed since (e.g. after a sync) drops the entry and reloads it.
+    """
+    # Scale modes: stretch to the exact size, fit inside it, or cover it
+    MODES = {
+        'stretch': Qt.IgnoreAspectRatio,
+        'fit': Qt.KeepAspectRatio,
+        'fill': Qt.KeepAspectRatioByExpanding
+    }
+    MAX_BYTES = 256 * 1024 * 1024 # Least recently used entries are dropped beyond this
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        print("[asset cache] Initializing AssetCache...", flush=True)
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict() # key -> [signature, QImage or None, QPixmap or None, bytes]
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._pending = [] # (path, size, mode) waiting for the prewarm thread
+        self._prewarm_thread = None
+        self._prewarm_done = []
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.evictions = 0
+        print("[asset cache] AssetCache initialized.", flush=True)
+
+    @staticmethod
+    def _key(path, size, mode):
+        return (os.path.normcase(os.path.abspath(path)), tuple(size) if size else None, mode)
+
+    @staticmethod
+    def _signature(path):
+        try:
+            st = os.stat(path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    @classmethod
+    def load_image(cls, path, size=None, mode='fit'):
+        """Reads and scales one image. Only uses QImage, so any thread may call it."""
+        image = QImage(path)
+        if image.isNull():
+            return None
+        if size:
+            image = image.scaled(size[0], size[1], cls.MODES[mode], Qt.SmoothTransformation)
+        # The format QPixmap uses on the raster engine, so fromImage() doesn't convert again
+        return image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+
+    def _store(self, key, signature, image, pixmap):
+        source = pixmap if pixmap is not None else image
+        size = source.width() * source.height() * 4
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._bytes -= old[3]
+            self._entries[key] = [signature, image, pixmap, size]
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, dropped = self._entries.popitem(last=False)
+                self._bytes -= dropped[3]
+                self.evictions += 1
+
+    def get_pixmap(self, path, size=None, mode='fit'):
+        """
+        GUI thread only. Returns the image at path scaled to size with mode,
+        loading it now if it isn't cached or has changed on disk. Returns None
+        if the file is missing or unreadable.
+        """
+        signature = self._signature(path)
+        if signature is None:
+            return None
+        key = self._key(path, size, mode)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                if entry[2] is None:
+                    entry[2] = QPixmap.fromImage(entry[1])
+                    entry[1] = None
+                self.hits += 1
+                return entry[2]
+            if entry is not None:
+                self.reloads += 1
+            else:
+                self.misses += 1
+
+        image = self.load_image(path, size, mode)
+        if image is None:
+            print(f"[asset cache] Failed to load image: {path}", flush=True)
+            return None
+        pixmap = QPixmap.fromImage(image)
+        self._store(key, signature, None, pixmap)
+        return pixmap
+
+    def promote_pending(self):
+        """GUI thread only. Turns prewarmed QImages into QPixmaps."""
+        with self._lock:
+            for entry in self._entries.values():
+                if entry[2] is None and entry[1] is not None:
+                    entry[2] = QPixmap.fromImage(entry[1])
+                    entry[1] = None
+
+    def prewarm(self, assets, on_done=None):
+        """
+        Loads (path, size, mode) assets on a background thread, skipping any that
+        are cached and unchanged. on_done is called from that thread once the
+        queue is empty, e.g. to schedule promote_pending() on the GUI thread.
+        """
+        with self._lock:
+            self._pending.extend(assets)
+            if on_done:
+                self._prewarm_done.append(on_done)
+            if self._prewarm_thread is not None:
+                return # The running thread picks up the new assets
+            self._prewarm_thread = threading.Thread(target=self._prewarm_worker, daemon=True, name="AssetPrewarm")
+            self._prewarm_thread.start()
+
+    def _prewarm_worker(self):
+        loaded = 0
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._prewarm_thread = None
+                    callbacks, self._prewarm_done = self._prewarm_done, []
+                    break
+                path, size, mode = self._pending.pop(0)
+            try:
+                signature = self._signature(path)
+                if signature is None:
+                    continue
+                key = self._key(path, size, mode)
+                with self._lock:
+                    entry = self._entries.get(key)
+                    if entry is not None and entry[0] == signature:
+                        continue
+                image = self.load_image(path, size, mode)
+                if image is not None:
+                    self._store(key, signature, image, None)
+                    loaded += 1
+            except Exception as e:
+                print(f"[asset cache] Error prewarming {path}: {e}", flush=True)
+
+        print(f"[asset cache] Prewarm finished: {loaded} loaded, {len(self._entries)} cached "
+              f"({self._bytes / (1024 * 1024):.1f}MB)", flush=True)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"[asset cache] Error in prewarm callback: {e}", flush=True)
+
+    def invalidate(self, path=None):
+        """Drops every cached size of path, or everything when path is None."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            target = os.path.normcase(os.path.abspath(path))
+            for key in [key for key in self._entries if key[0] == target]:
+                self._bytes -= self._entries.pop(key)[3]
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'reloads': self.reloads,
+                'evictions': self.evictions
+            }
+
+class TextLayerCache:
+    """
+    Overlay text rendered once into transparent pixmaps, keyed by (text, font,
+    color, rotation, text width). Showing the same text again, or a countdown
+    that only changes its number, reuses the layers instead of laying out rich
+    text every time. GUI thread only.
+
+    Like AssetCache, the cache is bounded by bytes, not entries: a free-form
+    hint is a window-sized layer of up to a few MB, while the cooldown parts
+    and fixed prompts are a few KB each and stay cached because they are used
+    again all the time.
+    """
+    MAX_BYTES = 32 * 1024 * 1024 # Least recently used layers are dropped beyond this
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._layers = OrderedDict() # key -> (QPixmap, bytes)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _lookup(self, key, render):
+        entry = self._layers.get(key)
+        if entry is not None:
+            self._layers.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        layer = render()
+        size = layer.width() * layer.height() * 4
+        self._layers[key] = (layer, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes and len(self._layers) > 1:
+            _, dropped = self._layers.popitem(last=False)
+            self._bytes -= dropped[1]
+            self.evictions += 1
+        return layer
+
+    @staticmethod
+    def _finish(image, rotation):
+        if rotation:
+            image = image.transformed(QTransform().rotate(rotation), Qt.SmoothTransformation)
+        return QPixmap.fromImage(image)
+
+    def html(self, html, font, color, rotation=0, text_width=-1):
+        """Rich text, laid out exactly as a QGraphicsTextItem with this font and default color would."""
+        def render():
+            document = QTextDocument()
+            document.setDefaultFont(font)
+            if text_width > 0:
+                document.setTextWidth(text_width)
+            document.setHtml(html)
+            size = document.size().toSize()
+            image = QImage(max(1, size.width()), max(1, size.height()), QImage.Format_ARGB32_Premultiplied)
+            image.fill(Qt.transparent)
+            painter = QPainter(image)
+            painter.setRenderHints(QPainter.Antialiasing | QPainter.TextAntialiasing)
+            context = QAbstractTextDocumentLayout.PaintContext()
+            context.palette.setColor(QPalette.Text, QColor(color))
+            document.documentLayout().draw(painter, context)
+            painter.end()
+            return self._finish(image, rotation)
+        return self._lookup(('html', html, font.key(), color, rotation, text_width), render)
+
+    def text(self, text, font, color, rotation=0):
+        """One line of plain text, one font line high and exactly as wide as the text advances."""
+        def render():
+            metrics = QFontMetrics(font)
+            image = QImage(max(1, metrics.horizontalAdvance(text)), metrics.height(), QImage.Format_ARGB32_Premultiplied)
+            image.fill(Qt.transparent)
+            painter = QPainter(image)
+            painter.setRenderHint(QPainter.TextAntialiasing)
+            painter.setFont(font)
+            painter.setPen(QColor(color))
+            painter.drawText(0, metrics.ascent(), text)
+            painter.end()
+            return self._finish(image, rotation)
+        return self._lookup(('text', text, font.key(), color, rotation), render)
+
+    def get_stats(self):
+        return {'layers': len(self._layers), 'bytes': self._bytes, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
+# Shared by all overlays
+asset_cache = AssetCache()
+text_layers = TextLayerCache()
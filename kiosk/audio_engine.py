@@ -0,0 +1,371 @@
+# audio_engine.py
+print("[audio engine] Beginning imports ...", flush=True)
+print("[audio engine] Importing threading...", flush=True)
+import threading
+print("[audio engine] Imported threading.", flush=True)
+print("[audio engine] Importing time...", flush=True)
+import time
+print("[audio engine] Imported time.", flush=True)
+print("[audio engine] Importing weakref...", flush=True)
+import weakref
+print("[audio engine] Imported weakref.", flush=True)
+print("[audio engine] Importing numpy...", flush=True)
+import numpy as np
+print("[audio engine] Imported numpy.", flush=True)
+print("[audio engine] Ending imports ...", flush=True)
+
+class GainRamp:
+    """
+    A gain that moves linearly to a target over a number of samples. render()
+    returns the per-sample gain for the next block, so fades and ducking are
+    applied sample-accurately inside the output callback.
+    """
+    def __init__(self, value=1.0):
+        self.value = float(value)
+        self.target = float(value)
+        self._remaining = 0 # Samples left in the current ramp
+        self._step = 0.0
+
+    def set(self, target, samples=0):
+        target = float(target)
+        if samples <= 0:
+            self.value = self.target = target
+            self._remaining = 0
+        else:
+            self.target = target
+            self._remaining = int(samples)
+            self._step = (target - self.value) / self._remaining
+
+    def render(self, frame_count):
+        """Per-sample gains for the next frame_count frames, or a float when steady."""
+        if self._remaining <= 0:
+            return self.value
+        ramp_len = min(frame_count, self._remaining)
+        gains = np.full(frame_count, self.target, dtype=np.float32)
+        gains[:ramp_len] = self.value + self._step * np.arange(1, ramp_len + 1, dtype=np.float32)
+        self._remaining -= ramp_len
+        self.value = self.target if self._remaining <= 0 else float(gains[ramp_len - 1])
+        return gains
+
+class EngineVoice:
+    """One sound playing on a bus. Samples are kept in their decoded dtype and scaled per block."""
+    def __init__(self, frames, rate, loop=False, gain=1.0, start_frame=0):
+        self.frames = frames # (n, 2) int16 or float32
+        self.rate = rate
+        self.scale = 1.0 / 32768.0 if frames.dtype == np.int16 else 1.0
+        self.loop = loop
+        self.gain = float(gain)
+        self.pos = int(start_frame) % max(1, len(frames))
+        self.done = len(frames) == 0
+        self.output_latency = 0.0
+
+    def read(self, frame_count, out):
+        """Adds the next frame_count frames into out (float32, (frame_count, 2))."""
+        filled = 0
+        total = len(self.frames)
+        scale = self.scale * self.gain
+        while filled < frame_count and not self.done:
+            take = min(frame_count - filled, total - self.pos)
+            out[filled:filled + take] += self.frames[self.pos:self.pos + take] * scale
+            filled += take
+            self.pos += take
+            if self.pos >= total:
+                if self.loop:
+                    self.pos = 0
+                else:
+                    self.done = True
+
+    def get_position(self):
+        """Seconds of this sound that have reached the speakers."""
+        return max(0.0, self.pos / float(self.rate) - self.output_latency)
+
+    def stop(self):
+        self.done = True
+
+class Bus:
+    def __init__(self, name):
+        self.name = name
+        self.voices = []
+        self.volume = GainRamp(1.0) # Level set by the operator
+        self.duck = GainRamp(1.0) # Temporary attenuation, e.g. music under a video
+        self.followers = [] # Callbacks given volume x duck; see AudioEngine.follow_gain()
+        self.published_gain = None # Last gain handed to the followers
+
+class EngineChannel:
+    """
+    pygame.mixer.Channel-style handle on a bus (play/stop/get_busy), so code
+    written against a pygame channel can play through the engine unchanged.
+    Adds get_position(), the sample-accurate playback position.
+    """
+    def __init__(self, engine, bus):
+        self.engine = engine
+        self.bus = bus
+        self.voice = None
+
+    def play(self, sound, loops=0):
+        self.stop()
+        self.voice = self.engine.play(self.bus, sound, loop=loops == -1)
+        return self.voice
+
+    def stop(self):
+        if self.voice is not None:
+            self.voice.stop()
+
+    def get_busy(self):
+        return self.voice is not None and not self.voice.done
+
+    def get_position(self):
+        return self.voice.get_position() if self.voice is not None else 0.0
+
+class AudioEngine:
+    """
+    Software mixer for the kiosk's playback: one PyAudio output stream with a
+    small fixed buffer, mixing named buses in numpy inside the stream callback.
+    Each bus has an operator volume and a duck gain, both ramped per sample,
+    so fades never need a thread that sleeps through volume steps.
+
+    Sounds are decoded by pygame (the SoundCache) and read in place through
+    pygame.sndarray.samples(), so playing a cached Sound copies nothing; only
+    the mixing and output happen here. Long streamed audio (background music)
+    stays on pygame.mixer.music and follows a bus's gain via follow_gain().
+    """
+    FOLLOW_STEP = 1.0 / 128 # pygame.mixer.music volume resolution; smaller gain moves aren't published
+    RATE = 44100
+    CHANNELS = 2
+    BUFFER_FRAMES = 512 # ~11.6 ms per callback
+    BUSES = ('music', 'video', 'hints', 'sfx')
+    LOAD_SMOOTHING = 0.05
+
+    def __init__(self, rate=None, buffer_frames=None):
+        self.rate = rate or self.RATE
+        self.buffer_frames = buffer_frames or self.BUFFER_FRAMES
+        self.buses = {name: Bus(name) for name in self.BUSES}
+        self._lock = threading.Lock()
+        self._audio = None
+        self._stream = None
+        self._pyaudio = None # Module, imported by start()
+        self._converted = weakref.WeakKeyDictionary() # Sound -> frames, only for sounds that can't be read in place
+        self._gain_event = threading.Event()
+        self._follower_thread = None
+        self.output_latency = 0.0
+        self.running = False
+
+        # Callback load: time spent mixing as a fraction of the buffer period
+        self.callbacks = 0
+        self.underflows = 0
+        self.load_avg = 0.0
+        self.load_max = 0.0
+
+    def start(self):
+        """Opens the output stream. Returns False if no output device could be opened."""
+        try:
+            # Imported here rather than at module level so the import runs on the
+            # thread starting the engine, not on the kiosk's first-frame path
+            print("[audio engine] Importing pyaudio...", flush=True)
+            import pyaudio
+            print("[audio engine] Imported pyaudio.", flush=True)
+            self._pyaudio = pyaudio
+            self._audio = pyaudio.PyAudio()
+            self._stream = self._audio.open(
+                format=pyaudio.paFloat32,
+                channels=self.CHANNELS,
+                rate=self.rate,
+                output=True,
+                frames_per_buffer=self.buffer_frames,
+                stream_callback=self._callback
+            )
+            self.output_latency = self._stream.get_output_latency()
+            self.running = True
+            print(f"[audio engine] Output stream open: {self.rate} Hz, {self.buffer_frames}-frame buffer, "
+                  f"{self.output_latency * 1000:.0f} ms output latency.", flush=True)
+            return True
+        except Exception as e:
+            print(f"[audio engine] Could not open output stream: {e}", flush=True)
+            self.stop()
+            return False
+
+    def _to_frames(self, sound):
+        """
+        Converts a pygame Sound or numpy array to (n, 2) frames at the engine rate.
+        A 16-bit stereo Sound at the engine rate (what the managers initialise the
+        mixer with) is returned as a view of the Sound's own buffer. Anything
+        that needs converting is converted once and kept while the Sound lives.
+        """
+        if hasattr(sound, 'get_raw'):
+            import pygame # type: ignore
+            frames = pygame.sndarray.samples(sound) # References the Sound's buffer, no copy
+            source_rate = pygame.mixer.get_init()[0]
+            if frames.ndim == 2 and frames.shape[1] == 2 and frames.dtype == np.int16 and source_rate == self.rate:
+                return frames
+            try:
+                cached = self._converted.get(sound)
+            except TypeError:
+                cached = None
+            if cached is not None:
+                return cached
+        else:
+            frames = np.asarray(sound)
+            source_rate = self.rate
+        if frames.ndim == 1:
+            frames = frames[:, None]
+        if frames.shape[1] == 1:
+            frames = np.repeat(frames, 2, axis=1)
+        elif frames.shape[1] > 2:
+            frames = frames[:, :2]
+        if frames.dtype.kind in 'iu' and frames.dtype != np.int16:
+            frames = frames.astype(np.float32) / float(np.iinfo(frames.dtype).max)
+        elif frames.dtype != np.int16 and frames.dtype != np.float32:
+            frames = frames.astype(np.float32)
+        if source_rate != self.rate and len(frames):
+            # One-off linear resample when the decoder's rate differs from the output's
+            positions = np.arange(0, len(frames) - 1, source_rate / float(self.rate))
+            index = np.arange(len(frames))
+            frames = np.stack([np.interp(positions, index, frames[:, c]) for c in range(2)], axis=1).astype(frames.dtype)
+        frames = np.ascontiguousarray(frames)
+        if hasattr(sound, 'get_raw'):
+            try:
+                self._converted[sound] = frames
+            except TypeError:
+                pass # Not weak-referenceable; converted again next time
+        return frames
+
+    def play(self, bus, sound, loop=False, start_seconds=0.0, gain=1.0, exclusive=False):
+        """Starts sound on bus; returns its EngineVoice. exclusive stops whatever the bus was playing."""
+        voice = EngineVoice(self._to_frames(sound), self.rate, loop=loop, gain=gain,
+                            start_frame=int(max(0.0, start_seconds) * self.rate))
+        voice.output_latency = self.output_latency
+        with self._lock:
+            target = self.buses[bus]
+            if exclusive:
+                for old in target.voices:
+                    old.stop()
+            target.voices.append(voice)
+        return voice
+
+    def channel(self, bus):
+        return EngineChannel(self, bus)
+
+    def follow_gain(self, bus, callback):
+        """
+        Calls callback(gain) with the bus's volume x duck gain whenever it moves,
+        from a helper thread, so audio playing outside the engine (pygame's
+        streamed music) follows the bus's fades and ducking. The callback
+        thread mixes nothing; the stream callback only publishes the value.
+        """
+        with self._lock:
+            self.buses[bus].followers.append(callback)
+            self.buses[bus].published_gain = None # Publish the current gain on the next block
+            if self._follower_thread is None:
+                self._follower_thread = threading.Thread(target=self._follow_loop, daemon=True, name="AudioEngineGain")
+                self._follower_thread.start()
+
+    def _follow_loop(self):
+        while True:
+            self._gain_event.wait()
+            self._gain_event.clear()
+            with self._lock:
+                updates = [(list(target.followers), target.published_gain)
+                           for target in self.buses.values() if target.followers]
+            for followers, gain in updates:
+                for callback in followers:
+                    try:
+                        callback(gain)
+                    except Exception as e:
+                        print(f"[audio engine] Error in gain follower: {e}", flush=True)
+
+    def stop_bus(self, bus):
+        with self._lock:
+            for voice in self.buses[bus].voices:
+                voice.stop()
+
+    def stop_all(self):
+        with self._lock:
+            for target in self.buses.values():
+                for voice in target.voices:
+                    voice.stop()
+
+    def set_volume(self, bus, volume, seconds=0.0):
+        """Sets a bus's operator volume, ramping over seconds."""
+        with self._lock:
+            self.buses[bus].volume.set(max(0.0, min(1.0, volume)), seconds * self.rate)
+
+    def duck(self, bus, gain, seconds=0.2):
+        """Ramps a bus's duck gain (1.0 = not ducked) over seconds, independent of its volume."""
+        with self._lock:
+            self.buses[bus].duck.set(max(0.0, min(1.0, gain)), seconds * self.rate)
+
+    def bus_gain(self, bus):
+        """The bus's current volume x duck gain."""
+        with self._lock:
+            target = self.buses[bus]
+            return target.volume.value * target.duck.value
+
+    def is_busy(self, bus):
+        return any(not voice.done for voice in self.buses[bus].voices)
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        start = time.perf_counter()
+        if status & self._pyaudio.paOutputUnderflow:
+            self.underflows += 1
+        out = np.zeros((frame_count, self.CHANNELS), dtype=np.float32)
+        mix = np.empty_like(out)
+        with self._lock:
+            for target in self.buses.values():
+                volume = target.volume.render(frame_count)
+                duck = target.duck.render(frame_count)
+                if target.followers:
+                    level = target.volume.value * target.duck.value # Where the ramps are after this block
+                    steady = target.volume._remaining <= 0 and target.duck._remaining <= 0
+                    published = target.published_gain
+                    # Publish every audible step of a ramp, and always the value it settles on
+                    if published is None or abs(level - published) >= self.FOLLOW_STEP or (steady and level != published):
+                        target.published_gain = level
+                        self._gain_event.set()
+                if not target.voices:
+                    continue
+                mix.fill(0.0)
+                for voice in target.voices:
+                    voice.read(frame_count, mix)
+                target.voices = [voice for voice in target.voices if not voice.done]
+                gain = volume * duck
+                if isinstance(gain, np.ndarray):
+                    out += mix * gain[:, None]
+                elif gain > 0.0:
+                    out += mix * gain
+        np.clip(out, -1.0, 1.0, out=out)
+
+        load = (time.perf_counter() - start) * self.rate / float(frame_count)
+        self.callbacks += 1
+        self.load_avg += self.LOAD_SMOOTHING * (load - self.load_avg)
+        if load > self.load_max:
+            self.load_max = load
+        return (out.tobytes(), self._pyaudio.paContinue)
+
+    def get_stats(self):
+        """Callback load as a fraction of the buffer period (1.0 = mixing takes the whole buffer)."""
+        return {
+            'buffer_ms': round(self.buffer_frames * 1000.0 / self.rate, 1),
+            'latency_ms': round(self.output_latency * 1000.0),
+            'load_avg': round(self.load_avg, 3),
+            'load_max': round(self.load_max, 3),
+            'callbacks': self.callbacks,
+            'underflows': self.underflows,
+            'voices': sum(len(target.voices) for target in self.buses.values()),
+        }
+
+    def stop(self):
+        self.running = False
+        if self._stream is not None:
+            try:
+                if self._stream.is_active():
+                    self._stream.stop_stream()
+                self._stream.close()
+            except Exception as e:
+                print(f"[audio engine] Error closing output stream: {e}", flush=True)
+            self._stream = None
+        if self._audio is not None:
+            try:
+                self._audio.terminate()
+            except Exception:
+                pass
+            self._audio = None
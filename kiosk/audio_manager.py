@@ -11,6 +11,12 @@ print("[audio_manager] Imported pygame.", flush=True)
 print("[audio_manager] Importing time...", flush=True)
 import time
 print("[audio_manager] Imported time.", flush=True)
+print("[audio_manager] Importing SoundCache from sound_cache...", flush=True)
+from sound_cache import SoundCache
+print("[audio_manager] Imported SoundCache from sound_cache.", flush=True)
+print("[audio_manager] Importing AudioEngine from audio_engine...", flush=True)
+from audio_engine import AudioEngine
+print("[audio_manager] Imported AudioEngine from audio_engine.", flush=True)
 print("[audio_manager] Ending imports ...", flush=True)
 
 class AudioManager:
@@ -36,6 +42,17 @@ class AudioManager:
         self.kiosk_app = kiosk_app  # Keep the reference to KioskApp
         self.hint_audio_dir = "hint_audio_files"
         self.loss_audio_dir = "loss_audio"
+        # Decoded sounds, so cues play without file I/O or mp3 decoding
+        self.sound_cache = SoundCache()
+
+        # Software mixer: one output stream with music/video/hints/sfx buses. pygame still decodes;
+        # if the engine can't open an output device, playback falls back to pygame channels.
+        print("[audio_manager] Starting AudioEngine...", flush=True)
+        self.engine = AudioEngine()
+        if not self.engine.start():
+            print("[audio_manager] AudioEngine unavailable, using pygame mixer channels.", flush=True)
+            self.engine = None
+        self._music_start_ms = 0 # Where in the track the current music was started; get_pos() excludes it
 
         # Room to music mapping (moved INSIDE AudioManager)
         self.room_music_map = {
@@ -54,6 +71,12 @@ class AudioManager:
         # Apply initial music volume if mixer is ready
         if pygame.mixer.get_init():
             pygame.mixer.music.set_volume(self.music_volume_actual) 
+        if self.engine:
+            self.engine.set_volume('music', self.music_volume_actual)
+            self.engine.set_volume('hints', self.hint_volume_actual)
+            # Music streams through pygame.mixer.music (a whole track decoded into memory is tens of MB);
+            # its volume follows the engine's music bus, so operator volume and video ducking still ramp there
+            self.engine.follow_gain('music', self._apply_music_gain)
 
 
     def play_sound(self, sound_name):
@@ -75,8 +98,13 @@ class AudioManager:
                 return
 
             sound_path = os.path.join(self.sound_dir, sound_name)
-            if os.path.exists(sound_path):
-                sound = pygame.mixer.Sound(sound_path)
+            sound = self.sound_cache.get(sound_path)
+            if sound is not None and self.engine:
+                self.engine.play('sfx', sound)
+                self._last_played = sound_name
+                self._last_played_time = current_time
+                print(f"[audio manager]Playing sound {sound_name} on sfx bus", flush=True)
+            elif sound is not None:
                 
                 sound_channel = None  # Start with no channel assigned
                 preferred_channel_id = 1 # Use channel 1 for sound effects
@@ -120,8 +148,12 @@ class AudioManager:
                  return
 
             audio_path = os.path.join(self.hint_audio_dir, audio_name)
-            if os.path.exists(audio_path):
-                sound = pygame.mixer.Sound(audio_path)
+            sound = self.sound_cache.get(audio_path)
+            if sound is not None and self.engine:
+                # The hints bus carries the hint volume
+                self.engine.play('hints', sound)
+                print(f"[audio manager]Playing audio hint {audio_name} on hints bus at volume {self.hint_volume_actual:.2f}", flush=True)
+            elif sound is not None:
                 sound.set_volume(self.hint_volume_actual) # Apply current hint volume
                 
                 sound_channel = None  # Start with no channel assigned
@@ -157,6 +189,40 @@ class AudioManager:
         except Exception as e:
             print(f"[audio manager]Error playing audio hint {audio_name}: {e}", flush=True)
 
+    def preload_room_sounds(self, room_number):
+        """Decodes the sound effects and the room's loss audio in the background."""
+        paths = []
+        try:
+            if os.path.isdir(self.sound_dir):
+                paths.extend(os.path.join(self.sound_dir, name) for name in sorted(os.listdir(self.sound_dir)))
+            loss_file = self.room_music_map.get(room_number)
+            if loss_file:
+                paths.append(os.path.join(self.loss_audio_dir, loss_file))
+            print(f"[audio manager] Preloading {len(paths)} sound(s) for room {room_number}", flush=True)
+            self.sound_cache.preload(paths)
+        except Exception as e:
+            print(f"[audio manager] Error preloading room sounds: {e}", flush=True)
+
+    def invalidate_sound_cache(self):
+        """Drops all decoded sounds (files may have changed in a sync) and preloads the room's set again."""
+        self.sound_cache.invalidate()
+        if self.kiosk_app and self.kiosk_app.assigned_room:
+            self.preload_room_sounds(self.kiosk_app.assigned_room)
+
+    def _apply_music_gain(self, gain):
+        """Engine gain follower: the music bus's volume x duck, applied to the streamed music."""
+        if pygame.mixer.get_init():
+            pygame.mixer.music.set_volume(gain)
+
+    def _music_level(self):
+        """Volume for freshly loaded music: the music bus's current gain, or the operator volume."""
+        if self.engine:
+            return self.engine.bus_gain('music')
+        return self.music_volume_actual
+
+    def _music_busy(self):
+        return pygame.mixer.music.get_busy()
+
     def play_background_music(self, room_number, start_time_seconds=0.0):
         """
         Plays background music for the given room number.
@@ -177,9 +243,10 @@ class AudioManager:
                 if os.path.exists(music_path):
                     self.stop_background_music()  # Stop any existing music first
                     pygame.mixer.music.load(music_path)
-                    pygame.mixer.music.set_volume(self.music_volume_actual) # Apply current music volume
+                    pygame.mixer.music.set_volume(self._music_level()) # Loading resets the volume to full
                     # Use the start parameter in play()
                     pygame.mixer.music.play(-1, start=start_time_seconds)  # Loop indefinitely
+                    self._music_start_ms = int(start_time_seconds * 1000)
                     self.current_music = music_file
                     self.is_playing = True # Reflect that music is playing
                     print(f"[audio manager]Started playing background music: {music_file} from {start_time_seconds:.2f}s at volume {self.music_volume_actual:.2f}", flush=True)
@@ -227,7 +294,7 @@ class AudioManager:
                  print("[audio manager] pygame.mixer not initialized, cannot toggle music.", flush=True)
                  return
 
-            if pygame.mixer.music.get_busy(): # Check the actual busy state
+            if self._music_busy(): # Check the actual busy state
                 self.stop_background_music()
             else:
                 # Try to play based on the assigned room, from the beginning
@@ -253,9 +320,13 @@ class AudioManager:
             # Clamp value
             volume_float = max(0.0, min(1.0, volume_float))
             self.music_volume_actual = volume_float # Store the actual float value
-            pygame.mixer.music.set_volume(self.music_volume_actual)
+            if self.engine:
+                # Reaches pygame.mixer.music through the gain follower, together with any duck
+                self.engine.set_volume('music', self.music_volume_actual, seconds=0.05)
+            else:
+                pygame.mixer.music.set_volume(self.music_volume_actual)
             # Update is_playing status based on whether music is busy
-            self.is_playing = pygame.mixer.music.get_busy()
+            self.is_playing = self._music_busy()
             print(f"[audio manager] Set music volume to {self.music_volume_actual:.2f}", flush=True)
         except pygame.error as pe:
              print(f"[audio manager]Pygame error setting music volume: {pe}", flush=True)
@@ -287,6 +358,9 @@ class AudioManager:
 
         volume_float = level_int / 10.0
         self.hint_volume_actual = max(0.0, min(1.0, volume_float)) # Store as float
+        if self.engine:
+            # On the engine the hints bus volume also applies to hints already playing
+            self.engine.set_volume('hints', self.hint_volume_actual, seconds=0.05)
         print(f"[audio manager] Set hint audio master volume to {self.hint_volume_actual:.2f}", flush=True)
         # This new hint volume will be applied the *next* time a hint sound is played.
         # It does *not* affect hint sounds currently playing.
@@ -302,9 +376,13 @@ class AudioManager:
             audio_file = self.room_music_map.get(room_number)
             if audio_file:
                 audio_path = os.path.join(self.loss_audio_dir, audio_file)
-                if os.path.exists(audio_path):
+                sound = self.sound_cache.get(audio_path)
+                if sound is not None and self.engine:
+                    self.stop_all_audio() # Stop everything else
+                    self.engine.play('hints', sound)
+                    print(f"[audio manager]Playing loss audio {audio_file} on hints bus at volume {self.hint_volume_actual:.2f}", flush=True)
+                elif sound is not None:
                     self.stop_all_audio() # Stop everything else
-                    sound = pygame.mixer.Sound(audio_path)
                     sound.set_volume(self.hint_volume_actual) # Apply hint volume to loss audio? Or should it have its own? Using hint for now.
                     
                     sound_channel = None  # Start with no channel assigned
@@ -351,6 +429,8 @@ class AudioManager:
                  return
 
             self.stop_background_music()  # Stop music if playing
+            if self.engine:
+                self.engine.stop_all()
 
             # Stop all active channels (channels 0 and up)
             # pygame.mixer.stop() stops all sounds on all channels
@@ -383,8 +463,8 @@ class AudioManager:
             position = pygame.mixer.music.get_pos()
             # get_pos returns -1 if no music is playing/loaded
             if position != -1:
-                 #print(f"[audio manager] Got music position: {position} ms", flush=True)
-                 pass
+                 # get_pos counts from play(), not from the start offset, so add it for a resume at the right spot
+                 position += self._music_start_ms
             else:
                  #print("[audio manager] No music playing, position not available.", flush=True)
                  pass
@@ -394,4 +474,13 @@ class AudioManager:
              return -1 # Indicate error
         except Exception as e:
             print(f"[audio manager] Error getting music position: {e}", flush=True)
-            return -1 # Indicate error
\ No newline at end of file
+            return -1 # Indicate error
+
+    def get_engine_stats(self):
+        """AudioEngine callback load and underflow counters, or None when playing through pygame."""
+        return self.engine.get_stats() if self.engine else None
+
+    def shutdown(self):
+        """Closes the engine's output stream."""
+        if self.engine:
+            self.engine.stop()
@@ -12,14 +12,25 @@ print("[audio server] Imported threading.", flush=True)
 print("[audio server] Importing struct...", flush=True)
 import struct
 print("[audio server] Imported struct.", flush=True)
+print("[audio server] Importing json...", flush=True)
+import json
+print("[audio server] Imported json.", flush=True)
 print("[audio server] Importing numpy...", flush=True)
 import numpy as np
 print("[audio server] Imported numpy.", flush=True)
+print("[audio server] Importing JitterBuffer from jitter_buffer...", flush=True)
+from jitter_buffer import JitterBuffer
+print("[audio server] Imported JitterBuffer from jitter_buffer.", flush=True)
+print("[audio server] Importing voice_codec...", flush=True)
+import voice_codec
+print("[audio server] Imported voice_codec.", flush=True)
 print("[audio server] Ending imports ...", flush=True)
 
 class AudioServer:
-    def __init__(self, port=8090):
+    def __init__(self, port=8090, capture_hub=None):
         self.port = port
+        self.capture_hub = capture_hub # Shared MicCaptureHub; None opens our own input stream per connection
+        self.mic_subscription = None
         self.running = False
         self.server_socket = None
         self.current_client = None
@@ -29,12 +40,15 @@ class AudioServer:
         self.input_stream = None
         self.output_stream = None
         self.receiving_audio = False
+        self.jitter_buffer = None # Playout buffer for audio from the admin, replaced per connection
+        self.codec_name = None # Voice codec negotiated with the current admin connection
         
         # Audio parameters
         self.CHUNK = 1024
         self.FORMAT = pyaudio.paFloat32
         self.CHANNELS = 1
         self.RATE = 44100
+        self.HANDSHAKE_TIMEOUT = 2.0 # Seconds to wait for the admin's codec offer before assuming a legacy admin
         
     def start(self):
         """Non-blocking server start"""
@@ -67,57 +81,116 @@ class AudioServer:
                 self.current_client = client
                 client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
 
-                # --- START MODIFICATION: Fix resource leak ---
-                # Close the previous input stream if it exists before creating a new one.
-                if self.input_stream:
-                    try:
-                        if self.input_stream.is_active():
-                            self.input_stream.stop_stream()
-                        self.input_stream.close()
-                        print("[audio server] Closed previous audio input stream.", flush=True)
-                    except Exception as e:
-                        print(f"[audio server] Error closing previous input stream: {e}", flush=True)
-                    self.input_stream = None
-                # --- END MODIFICATION ---
+                if self.capture_hub is not None:
+                    # The hub keeps the microphone open, so a new connection just swaps subscriptions
+                    if self.mic_subscription:
+                        self.mic_subscription.close()
+                    self.mic_subscription = self.capture_hub.subscribe("voice", chunk_frames=self.CHUNK, rate=self.RATE)
+                    subscription = self.mic_subscription
+                else:
+                    self._open_input_stream()
+                    subscription = None
 
-                # Start input stream for microphone
-                print("[audio server] Opening audio input stream...", flush=True)
-                self.input_stream = self.audio.open(
-                    format=self.FORMAT,
-                    channels=self.CHANNELS,
-                    rate=self.RATE,
-                    input=True,
-                    frames_per_buffer=self.CHUNK
-                )
-                print("[audio server] Audio input stream opened.", flush=True)
-
-                # Start sending thread
-                threading.Thread(target=self.stream_audio,
-                                args=(client,), daemon=True).start()
-
-                # Start receiving thread
-                threading.Thread(target=self.receive_audio,
-                                args=(client,), daemon=True).start()
+                # The codec handshake can wait on a silent legacy admin, so it runs on the
+                # connection's own thread and never holds up the next accept()
+                threading.Thread(target=self._serve_connection, args=(client, subscription), daemon=True).start()
             except socket.timeout: # catch timeout
                 pass
             except Exception as e:
                 if self.running:
                     print(f"[audio server]Audio connection error: {e}", flush=True)
                 break
-                
-    def stream_audio(self, client):
-        """Send audio from kiosk to admin"""
+
+    def _open_input_stream(self):
+        """Opens a dedicated microphone stream for this connection (used without a capture hub)."""
+        # Close the previous input stream if it exists before creating a new one.
+        if self.input_stream:
+            try:
+                if self.input_stream.is_active():
+                    self.input_stream.stop_stream()
+                self.input_stream.close()
+                print("[audio server] Closed previous audio input stream.", flush=True)
+            except Exception as e:
+                print(f"[audio server] Error closing previous input stream: {e}", flush=True)
+            self.input_stream = None
+
+        # Start input stream for microphone
+        print("[audio server] Opening audio input stream...", flush=True)
+        self.input_stream = self.audio.open(
+            format=self.FORMAT,
+            channels=self.CHANNELS,
+            rate=self.RATE,
+            input=True,
+            frames_per_buffer=self.CHUNK
+        )
+        print("[audio server] Audio input stream opened.", flush=True)
+
+    def _serve_connection(self, client, subscription):
+        """Negotiates the codec, then sends on a new thread and receives on this one."""
+        codec_name, pending_header = self._negotiate_codec(client)
+        if client is not self.current_client:
+            print("[audio server] Connection replaced during codec negotiation.", flush=True)
+            return
+        self.codec_name = codec_name
+
+        # Start sending thread; each direction gets its own codec instance since they carry state
+        threading.Thread(target=self.stream_audio,
+                        args=(client, voice_codec.create_codec(codec_name, self.RATE), subscription), daemon=True).start()
+
+        self.receive_audio(client, voice_codec.create_codec(codec_name, self.RATE), pending_header)
+
+    def get_supported_codecs(self):
+        """Voice codecs this kiosk accepts, in preference order. Reported in the stats so the admin knows it may negotiate."""
+        return list(voice_codec.PREFERRED_CODECS)
+
+    def _negotiate_codec(self, client):
+        """
+        Waits briefly for the admin's codec offer and answers with the chosen codec.
+        Returns (codec name, pending header); a legacy admin that starts straight
+        with audio gets raw PCM, and its first size header is handed back so
+        receive_audio doesn't lose it.
+        """
+        client.settimeout(self.HANDSHAKE_TIMEOUT)
+        try:
+            header = self._recv_exactly(client, struct.calcsize("Q"))
+            if not header:
+                print("[audio server] No codec offer from admin, using raw PCM.", flush=True)
+                return voice_codec.FALLBACK_CODEC, None
+            if struct.unpack("Q", header)[0] != voice_codec.HELLO_MAGIC:
+                print("[audio server] Legacy admin (no codec offer), using raw PCM.", flush=True)
+                return voice_codec.FALLBACK_CODEC, header
+
+            length_data = self._recv_exactly(client, struct.calcsize("Q"))
+            length = struct.unpack("Q", length_data)[0] if length_data else 0
+            offer_data = self._recv_exactly(client, length) if 0 < length <= 4096 else None
+            offer = json.loads(bytes(offer_data).decode('utf-8')) if offer_data else {}
+            codec_name = voice_codec.choose_codec(offer.get('codecs'))
+            client.sendall(voice_codec.build_hello({'codec': codec_name}))
+            print(f"[audio server] Negotiated voice codec '{codec_name}' (offered: {offer.get('codecs')}).", flush=True)
+            return codec_name, None
+        except Exception as e:
+            print(f"[audio server] Codec negotiation failed, using raw PCM: {e}", flush=True)
+            return voice_codec.FALLBACK_CODEC, None
+
+    def stream_audio(self, client, codec, subscription=None):
+        """Send audio from kiosk to admin, read from the capture hub subscription if given, else our own input stream"""
         print("[audio server]Starting audio streaming to admin", flush=True)
         client.settimeout(2.0)
+        if subscription is not None:
+            subscription.drain() # Drop audio captured during the codec handshake
         try:
             while self.running:
                 try:
-                    data = self.input_stream.read(self.CHUNK, exception_on_overflow=False)
+                    if subscription is not None:
+                        data = subscription.read(timeout=1.0)
+                        if subscription.closed:
+                            break # Replaced by a newer connection
+                    else:
+                        data = self.input_stream.read(self.CHUNK, exception_on_overflow=False)
                     if data:
-                        size = len(data)
+                        payload = codec.encode(data)
                         try:
-                            client.sendall(struct.pack("Q", size))
-                            client.sendall(data)
+                            client.sendall(struct.pack("Q", len(payload)) + payload)
                         except socket.timeout:
                             print(f"[audio server]Client sendall timeout", flush=True)
                             break
@@ -132,16 +205,18 @@ class AudioServer:
         except Exception as e:
             print(f"[audio server]Audio streaming error: {e}", flush=True)
         finally:
+            if subscription is not None and not subscription.closed:
+                subscription.close()
             print("[audio server]Audio streaming ended", flush=True)
             
-    def receive_audio(self, client):
+    def receive_audio(self, client, codec, pending_header=None):
         """Receive and play audio from admin. Uses lazy initialization for the output stream."""
         print("[audio server]Starting audio reception from admin (waiting for first packet)...", flush=True)
         
         try:
             client.settimeout(None)
             
-            size_data = self._recv_exactly(client, struct.calcsize("Q"))
+            size_data = pending_header or self._recv_exactly(client, struct.calcsize("Q"))
             if not size_data:
                 print("[audio server] ERROR: Did not receive initial packet from admin.", flush=True)
                 return # --- MODIFIED: Return early ---
@@ -157,18 +232,23 @@ class AudioServer:
                 print("[audio server] ERROR: Did not receive initial audio data.", flush=True)
                 return # --- MODIFIED: Return early ---
 
+            # Received chunks go through a jitter buffer that the output stream's callback drains,
+            # so network hiccups are absorbed or concealed instead of blocking playback
+            jitter_buffer = JitterBuffer(self.RATE, self.CHANNELS)
+            self.jitter_buffer = jitter_buffer
+            jitter_buffer.push(codec.decode(audio_data))
+
             print("[audio server] First audio packet received. Opening audio output stream...", flush=True)
             self.output_stream = self.audio.open(
                 format=self.FORMAT,
                 channels=self.CHANNELS,
                 rate=self.RATE,
                 output=True,
-                frames_per_buffer=self.CHUNK
+                frames_per_buffer=self.CHUNK,
+                stream_callback=lambda in_data, frame_count, time_info, status: (jitter_buffer.read(frame_count), pyaudio.paContinue)
             )
-            print("[audio server] Audio output stream opened. Playing initial packet.", flush=True)
-            
-            if self.output_stream.is_active():
-                self.output_stream.write(bytes(audio_data))
+            jitter_buffer.output_latency = self.output_stream.get_output_latency()
+            print("[audio server] Audio output stream opened, playing through jitter buffer.", flush=True)
 
             client.settimeout(2.0)
 
@@ -185,9 +265,8 @@ class AudioServer:
                         print("[audio server]No more audio data received, stream likely ended.", flush=True)
                         break
                     
-                    if self.output_stream and self.output_stream.is_active():
-                        self.output_stream.write(bytes(audio_data))
-                        
+                    jitter_buffer.push(codec.decode(audio_data))
+
                 except socket.error as e:
                     print(f"[audio server]Socket error in receive loop: {e}", flush=True)
                     break
@@ -212,6 +291,14 @@ class AudioServer:
                 except Exception as e:
                     print(f"[audio server] Error closing output stream: {e}", flush=True)
 
+    def get_voice_stats(self):
+        """Jitter buffer counters for audio received from the admin, or None before the first connection."""
+        if self.jitter_buffer is None:
+            return None
+        stats = self.jitter_buffer.get_stats()
+        stats['codec'] = self.codec_name
+        return stats
+
     def _recv_exactly(self, client, size):
         """Helper to receive exact number of bytes"""
         # --- START MODIFICATION: More robust receiving ---
@@ -237,6 +324,10 @@ class AudioServer:
         """Stop the server and clean up"""
         print("[audio server]Stopping audio server", flush=True)
         self.running = False
+
+        if self.mic_subscription:
+            self.mic_subscription.close()
+            self.mic_subscription = None
         
         if self.current_client:
             try:
@@ -290,14 +381,14 @@ class AudioServer:
             
             send_thread = threading.Thread(
                 target=self.stream_audio,
-                args=(client,),
+                args=(client, voice_codec.create_codec(voice_codec.FALLBACK_CODEC, self.RATE)),
                 daemon=True
             )
             send_thread.start()
             
             receive_thread = threading.Thread(
                 target=self.receive_audio,
-                args=(client,),
+                args=(client, voice_codec.create_codec(voice_codec.FALLBACK_CODEC, self.RATE)),
                 daemon=True
             )
             receive_thread.start()
@@ -26,5 +26,11 @@ ROOM_CONFIG = {
         5: "haunted_manor.png",
         6: "atlantis_rising.png",
         7: "time_machine.png"
+    },
+    # Video decoder backend per room kiosk ('cv2' or 'ffmpeg'); rooms not listed use cv2.
+    # The ffmpeg pipe scales in the decoder, which keeps playback smooth on the slower PCs.
+    'video_decoders': {
+        4: "ffmpeg",
+        7: "ffmpeg"
     }
-}
\ No newline at end of file
+}
@@ -1,5 +1,13 @@
 # kiosk.py
 print("[kiosk main] Beginning imports ...", flush=True)
+# Startup is timed from here, see StartupTrace
+import time
+_LAUNCHED_AT = time.perf_counter()
+# First, so that with --profile-startup every later import is timed
+from startup_profiler import profiler
+print("[kiosk main] Importing threading...", flush=True)
+import threading
+print("[kiosk main] Imported threading.", flush=True)
 # import tkinter as tk - removed
 print("[kiosk main] Importing socket, sys, os, traceback, ctypes...", flush=True)
 import socket, sys, os, traceback, ctypes, json # type: ignore
@@ -13,20 +21,9 @@ print("[kiosk main] Imported QtManager from qt_manager.", flush=True)
 print("[kiosk main] Importing ROOM_CONFIG from config...", flush=True)
 from config import ROOM_CONFIG
 print("[kiosk main] Imported ROOM_CONFIG from config.", flush=True)
-print("[kiosk main] Importing VideoServer from video_server...", flush=True)
-from video_server import VideoServer
-print("[kiosk main] Imported VideoServer from video_server.", flush=True)
-
-print("[kiosk main] Importing StateTracker...", flush=True)
-from state_tracker import StateTracker
-print("[kiosk main] Imported StateTracker.", flush=True)
-
 print("[kiosk main] Importing VideoManager from video_manager...", flush=True)
 from video_manager import VideoManager
 print("[kiosk main] Imported VideoManager from video_manager.", flush=True)
-print("[kiosk main] Importing AudioServer from audio_server...", flush=True)
-from audio_server import AudioServer
-print("[kiosk main] Imported AudioServer from audio_server.", flush=True)
 print("[kiosk main] Importing MessageHandler, init_timer_scheduler from message_handler...", flush=True)
 from message_handler import MessageHandler, init_timer_scheduler
 print("[kiosk main] Imported MessageHandler, init_timer_scheduler from message_handler.", flush=True)
@@ -42,9 +39,6 @@ print("[kiosk main] Imported KioskTimer from kiosk_timer.", flush=True)
 print("[kiosk main] Importing AudioManager from audio_manager...", flush=True)
 from audio_manager import AudioManager
 print("[kiosk main] Imported AudioManager from audio_manager.", flush=True)
-print("[kiosk main] Importing KioskFileDownloader from kiosk_file_downloader...", flush=True)
-from kiosk_file_downloader import KioskFileDownloader
-print("[kiosk main] Imported KioskFileDownloader from kiosk_file_downloader.", flush=True)
 print("[kiosk main] Importing Overlay from qt_overlay...", flush=True)
 from qt_overlay import Overlay
 print("[kiosk main] Imported Overlay from qt_overlay.", flush=True)
@@ -60,12 +54,6 @@ print("[kiosk main] Imported windll from ctypes.", flush=True)
 print("[kiosk main] Importing signal...", flush=True)
 import signal
 print("[kiosk main] Imported signal.", flush=True)
-print("[kiosk main] Importing threading...", flush=True)
-import threading
-print("[kiosk main] Imported threading.", flush=True)
-print("[kiosk main] Importing time...", flush=True)
-import time
-print("[kiosk main] Imported time.", flush=True)
 print("[kiosk main] Importing PyQt5.QtCore...", flush=True)
 from PyQt5.QtCore import QMetaObject, Qt, QTimer, Q_ARG
 print("[kiosk main] Imported PyQt5.QtCore.", flush=True)
@@ -76,21 +64,22 @@ try:
 except ImportError:
     print("[kiosk main] WARNING: Could not import screen_rotation_manager.py. Screen rotation will be skipped.", flush=True)
     rotate_to_preferred_landscape = None
-print("[kiosk main] Importing TapDetector from tap_detector...", flush=True)
-try:
-    from tap_detector import TapDetector
-    TAP_DETECTOR_ENABLED = True
-except Exception as e:
-    print(f"[kiosk main] WARNING: Could not import or use TapDetector. Secret tap pattern will be disabled. Error: {e}", flush=True)
-    TapDetector = None
-    TAP_DETECTOR_ENABLED = False
-print("[kiosk main] Tap Detector", flush=True)
+print("[kiosk main] Importing StartupTrace from startup_trace...", flush=True)
+from startup_trace import StartupTrace
+print("[kiosk main] Imported StartupTrace from startup_trace.", flush=True)
+# None of the imports above load cv2, PIL, pyaudio or requests. video_player imports
+# cv2 when the first video opens, and the audio engine imports pyaudio on its own
+# startup thread, alongside the overlay. The camera, screenshot, voice, tap detection,
+# file sync and state tracking modules are imported by the services that use them,
+# once the kiosk is on screen. See KioskApp._start_services.
 print("[kiosk main] Ending imports ...", flush=True)
 
 class KioskApp:
     UI_DEBUG = False
     def __init__(self):
         print("[kiosk main]Starting KioskApp initialization...", flush=True)
+        self.startup = StartupTrace(_LAUNCHED_AT)
+        self.startup.mark("imports_done")
         os.chdir(os.path.dirname(os.path.abspath(__file__)))
         
         # Initialize logging
@@ -104,7 +93,8 @@ class KioskApp:
         if rotate_to_preferred_landscape: # Check if the import was successful
             print("[kiosk main] Applying screen rotation preference...", flush=True)
             try:
-                rotate_to_preferred_landscape()
+                with self.startup.phase("screen_rotation"):
+                    rotate_to_preferred_landscape()
             except Exception as e:
                  # This catch is mostly for unexpected errors *during* the function call,
                  # as the function itself has internal catches.
@@ -125,7 +115,6 @@ class KioskApp:
         self.is_closing = False
         self.needs_restart = False
         self.start_time = None
-        self.take_screenshot_requested = False
         self.time_exceeded_45 = False
         self.room_started = False
         # Volume levels (0-10 integer representation)
@@ -134,7 +123,8 @@ class KioskApp:
 
         # Create Qt application first, before any other component
         print("[kiosk main] Creating Qt application...", flush=True)
-        self.qt_app = QtKioskApp(self)
+        with self.startup.phase("qt_app"):
+            self.qt_app = QtKioskApp(self)
         print("[kiosk main] Qt application created.", flush=True)
 
         print("[kiosk main] Setting up proactive state saving timer...", flush=True)
@@ -154,80 +144,73 @@ class KioskApp:
         except Exception as e:
             print(f"[kiosk main] Failed to set app ID: {str(e)}", flush=True)
 
+        # Stage 1: everything the player sees and touches. The audio engine (mixer,
+        # output device) opens on its own thread while the overlay is built.
+        self.current_video_process = None
+        print("[kiosk main] Initializing AudioManager in the background...", flush=True)
+        audio_task = self.startup.spawn("audio_manager", AudioManager, self)  # Pass the KioskApp instance
+
         # Initialize Qt overlay with explicit reference to the QApplication instance
         # We'll modify the Overlay.init method to accept a reference to the Qt application
         print("[kiosk main] Setting up Qt overlay...", flush=True)
-        Overlay._app = self.qt_app  # Set the app reference directly
-        Overlay.init()
-        
-        # Set the kiosk_app reference directly
-        Overlay.set_kiosk_app(self)
+        with self.startup.phase("overlay"):
+            Overlay._app = self.qt_app  # Set the app reference directly
+            Overlay.init()
+
+            # Set the kiosk_app reference directly
+            Overlay.set_kiosk_app(self)
+            # Decode and scale every room's images in the background so room switches are instant
+            Overlay.prewarm_assets()
         print("[kiosk main] Qt overlay initialized.", flush=True)
-        
-        # Now initialize other components
-        self.current_video_process = None
-        print("[kiosk main] Initializing AudioManager...", flush=True)
-        self.audio_manager = AudioManager(self)  # Pass the KioskApp instance
+
+        print("[kiosk main] Waiting for AudioManager...", flush=True)
+        self.audio_manager = audio_task.result()
         print("[kiosk main] AudioManager initialized.", flush=True)
-        
+
         print("[kiosk main] Initializing VideoManager...", flush=True)
-        self.video_manager = VideoManager(None)  # No longer need to pass root
+        with self.startup.phase("video_manager"):
+            self.video_manager = VideoManager(None)  # No longer need to pass root
+            self.video_manager.audio_engine = self.audio_manager.engine
         print("[kiosk main] VideoManager initialized.", flush=True)
-        
+
         print("[kiosk main] Initializing MessageHandler...", flush=True)
-        self.message_handler = MessageHandler(self, self.video_manager)
+        with self.startup.phase("message_handler"):
+            self.message_handler = MessageHandler(self, self.video_manager)
         print("[kiosk main] MessageHandler initialized.", flush=True)
-        
+
         # Initialize components as before
         print("[kiosk main] Initializing KioskNetwork...", flush=True)
         self.network = KioskNetwork(self.computer_name, self)
         print("[kiosk main] KioskNetwork initialized.", flush=True)
-        
-        print("[kiosk main] Initializing VideoServer...", flush=True)
-        self.video_server = VideoServer()
-        print("[kiosk main] Starting video server...", flush=True)
-        self.video_server.start()
-        print("[kiosk main] VideoServer started.", flush=True)
-        
+
         print("[kiosk main] Initializing KioskTimer...", flush=True)
         self.timer = KioskTimer(None, self)  # Pass self but no longer need root
         self.timer.game_won = False
         print("[kiosk main] KioskTimer initialized.", flush=True)
-        
+
         # Create UI manager with QtManager instead of KioskUI
         print("[kiosk main] Initializing QtManager...", flush=True)
-        self.ui = QtManager(self.computer_name, ROOM_CONFIG, self)
-        self.ui.setup_waiting_screen()
-        self.ui.current_hint_image_filename = None
+        with self.startup.phase("qt_manager"):
+            self.ui = QtManager(self.computer_name, ROOM_CONFIG, self)
+            self.ui.setup_waiting_screen()
+            self.ui.current_hint_image_filename = None
         print("[kiosk main] QtManager initialized.", flush=True)
-        
-        print("[kiosk main] Starting network threads...", flush=True)
-        self.network.start_threads()
-        print("[kiosk main] Network threads started.", flush=True)
-
-        print("[kiosk main] Initializing AudioServer...", flush=True)
-        self.audio_server = AudioServer()
-        print("[kiosk main] Starting audio server...", flush=True)
-        self.audio_server.start()
-        print("[kiosk main] AudioServer started.", flush=True)
 
         print(f"[kiosk main] Computer name: {self.computer_name}", flush=True)
         print("[kiosk main] Creating RoomPersistence...", flush=True)
-        self.room_persistence = RoomPersistence()
-        self.assigned_room = self.room_persistence.load_room_assignment()
-        print(f"[kiosk main] Loaded room assignment: {self.assigned_room}", flush=True)
+        with self.startup.phase("room_assignment"):
+            self.room_persistence = RoomPersistence()
+            self.assigned_room = self.room_persistence.load_room_assignment()
+            print(f"[kiosk main] Loaded room assignment: {self.assigned_room}", flush=True)
+            if self.assigned_room:
+                self.video_manager.assign_room(self.assigned_room)
+                self.audio_manager.preload_room_sounds(self.assigned_room)
 
-        #Initialize the file downloader
-        print("[kiosk main] Initializing KioskFileDownloader...", flush=True)
-        self.file_downloader = KioskFileDownloader(self)
-        self.file_downloader.start() # Start it immediately
-        print("[kiosk main] KioskFileDownloader started.", flush=True)
-        
         # Initialize UI with saved room if available
         if self.assigned_room:
             print(f"[kiosk main] Setting up room interface for room {self.assigned_room}...", flush=True)
             # Use QTimer.singleShot instead of root.after
-            QTimer.singleShot(100, lambda: self.ui.setup_room_interface(self.assigned_room))
+            QTimer.singleShot(100, self._show_saved_room)
         else:
             print("[kiosk main] Setting up waiting screen...", flush=True)
             self.ui.setup_waiting_screen()
@@ -238,37 +221,128 @@ class KioskApp:
         self.help_button_timer.timeout.connect(self._actual_help_button_update)
         self.help_button_timer.start(5000)
         print("[kiosk main] Help button update timer started.", flush=True)
-        
-        print("[kiosk main] Initializing StateTracker...", flush=True)
-        self.state_tracker = StateTracker(self) # Pass self (the KioskApp instance)
-        self.state_tracker.start()
-        print("[kiosk main] StateTracker started.", flush=True)
+
+        print("[kiosk main] Starting network threads...", flush=True)
+        with self.startup.phase("network_threads"):
+            self.network.start_threads()
+        print("[kiosk main] Network threads started.", flush=True)
 
         print("[kiosk main] Initializing heartbeat thread...", flush=True)
         self.heartbeat_stop_event = threading.Event()
         self.heartbeat_thread = threading.Thread(target=self._send_heartbeats, daemon=True)
         self.heartbeat_thread.start()
         print("[kiosk main] Heartbeat thread started.", flush=True)
-        
+
         # Volume levels (0-10 integer representation)
         self.music_volume_level = 7  # Default 7/10 (70%)
         self.hint_volume_level = 7   # Default 7/10 (70%)
 
-        # Init tap detector for reset commands
+        # Stage 2: the camera, screenshot, voice and sync services start once the
+        # event loop has painted the kiosk. Their attributes are only set once each
+        # service is up; on_closing and get_stats check for them.
         self.tap_detector = None
-        if TAP_DETECTOR_ENABLED and TapDetector:
-            print("[kiosk main] Initializing TapDetector...", flush=True)
-            try:
-                # Pass a method from this class as the callback
-                self.tap_detector = TapDetector(pattern_callback=self.on_tap_pattern_detected)
-                self.tap_detector.start()
-                print("[kiosk main] TapDetector started.", flush=True)
-            except Exception as e:
-                print(f"[kiosk main] ERROR: Failed to start TapDetector: {e}", flush=True)
-                self.tap_detector = None # Ensure it's None on failure
-        
+        QTimer.singleShot(0, self._start_services)
+
+        self.startup.mark("kiosk_app_ready")
         print("[kiosk main] KioskApp initialization complete.", flush=True)
 
+    def _show_saved_room(self):
+        self.ui.setup_room_interface(self.assigned_room)
+        self.startup.mark("room_interface_shown")
+
+    def _start_services(self):
+        """
+        Starts the background services on one thread each, importing their modules
+        there. None of them is needed to play, so a slow camera probe, audio device
+        or admin server doesn't hold up the kiosk. Prints the startup trace once
+        all of them are up.
+        """
+        if self.is_closing:
+            return
+        self.startup.mark("event_loop_running")
+        print("[kiosk main] Starting background services...", flush=True)
+        tasks = [self.startup.spawn(name, start) for name, start in (
+            ("video_server", self._start_video_server),
+            ("screenshot_server", self._start_screenshot_server),
+            ("voice", self._start_voice),
+            ("file_downloader", self._start_file_downloader),
+            ("state_tracker", self._start_state_tracker),
+        )]
+
+        def report():
+            for task in tasks:
+                task.wait()
+            self.startup.mark("services_ready")
+            print("[kiosk main] Background services started.", flush=True)
+            self.startup.print_report()
+            profiler.write_report("kiosk")
+        threading.Thread(target=report, daemon=True, name="StartupReport").start()
+
+    def _start_video_server(self):
+        print("[kiosk main] Initializing VideoServer...", flush=True)
+        from video_server import VideoServer
+        video_server = VideoServer()
+        video_server.start()
+        self.video_server = video_server
+        print("[kiosk main] VideoServer started.", flush=True)
+
+    def _start_screenshot_server(self):
+        print("[kiosk main] Initializing ScreenshotServer...", flush=True)
+        from screenshot_server import ScreenshotServer
+        screenshot_server = ScreenshotServer()
+        # Same rule as request_screenshot: don't grab the screen during video playback
+        screenshot_server.should_capture = lambda: not self.is_closing and not self.video_manager.is_playing
+        screenshot_server.start()
+        self.screenshot_server = screenshot_server
+        print("[kiosk main] ScreenshotServer started.", flush=True)
+
+    def _start_voice(self):
+        """The microphone, the admin voice link and the tap detector, which share the microphone."""
+        # One owner for the microphone; the voice link, tap detector and soundcheck subscribe to it
+        print("[kiosk main] Initializing MicCaptureHub...", flush=True)
+        from mic_capture import MicCaptureHub
+        from audio_server import AudioServer
+        self.mic_hub = MicCaptureHub()
+        print("[kiosk main] MicCaptureHub initialized.", flush=True)
+
+        print("[kiosk main] Initializing AudioServer...", flush=True)
+        audio_server = AudioServer(capture_hub=self.mic_hub)
+        audio_server.start()
+        self.audio_server = audio_server
+        print("[kiosk main] AudioServer started.", flush=True)
+
+        # Init tap detector for reset commands
+        print("[kiosk main] Initializing TapDetector...", flush=True)
+        try:
+            from tap_detector import TapDetector
+        except Exception as e:
+            print(f"[kiosk main] WARNING: Could not import or use TapDetector. Secret tap pattern will be disabled. Error: {e}", flush=True)
+            return
+        try:
+            # Pass a method from this class as the callback
+            tap_detector = TapDetector(pattern_callback=self.on_tap_pattern_detected, capture_hub=self.mic_hub)
+            tap_detector.start()
+            self.tap_detector = tap_detector
+            print("[kiosk main] TapDetector started.", flush=True)
+        except Exception as e:
+            print(f"[kiosk main] ERROR: Failed to start TapDetector: {e}", flush=True)
+
+    def _start_file_downloader(self):
+        print("[kiosk main] Initializing KioskFileDownloader...", flush=True)
+        from kiosk_file_downloader import KioskFileDownloader
+        file_downloader = KioskFileDownloader(self)
+        file_downloader.start()
+        self.file_downloader = file_downloader
+        print("[kiosk main] KioskFileDownloader started.", flush=True)
+
+    def _start_state_tracker(self):
+        print("[kiosk main] Initializing StateTracker...", flush=True)
+        from state_tracker import StateTracker
+        state_tracker = StateTracker(self) # Pass self (the KioskApp instance)
+        state_tracker.start()
+        self.state_tracker = state_tracker
+        print("[kiosk main] StateTracker started.", flush=True)
+
     def on_tap_pattern_detected(self):
         """
         Callback function executed by the TapDetector when the secret pattern is detected.
@@ -295,7 +369,7 @@ class KioskApp:
 
     def get_stats(self):
         if self.is_closing:
-            print("[kiosk get_stats] Prevented stats update and screenshot: Kiosk is closing.", flush=True)
+            print("[kiosk get_stats] Prevented stats update: Kiosk is closing.", flush=True)
             return {} # Return empty dict to avoid issues if stats are expected
         # --- BEGIN: Add currently displayed hint info ---
         hint_text = None
@@ -324,6 +398,10 @@ class KioskApp:
             'music_volume_level': self.music_volume_level, # Add music volume level
             'hint_volume_level': self.hint_volume_level,   # Add hint volume level
             'video_playing': self.video_manager.is_playing if hasattr(self, 'video_manager') else False,
+            'video_stats': self.video_manager.get_playback_stats() if hasattr(self, 'video_manager') else None, # A/V sync counters of the current/last video
+            'audio_engine_stats': self.audio_manager.get_engine_stats() if hasattr(self, 'audio_manager') else None, # Software mixer callback load
+            'voice_stats': self.audio_server.get_voice_stats() if hasattr(self, 'audio_server') else None, # Jitter buffer counters for admin -> kiosk voice
+            'voice_codecs': self.audio_server.get_supported_codecs() if hasattr(self, 'audio_server') else None, # Tells the admin it may offer a codec
             # --- NEW FIELDS ---
             'current_hint_text': hint_text,
             'current_hint_image': hint_image,
@@ -333,12 +411,6 @@ class KioskApp:
             #print(f"[kiosk main]Stats updated: {stats}")
             self._last_stats = stats.copy()
 
-        # --- Add screenshot logic HERE ---
-        if hasattr(self, 'take_screenshot_requested') and self.take_screenshot_requested:
-            # Start a new thread to handle the screenshot
-            threading.Thread(target=self.send_screenshot, daemon=True).start()
-            self.take_screenshot_requested = False  # Reset flag after sending
-
 
         return stats
     
@@ -350,25 +422,15 @@ class KioskApp:
 
         try:
             #print("[kiosk] Taking screenshot...", flush=True)
-            from PIL import ImageGrab, Image
             import io, base64
 
-            # Add a small delay.  This is the most important change.
-            time.sleep(0.1)  # Wait 100ms.  Adjust as needed.
-
-            if self.is_closing:  # Re-check after the delay.
-                print("[kiosk]Screenshot send prevented after delay: Kiosk is closing.", flush=True)
+            screenshot_server = getattr(self, 'screenshot_server', None)
+            if screenshot_server is None:
+                print("[kiosk]Screenshot skipped: screenshot server still starting.", flush=True)
                 return
-            
-            # Take screenshot
-            screen = ImageGrab.grab()
 
-            # Resize and rotate, fitting to admin interface
-            max_height = 300  # Example, adjust as needed based on your UI
-            screen = screen.rotate(90, expand=True)
-            ratio = max_height / screen.height
-            new_width = int(screen.width * ratio)
-            screen = screen.resize((new_width, max_height), Image.Resampling.LANCZOS)
+            # Rotated and reduced to the admin preview's 300 px height in one pass
+            screen = screenshot_server.capture_image(300)
 
             # Convert to JPEG and base64
             buf = io.BytesIO()
@@ -481,11 +543,9 @@ class KioskApp:
             # If hint is empty/None, clear both text and image
             self.ui.current_hint_image_filename = None
 
-        image_path = text # wrong
-        if image_path:
-            # Assuming image_path is like 'hint_image_files/room/prop_name/image.png'
-            # We need just 'image.png'
-            self.ui.current_hint_image_filename = "image name not available" #os.path.basename(image_path)
+        # Image hints carry their file path, so the filename can be reported
+        if isinstance(text, dict) and text.get('image_path'):
+            self.ui.current_hint_image_filename = self.ui.get_last_displayed_hint_image_filename()
         else:
             self.ui.current_hint_image_filename = None
     
@@ -600,6 +660,7 @@ class KioskApp:
             if hasattr(self, 'video_manager'):
                 print("[kiosk main] Stopping video manager...")
                 self.video_manager.force_stop()
+                self.video_manager.release_preload()
         except Exception as e:
             print(f"[kiosk main] Error stopping video manager: {e}")
             log_exception(e, "Error stopping video manager")
@@ -634,6 +695,14 @@ class KioskApp:
             print(f"[kiosk main] Error stopping video server: {e}")
             log_exception(e, "Error stopping video server")
             
+        try:
+            if hasattr(self, 'screenshot_server'):
+                print("[kiosk main] Stopping screenshot server...")
+                self.screenshot_server.stop()
+        except Exception as e:
+            print(f"[kiosk main] Error stopping screenshot server: {e}")
+            log_exception(e, "Error stopping screenshot server")
+
         try:
             if hasattr(self, 'audio_server'):
                 print("[kiosk main] Stopping audio server...")
@@ -697,6 +766,20 @@ class KioskApp:
             print(f"[kiosk main] Error stopping tap detector: {e}")
             log_exception(e, "Error stopping tap detector")
 
+        try:
+            if hasattr(self, 'audio_manager') and self.audio_manager:
+                self.audio_manager.shutdown()
+        except Exception as e:
+            print(f"[kiosk main] Error shutting down audio engine: {e}")
+
+        # Release the microphone once its subscribers are gone
+        try:
+            if hasattr(self, 'mic_hub') and self.mic_hub:
+                print("[kiosk main] Stopping microphone capture...")
+                self.mic_hub.stop()
+        except Exception as e:
+            print(f"[kiosk main] Error stopping microphone capture: {e}")
+
         # Cancel soundcheck if active
         try:
             # Access soundcheck_widget via message_handler
@@ -393,6 +393,12 @@ class KioskFileDownloader:
             }
             self.kiosk_app.network.send_message(complete_msg)
             self.kiosk_app.needs_restart = True
+            # Reload any overlay images the sync replaced (the cache notices by mtime)
+            try:
+                from qt_overlay import Overlay
+                Overlay.prewarm_assets(getattr(self.kiosk_app, 'assigned_room', None))
+            except Exception as e:
+                print(f"[kiosk_file_downloader] Error prewarming overlay images: {e}")
             print("[kiosk_file_downloader] Restart required after sync.")
             #self.kiosk_app.restart_kiosk()
         else:
@@ -747,6 +753,35 @@ class KioskFileDownloader:
         #}
         #self.kiosk_app.network.send_message(message)
 
+    def _release_video_preload(self):
+        """
+        Closes the warm video player before files are replaced: it holds the intro
+        open, which would make os.replace fail on Windows and keep serving the
+        old file everywhere else.
+        """
+        video_manager = getattr(self.kiosk_app, 'video_manager', None)
+        if video_manager:
+            video_manager.release_preload()
+
+    def _rewarm_video(self):
+        """Warm-starts the intro again from the files the sync left behind."""
+        video_manager = getattr(self.kiosk_app, 'video_manager', None)
+        if video_manager and getattr(self.kiosk_app, 'assigned_room', None):
+            video_manager.preload_video_type('intro')
+
+    def _prefetch_video_audio(self):
+        """Re-extract audio for the assigned room's videos, which may have changed in this sync."""
+        video_manager = getattr(self.kiosk_app, 'video_manager', None)
+        room = getattr(self.kiosk_app, 'assigned_room', None)
+        if video_manager and room:
+            video_manager.prefetch_room_audio(room)
+
+    def _refresh_sound_cache(self):
+        """Drop decoded sounds, which may have changed in this sync, and preload the room's set again."""
+        audio_manager = getattr(self.kiosk_app, 'audio_manager', None)
+        if audio_manager:
+            audio_manager.invalidate_sound_cache()
+
     def request_sync(self):
         """Request a sync operation."""
         print("[kiosk_file_downloader] Sync requested")
@@ -846,11 +881,16 @@ class KioskFileDownloader:
                     if status.get('status') == 'active':
                         last_queue_message = 0  # Reset queue message timer when active
                         try:
+                            self._release_video_preload()
                             if self._check_for_updates():
                                 self.sync_requested = False
                                 self._reset_sync_state()
                                 print("[kiosk_file_downloader] Sync completed successfully")
+                                self._prefetch_video_audio()
+                                self._rewarm_video()
+                                self._refresh_sound_cache()
                             else:
+                                self._rewarm_video()
                                 print("[kiosk_file_downloader] Sync failed, will retry...")
                                 if self._is_stalled():
                                     print("[kiosk_file_downloader] Sync appears stalled during update...")
@@ -858,6 +898,7 @@ class KioskFileDownloader:
                                 time.sleep(2)
                         except Exception as e:
                             print(f"[kiosk_file_downloader] Error during sync: {e}")
+                            self._rewarm_video()
                             if self._is_stalled():
                                 self._reset_sync_state()
                             time.sleep(2)
@@ -3,7 +3,6 @@ import time
 import threading
 import io
 import base64
-import pyaudio
 import os
 import pygame # Import pygame directly for sound playback here
 import traceback # Ensure traceback is imported
@@ -29,7 +28,7 @@ STATE_CANCELED = 7
 RECORD_SECONDS = 2  # Reduced recording duration
 CHUNK = 1024
 # --- IMPROVED AUDIO FORMAT PARAMETERS ---
-FORMAT = pyaudio.paInt16  # Use 16-bit signed integer format (better quality than 8-bit)
+SAMPLE_WIDTH = 2  # 16-bit signed samples (pyaudio.paInt16), better quality than 8-bit
 CHANNELS = 1  # Mono recording (saves space compared to stereo)
 RATE = 11025  # 11kHz sample rate (better balance between quality and file size)
 # --- END IMPROVED AUDIO FORMAT PARAMETERS ---
@@ -39,14 +38,80 @@ class RecorderThread(QThread):
     recording_complete = pyqtSignal(bytes)
     recording_error = pyqtSignal(str)
 
-    def __init__(self, duration):
+    def __init__(self, duration, capture_hub=None):
         super().__init__()
         self.duration = duration
+        self.capture_hub = capture_hub # Shared MicCaptureHub; None opens the default input device directly
         self._is_running = True
         self._lock = threading.Lock()  # Add thread safety
 
     def run(self):
         print("[Kiosk Soundcheck] RecorderThread started")
+        if self.capture_hub is not None:
+            frames = self._record_from_hub()
+        else:
+            frames = self._record_from_device()
+
+        # Process the recording result
+        with self._lock:
+            is_running = self._is_running
+        
+        if is_running and frames: # Only emit if not cancelled and data exists
+            # Create a proper WAV file in memory
+            try:
+                wave_buffer = io.BytesIO()
+                
+                with wave.open(wave_buffer, 'wb') as wf:
+                    wf.setnchannels(CHANNELS)
+                    wf.setsampwidth(SAMPLE_WIDTH)
+                    wf.setframerate(RATE)
+                    wf.writeframes(b''.join(frames))
+                
+                # Get the complete WAV data
+                wave_data = wave_buffer.getvalue()
+                print(f"[Kiosk Soundcheck] Created WAV file in memory: {len(wave_data)} bytes")
+                self.recording_complete.emit(wave_data)
+            except Exception as e:
+                print(f"[Kiosk Soundcheck] Error creating WAV file: {e}")
+                self.recording_error.emit(f"Error creating WAV file: {e}")
+        elif is_running and not frames:
+             print("[Kiosk Soundcheck] No audio data recorded, emitting error.")
+             self.recording_error.emit("No audio data recorded (frames list is empty).")
+        else:
+            print("[Kiosk Soundcheck] Recording was stopped or failed, not emitting complete signal.")
+
+    def _record_from_hub(self):
+        """Records through the shared capture hub, converted to the soundcheck's 16-bit 11 kHz format."""
+        frames = []
+        subscription = None
+        try:
+            subscription = self.capture_hub.subscribe("soundcheck", chunk_frames=CHUNK, rate=RATE, sample_format='int16')
+            subscription.drain()
+            print("[Kiosk Soundcheck] Recording through shared microphone capture.")
+            for i in range(0, int(RATE / CHUNK * self.duration)):
+                with self._lock:
+                    if not self._is_running:
+                        print("[Kiosk Soundcheck] Recording cancelled.")
+                        break
+                data = subscription.read(timeout=2.0)
+                if data is None:
+                    raise IOError("Timed out waiting for microphone audio.")
+                frames.append(data)
+            print("[Kiosk Soundcheck] Recording finished loop.")
+        except Exception as e:
+            error_msg = f"Recording failed: {e}"
+            print(f"[Kiosk Soundcheck] {error_msg}")
+            traceback.print_exc()
+            self.recording_error.emit(error_msg)
+            with self._lock:
+                self._is_running = False
+        finally:
+            if subscription is not None:
+                subscription.close()
+        return frames
+
+    def _record_from_device(self):
+        import pyaudio # Only this fallback path opens the device directly
         audio = pyaudio.PyAudio()
         stream = None
         frames = []
@@ -70,7 +135,7 @@ class RecorderThread(QThread):
                  raise IOError("No suitable input audio device found.")
 
             print(f"[Kiosk Soundcheck] Opening audio stream with device index {input_device_index}")
-            stream = audio.open(format=FORMAT,
+            stream = audio.open(format=pyaudio.paInt16,
                                 channels=CHANNELS,
                                 rate=RATE,
                                 input=True,
@@ -127,35 +192,7 @@ class RecorderThread(QThread):
                     print("[Kiosk Soundcheck] PyAudio terminated in recorder thread.")
                 except Exception as e:
                     print(f"[Kiosk Soundcheck] Error terminating PyAudio: {e}")
-
-        # Process the recording result
-        with self._lock:
-            is_running = self._is_running
-        
-        if is_running and frames: # Only emit if not cancelled and data exists
-            # Create a proper WAV file in memory
-            try:
-                wave_buffer = io.BytesIO()
-                sample_width = pyaudio.get_sample_size(FORMAT)  # Should be 2 for paInt16
-                
-                with wave.open(wave_buffer, 'wb') as wf:
-                    wf.setnchannels(CHANNELS)
-                    wf.setsampwidth(sample_width)
-                    wf.setframerate(RATE)
-                    wf.writeframes(b''.join(frames))
-                
-                # Get the complete WAV data
-                wave_data = wave_buffer.getvalue()
-                print(f"[Kiosk Soundcheck] Created WAV file in memory: {len(wave_data)} bytes")
-                self.recording_complete.emit(wave_data)
-            except Exception as e:
-                print(f"[Kiosk Soundcheck] Error creating WAV file: {e}")
-                self.recording_error.emit(f"Error creating WAV file: {e}")
-        elif is_running and not frames:
-             print("[Kiosk Soundcheck] No audio data recorded, emitting error.")
-             self.recording_error.emit("No audio data recorded (frames list is empty).")
-        else:
-            print("[Kiosk Soundcheck] Recording was stopped or failed, not emitting complete signal.")
+        return frames
 
     def stop(self):
         print("[Kiosk Soundcheck] Stop called on RecorderThread.")
@@ -549,7 +586,7 @@ class KioskSoundcheckWidget(QWidget):
 
         # Start recorder thread
         print("[Kiosk Soundcheck] Creating and starting RecorderThread.")
-        self.recorder_thread = RecorderThread(RECORD_SECONDS)
+        self.recorder_thread = RecorderThread(RECORD_SECONDS, capture_hub=getattr(self.kiosk_app, 'mic_hub', None))
         self.recorder_thread.recording_complete.connect(self.on_recording_complete)
         self.recorder_thread.recording_error.connect(self.on_recording_error)
         # Ensure thread cleanup when finished
@@ -13,30 +13,54 @@ print("[kiosk timer] Importing traceback...", flush=True)
 import traceback
 print("[kiosk timer] Imported traceback.", flush=True)
 print("[kiosk timer] Importing PyQt5.QtCore...", flush=True)
-from PyQt5.QtCore import QMetaObject, Qt, QTimer, Q_ARG, QThread, pyqtSignal
+from PyQt5.QtCore import QMetaObject, Qt, QTimer, Q_ARG, QObject, pyqtSignal, pyqtSlot
 print("[kiosk timer] Imported PyQt5.QtCore.", flush=True)
 # Removed tkinter and PIL imports as they are no longer needed for display
 
 print("[kiosk timer] Ending imports ...", flush=True)
 
-class TimerUpdateThread(QThread):
+class TimerUpdateThread(QObject):
+    """
+    Single-shot wakeups for the KioskTimer, armed for the moment the displayed
+    MM:SS next changes, instead of a 100 ms polling loop. schedule() may be
+    called from any thread; the QTimer lives on the thread that created this
+    object (the GUI thread).
+    """
     update_signal = pyqtSignal()
-    
+    _schedule_signal = pyqtSignal(int)
+
     def __init__(self, timer_instance):
         print("[kiosk timer] Initializing TimerUpdateThread...", flush=True)
         super().__init__()
         self.timer_instance = timer_instance
         self.running = True
+        self.wakeups = 0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._on_timeout)
+        self._schedule_signal.connect(self._arm) # Queued when emitted from another thread
         print("[kiosk timer] TimerUpdateThread initialized.", flush=True)
-        
-    def run(self):
-        while self.running:
-            self.update_signal.emit()
-            self.msleep(100)  # Sleep for 100ms
-            
+
+    def schedule(self, delay_ms):
+        """Wakes the timer once after delay_ms, replacing any pending wakeup. A negative delay cancels."""
+        self._schedule_signal.emit(delay_ms)
+
+    @pyqtSlot(int)
+    def _arm(self, delay_ms):
+        if delay_ms < 0 or not self.running:
+            self._timer.stop()
+        else:
+            self._timer.start(delay_ms)
+
+    def _on_timeout(self):
+        self.wakeups += 1
+        self.update_signal.emit()
+
     def stop(self):
         print("[kiosk timer] Stopping TimerUpdateThread...", flush=True)
         self.running = False
+        self.schedule(-1)
         print("[kiosk timer] TimerUpdateThread stopped.", flush=True)
 
 class KioskTimer:
@@ -53,11 +77,10 @@ class KioskTimer:
         self.game_lost = False  #Flag to indicate game loss
         self.game_won = False # Flag for game won
 
-        # Create and start the timer update thread
+        # Wakes update_timer_loop only when the displayed time changes, see _schedule_tick()
         print("[kiosk timer] Creating timer update thread...", flush=True)
         self.timer_thread = TimerUpdateThread(self)
         self.timer_thread.update_signal.connect(self.update_timer_loop)
-        self.timer_thread.start()
         print("[kiosk timer] Timer update thread started.", flush=True)
 
         # Delay Qt timer initialization until the Qt app/overlay is likely ready
@@ -129,6 +152,7 @@ class KioskTimer:
 
         # Update the display regardless of command to show current state/time
         self.update_display()
+        self._schedule_tick()
         print(f"[kiosk timer] Timer command {command} handling complete.", flush=True)
 
     def update_timer_loop(self):
@@ -166,6 +190,25 @@ class KioskTimer:
         except Exception as e:
             print(f"[kiosk timer] Error in update_timer_loop: {e}", flush=True)
             traceback.print_exc()
+        finally:
+            self._schedule_tick()
+
+    def _schedule_tick(self):
+        """
+        Arms the next wakeup for when the displayed MM:SS changes, i.e. when
+        time_remaining drops below the next whole second. The 42-minute and
+        zero checks fall on whole seconds too. Nothing is armed while stopped.
+        """
+        if not self.is_running or self.last_update is None:
+            self.timer_thread.schedule(-1)
+            return
+        remaining = self.time_remaining - (time.time() - self.last_update)
+        if remaining <= 0:
+            self.timer_thread.schedule(0)
+            return
+        fraction = remaining - int(remaining)
+        # A few ms late so the boundary has passed when we wake
+        self.timer_thread.schedule(int((fraction if fraction > 0 else 1.0) * 1000) + 5)
 
     def get_time_str(self):
         """Get the current time remaining as a formatted string MM:SS."""
@@ -217,5 +260,6 @@ class KioskTimer:
         self.game_won = False   # Reset game won flag
         print(f"[kiosk timer] Timer started with {self.time_remaining} seconds remaining", flush=True)
         self.update_display()
+        self._schedule_tick()
 
     # Removed _do_update_display as it's no longer needed; logic is in update_display
\ No newline at end of file
@@ -11,8 +11,6 @@ from os import environ
 environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "1"
 import pygame
 from qt_overlay import Overlay
-from kiosk_file_downloader import KioskFileDownloader
-import base64
 import threading
 from PyQt5.QtCore import QMetaObject, Qt, Q_ARG, QTimer, QObject, pyqtSlot # Import for invoking methods thread-safely
 from kiosk_soundcheck import KioskSoundcheckWidget # Assuming it's in the same directory or sys.path is set
@@ -98,6 +96,8 @@ class MessageHandler:
                     self.file_downloader = None
 
                 print(f"[message_handler] Creating new file downloader for admin IP: {admin_ip}", flush=True)
+                # Imported here so requests stays out of the kiosk's startup path
+                from kiosk_file_downloader import KioskFileDownloader
                 self.file_downloader = KioskFileDownloader(self.kiosk_app, admin_ip)
                 self.file_downloader.start()
                 self._last_admin_ip = admin_ip
@@ -352,6 +352,9 @@ class MessageHandler:
                 self.kiosk_app.ui.hint_cooldown = False
                 self.kiosk_app.ui.current_hint = None
                 self.kiosk_app.audio_manager.current_music = None
+                # --- Pick the video decoder and warm the audio cache for this room (background thread) ---
+                self.video_manager.assign_room(assigned_room_value)
+                self.kiosk_app.audio_manager.preload_room_sounds(assigned_room_value)
                 # --- GUI update (schedule on main thread) ---
                 self.schedule_timer(0, lambda room=assigned_room_value: self.kiosk_app.ui.setup_room_interface(room))
 
@@ -359,20 +362,15 @@ class MessageHandler:
                 if msg.get('room') == self.kiosk_app.assigned_room:
                     print(f"[message handler][DEBUG] Processing hint (Command ID: {command_id})")
                     hint_data = None # Initialize
-                    # --- Image processing (safe in network thread) ---
+                    # --- Image hints are passed by path; decoding and scaling happen on the prewarm thread ---
                     if msg.get('has_image') and 'image_path' in msg:
                         image_path = os.path.join(os.path.dirname(__file__), msg['image_path'])
                         if os.path.exists(image_path):
-                            try:
-                                with open(image_path, 'rb') as f:
-                                    image_bytes = f.read()
-                                hint_data = {
-                                    'text': msg.get('text', ''),
-                                    'image': base64.b64encode(image_bytes).decode()
-                                }
-                            except Exception as img_err:
-                                print(f"[message handler] Error processing hint image {image_path}: {img_err}")
-                                hint_data = msg.get('text', 'Error loading image hint') # Fallback text
+                            Overlay.prepare_hint_image(image_path)
+                            hint_data = {
+                                'text': msg.get('text', ''),
+                                'image_path': image_path
+                            }
                         else:
                             print(f"[message handler] Error: Image file not found at {image_path}")
                             hint_data = msg.get('text', 'Image hint file missing') # Fallback text
@@ -430,6 +428,12 @@ class MessageHandler:
                 # Replace root.after with QTimer.singleShot
                 self.schedule_timer(0, lambda vt=msg['video_type'], m=msg['minutes']: self.kiosk_app.play_video(vt, m))
 
+            elif msg_type == 'preload_video' and is_targeted:
+                # GM opened the video controls: warm-start the selected video (background thread)
+                video_type = msg.get('video_type', 'intro')
+                print(f"[message handler][DEBUG] Preloading '{video_type}' video (Command ID: {command_id})")
+                self.video_manager.preload_video_type(video_type)
+
             elif msg_type == 'clear_hints' and is_targeted:
                 print(f"[message handler][DEBUG] Processing clear hints command (Command ID: {command_id})")
                 # KioskApp.clear_hints modifies state and calls UI/Overlay methods
@@ -479,6 +483,8 @@ class MessageHandler:
                     print(f"[message handler][DEBUG] Looking for solution video at: {video_path}")
 
                     if os.path.exists(video_path):
+                        # Extract the audio now so playback starts as soon as the player taps
+                        self.video_manager.audio_cache.prefetch([video_path])
                         # State update (safe)
                         self.kiosk_app.hints_received += 1
                         print(f"[message handler][DEBUG] Setting up solution video interface: {video_path}")
@@ -570,7 +576,8 @@ class MessageHandler:
                     return # Do not proceed if video is playing and force is False
 
                 #print(f"[message handler] Processing request_screenshot command (CmdID: {command_id}, Force: {force_screenshot})")
-                self.kiosk_app.take_screenshot_requested = True
+                # One-off capture for admins without a screenshot stream lease; no longer waits for the next announce
+                threading.Thread(target=self.kiosk_app.send_screenshot, daemon=True).start()
 
             elif msg_type == 'soundcheck_command' and is_targeted:
                 print(f"[Message Handler] Received soundcheck command (ID: {command_id})")
@@ -0,0 +1,256 @@
+# mic_capture.py
+print("[mic capture] Beginning imports ...", flush=True)
+print("[mic capture] Importing threading...", flush=True)
+import threading
+print("[mic capture] Imported threading.", flush=True)
+print("[mic capture] Importing pyaudio...", flush=True)
+import pyaudio
+print("[mic capture] Imported pyaudio.", flush=True)
+print("[mic capture] Importing numpy...", flush=True)
+import numpy as np
+print("[mic capture] Imported numpy.", flush=True)
+print("[mic capture] Importing StreamResampler from voice_codec...", flush=True)
+from voice_codec import StreamResampler
+print("[mic capture] Imported StreamResampler from voice_codec.", flush=True)
+print("[mic capture] Ending imports ...", flush=True)
+
+class SampleRing:
+    """
+    Single-producer/single-consumer ring of float32 samples. The capture
+    callback only advances the write count and the subscriber only advances
+    the read count, so neither side takes a lock. When the ring is full the
+    incoming block is dropped and counted, never blocking the device callback.
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._buf = np.zeros(capacity, dtype=np.float32)
+        self._written = 0 # Total samples written; only the producer assigns this
+        self._read = 0 # Total samples read; only the consumer assigns this
+        self.overflows = 0
+
+    def available(self):
+        return self._written - self._read
+
+    def write(self, samples):
+        count = len(samples)
+        if count > self.capacity - (self._written - self._read):
+            self.overflows += 1
+            return False
+        start = self._written % self.capacity
+        first = min(count, self.capacity - start)
+        self._buf[start:start + first] = samples[:first]
+        self._buf[:count - first] = samples[first:]
+        self._written += count # Publish only after the copy
+        return True
+
+    def read(self, count):
+        count = min(count, self.available())
+        start = self._read % self.capacity
+        first = min(count, self.capacity - start)
+        out = np.concatenate((self._buf[start:start + first], self._buf[:count - first]))
+        self._read += count
+        return out
+
+    def clear(self):
+        self._read = self._written
+
+class MicSubscription:
+    """
+    One consumer of the shared microphone. Delivers fixed-size chunks at its
+    own sample rate and sample format ('float32' or 'int16'), converted on the
+    consumer's side so the capture callback only copies.
+
+    Pull mode: call read() from your own thread. Push mode: pass a callback
+    and a worker thread calls it with each chunk as a numpy array.
+    """
+    def __init__(self, hub, name, chunk_frames, rate, sample_format, callback=None, buffer_seconds=2.0):
+        self.hub = hub
+        self.name = name
+        self.chunk_frames = chunk_frames
+        self.rate = rate
+        self.sample_format = sample_format
+        self.callback = callback
+        self.ring = SampleRing(int(hub.RATE * buffer_seconds))
+        self._resampler = StreamResampler(hub.RATE, rate) if rate != hub.RATE else None
+        self._pending = np.zeros(0, dtype=np.float32) # Converted samples not yet handed out
+        self._data_event = threading.Event()
+        self.closed = False
+        self._worker = None
+        if callback is not None:
+            self._worker = threading.Thread(target=self._callback_worker, daemon=True, name=f"Mic-{name}")
+            self._worker.start()
+
+    def _feed(self, samples):
+        """Called from the capture callback."""
+        self.ring.write(samples)
+        self._data_event.set()
+
+    def read_samples(self, timeout=None):
+        """Returns the next chunk as a numpy array, or None on timeout or when closed."""
+        while len(self._pending) < self.chunk_frames:
+            if self.closed:
+                return None
+            available = self.ring.available()
+            if available == 0:
+                self._data_event.clear()
+                if self.ring.available() == 0 and not self._data_event.wait(timeout):
+                    return None
+                continue
+            samples = self.ring.read(available)
+            if self._resampler is not None:
+                samples = self._resampler.process(samples)
+            self._pending = np.concatenate((self._pending, samples))
+        chunk, self._pending = self._pending[:self.chunk_frames], self._pending[self.chunk_frames:]
+        if self.sample_format == 'int16':
+            return np.clip(np.round(chunk * 32767.0), -32768, 32767).astype(np.int16)
+        return chunk
+
+    def read(self, timeout=None):
+        """Returns the next chunk as bytes, or None on timeout or when closed."""
+        chunk = self.read_samples(timeout)
+        return chunk.tobytes() if chunk is not None else None
+
+    def drain(self):
+        """Discards everything captured so far, e.g. before starting a recording."""
+        self.ring.clear()
+        self._pending = np.zeros(0, dtype=np.float32)
+
+    def _callback_worker(self):
+        while not self.closed:
+            chunk = self.read_samples(timeout=0.5)
+            if chunk is None:
+                continue
+            try:
+                self.callback(chunk)
+            except Exception as e:
+                print(f"[mic capture] Error in '{self.name}' subscriber callback: {e}", flush=True)
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+class MicCaptureHub:
+    """
+    Owns the kiosk's microphone. A single PyAudio input stream (float32 mono)
+    is opened on the first subscribe() and fanned out to every subscriber's
+    ring buffer, so the tap detector, the voice link and the soundcheck
+    recorder share one device handle instead of contending for it.
+    The stream stays open while anyone is subscribed, and for IDLE_CLOSE_SECONDS
+    after the last one leaves so a quick reconnect doesn't reopen the device.
+    """
+    RATE = 44100
+    CHANNELS = 1
+    CHUNK = 1024
+    IDLE_CLOSE_SECONDS = 30.0
+
+    def __init__(self, input_device_index=None):
+        self.input_device_index = input_device_index
+        self._lock = threading.Lock()
+        self._subscribers = () # Replaced, never mutated, so the callback can iterate without locking
+        self._audio = None
+        self._stream = None
+        self._idle_timer = None
+        self.device_opens = 0
+        self.callback_errors = 0
+
+    def subscribe(self, name, chunk_frames=None, rate=None, sample_format='float32', callback=None, buffer_seconds=2.0):
+        """
+        Adds a subscriber and opens the device if needed. Raises IOError if the
+        microphone can't be opened.
+        """
+        subscription = MicSubscription(self, name, chunk_frames or self.CHUNK, rate or self.RATE,
+                                       sample_format, callback, buffer_seconds)
+        with self._lock:
+            if self._idle_timer:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+            if self._stream is None:
+                try:
+                    self._open_stream_locked()
+                except Exception:
+                    subscription.closed = True
+                    raise
+            self._subscribers = self._subscribers + (subscription,)
+        print(f"[mic capture] '{name}' subscribed ({len(self._subscribers)} active).", flush=True)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscription.closed = True
+        subscription._data_event.set() # Wake a blocked reader
+        with self._lock:
+            if subscription not in self._subscribers:
+                return
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscription)
+            remaining = len(self._subscribers)
+            if remaining == 0 and self._stream is not None and self._idle_timer is None:
+                self._idle_timer = threading.Timer(self.IDLE_CLOSE_SECONDS, self._close_if_idle)
+                self._idle_timer.daemon = True
+                self._idle_timer.start()
+        print(f"[mic capture] '{subscription.name}' unsubscribed ({remaining} active).", flush=True)
+
+    def _open_stream_locked(self):
+        if self._audio is None:
+            self._audio = pyaudio.PyAudio()
+        print("[mic capture] Opening microphone input stream...", flush=True)
+        self._stream = self._audio.open(
+            format=pyaudio.paFloat32,
+            channels=self.CHANNELS,
+            rate=self.RATE,
+            input=True,
+            frames_per_buffer=self.CHUNK,
+            input_device_index=self.input_device_index,
+            stream_callback=self._capture_callback
+        )
+        self.device_opens += 1
+        print("[mic capture] Microphone input stream opened.", flush=True)
+
+    def _capture_callback(self, in_data, frame_count, time_info, status):
+        try:
+            samples = np.frombuffer(in_data, dtype=np.float32)
+            for subscription in self._subscribers:
+                subscription._feed(samples)
+        except Exception:
+            self.callback_errors += 1
+        return (None, pyaudio.paContinue)
+
+    def _close_if_idle(self):
+        with self._lock:
+            self._idle_timer = None
+            if self._subscribers:
+                return
+            self._close_stream_locked()
+
+    def _close_stream_locked(self):
+        if self._stream is None:
+            return
+        try:
+            if self._stream.is_active():
+                self._stream.stop_stream()
+            self._stream.close()
+            print("[mic capture] Microphone input stream closed.", flush=True)
+        except Exception as e:
+            print(f"[mic capture] Error closing microphone stream: {e}", flush=True)
+        self._stream = None
+
+    def get_stats(self):
+        subscribers = self._subscribers
+        return {
+            'open': self._stream is not None,
+            'device_opens': self.device_opens,
+            'subscribers': {s.name: {'overflows': s.ring.overflows} for s in subscribers},
+        }
+
+    def stop(self):
+        """Closes the device and releases every subscriber."""
+        for subscription in self._subscribers:
+            self.unsubscribe(subscription)
+        with self._lock:
+            if self._idle_timer:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+            self._close_stream_locked()
+            if self._audio is not None:
+                try:
+                    self._audio.terminate()
+                except Exception:
+                    pass
+                self._audio = None
@@ -3,7 +3,7 @@ print("[qt_classes] Importing PyQt5.QtCore...", flush=True)
 from PyQt5.QtCore import Qt, QRectF, QThread, pyqtSignal, Qt
 print("[qt_classes] Imported PyQt5.QtCore.", flush=True)
 print("[qt_classes] Importing PyQt5.QtGui...", flush=True)
-from PyQt5.QtGui import QImage
+from PyQt5.QtGui import QImage, QPixmap, QPainter, QColor, QFontMetrics
 print("[qt_classes] Imported PyQt5.QtGui.", flush=True)
 print("[qt_classes] Importing PyQt5.QtWidgets...", flush=True)
 from PyQt5.QtWidgets import QGraphicsView, QGraphicsItem
@@ -83,12 +83,49 @@ class TimerThread(QThread):
         except Exception as e:
             print(f"[qt_classes] Error in TimerThread.update_display: {e}", flush=True)
 
+class TimerGlyphs:
+    """
+    Timer characters rendered once per text color (i.e. per room theme), so a
+    tick only swaps the pixmaps of the characters that changed instead of
+    laying out rich text again.
+    """
+    CHARACTERS = "0123456789:"
+
+    def __init__(self, font):
+        self.font = font
+        self.metrics = QFontMetrics(font)
+        self._sets = {} # color -> {character: QPixmap}
+
+    def prerender(self, color):
+        """Renders the whole character set for color, if not done yet. GUI thread only."""
+        for character in self.CHARACTERS:
+            self.glyph(color, character)
+
+    def glyph(self, color, character):
+        glyphs = self._sets.setdefault(color, {})
+        pixmap = glyphs.get(character)
+        if pixmap is None:
+            pixmap = QPixmap(max(1, self.metrics.horizontalAdvance(character)), self.metrics.height())
+            pixmap.fill(Qt.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.TextAntialiasing)
+            painter.setFont(self.font)
+            painter.setPen(QColor(color))
+            painter.drawText(0, self.metrics.ascent(), character)
+            painter.end()
+            glyphs[character] = pixmap
+        return pixmap
+
 class TimerDisplay:
     """Handles the visual elements of the timer display"""
     def __init__(self):
         print("[qt_classes] Initializing TimerDisplay...", flush=True)
         self.scene = None
-        self.text_item = None
+        self.digits_item = None # Rotated parent of the per-character glyph items
+        self.glyph_items = []
+        self.glyphs = None # TimerGlyphs
+        self.time_str = "" # Text currently shown
+        self.time_color = None # Color it was rendered in
         self.bg_image_item = None
         self._current_image = None
         
@@ -105,7 +142,11 @@ class TimerDisplay:
         print("[qt_classes] TimerDisplay initialized.", flush=True)
 
 class VideoFrameItem(QGraphicsItem):
-    """A QGraphicsItem that paints a QImage directly, avoiding QPixmap conversion."""
+    """
+    A QGraphicsItem that paints a QImage directly, avoiding QPixmap conversion.
+    During playback the QImage wraps a VideoPlayer frame slot buffer, so frames
+    are painted from the decoder's memory without copies.
+    """
     def __init__(self, parent=None):
         print("[qt_classes] Initializing VideoFrameItem...", flush=True)
         super().__init__(parent)
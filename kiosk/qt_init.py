@@ -2,7 +2,6 @@ print("[qt init] Beginning imports ...")
 from PyQt5.QtCore import Qt, QRectF, QThread, pyqtSignal, QMetaObject, Q_ARG, Qt, QPointF, pyqtSlot, QBuffer, QIODevice, QObject, QTimer
 from PyQt5.QtGui import QTransform, QFont, QPainter, QPixmap, QImage, QPen, QBrush, QColor
 from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QGraphicsScene, QGraphicsView, QGraphicsTextItem, QGraphicsPixmapItem, QGraphicsRectItem, QGraphicsItem
-from PIL import Image
 import sys
 import win32gui
 import win32con
@@ -11,9 +10,9 @@ import io
 import traceback
 import numpy as np # Needed for type hints / checks potentially
 from config import ROOM_CONFIG
-import cv2
 import base64
-from qt_classes import ClickableHintView, ClickableVideoView, TimerThread, TimerDisplay, HelpButtonThread, HintTextThread, HintRequestTextThread, VideoFrameItem
+from qt_classes import ClickableHintView, ClickableVideoView, TimerThread, TimerDisplay, TimerGlyphs, HelpButtonThread, HintTextThread, HintRequestTextThread, VideoFrameItem
+from asset_cache import text_layers
 import threading # Add threading import for thread ID
 print("[qt init] Ending imports ...")
 
@@ -349,7 +348,9 @@ def init_hint_text_overlay(cls):
             'window': None,
             'scene': None,
             'view': None,
-            'text_item': None,
+            'layer_item': None, # Pixmap item showing the rendered hint text layer
+            'font': None,
+            'text': "", # Hint text currently shown
             'bg_image_item': None,
             'current_background': None
         }
@@ -391,13 +392,12 @@ def init_hint_text_overlay(cls):
         cls._hint_text['view'].setGeometry(0, 0, width, height)
         cls._hint_text['scene'].setSceneRect(0, 0, width, height)
 
-    # Create text item if needed
-    if not cls._hint_text['text_item']:
-        cls._hint_text['text_item'] = QGraphicsTextItem()
-        cls._hint_text['text_item'].setDefaultTextColor(Qt.white)
-        font = QFont('Arial', 22)
-        cls._hint_text['text_item'].setFont(font)
-        cls._hint_text['scene'].addItem(cls._hint_text['text_item'])
+    # Create text layer item if needed; the text itself is rendered through the text layer cache
+    if not cls._hint_text['layer_item']:
+        cls._hint_text['font'] = QFont('Arial', 22)
+        cls._hint_text['layer_item'] = QGraphicsPixmapItem()
+        cls._hint_text['layer_item'].setZValue(1)  # Text should be above the background
+        cls._hint_text['scene'].addItem(cls._hint_text['layer_item'])
 
     # Set up background image for the hint text (not the main background)
     if not cls._hint_text['bg_image_item']:
@@ -532,21 +532,18 @@ def init_gm_assistance_overlay(cls):
         cls._gm_assistance_overlay['view'].setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         cls._gm_assistance_overlay['view'].setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
 
-        # Create and set up text item with centered text
-        cls._gm_assistance_overlay['text_item'] = QGraphicsTextItem()
-        cls._gm_assistance_overlay['text_item'].setDefaultTextColor(Qt.white)
+        # Text with proper centering - using table for guaranteed centering. It never
+        # changes, so it is rendered once into a pixmap that show_gm_assistance() just moves.
         font = QFont('Arial', 24)
-        cls._gm_assistance_overlay['text_item'].setFont(font)
-        
-        # Set text with proper centering - using table for guaranteed centering
-        cls._gm_assistance_overlay['text_item'].setHtml(
+        cls._gm_assistance_overlay['text_item'] = QGraphicsPixmapItem(text_layers.html(
             '<div style="width: 500px;">'
             '<table width="100%" cellpadding="0" cellspacing="0"><tr><td align="center">'
             'Your game master offered<br>'
             'in-room assistance'
             '</td></tr></table>'
-            '</div>'
-        )
+            '</div>',
+            font, '#ffffff'
+        ))
         cls._gm_assistance_overlay['scene'].addItem(cls._gm_assistance_overlay['text_item'])
 
         # Create button backgrounds (rectangles)
@@ -759,15 +756,14 @@ def init_timer(cls):
         print(f"[qt init][{threading.get_ident()}] Setting up background placeholder...")
         cls._timer.bg_image_item = cls._timer.scene.addPixmap(QPixmap())
         
-        # Create timer text and add it after background
-        print(f"[qt init][{threading.get_ident()}] Setting up timer text (QGraphicsTextItem)...")
-        cls._timer.text_item = QGraphicsTextItem()
-        print(f"[qt init][{threading.get_ident()}] QGraphicsTextItem created (associated QTextDocument implicitly created).")
-        cls._timer.text_item.setDefaultTextColor(Qt.white)
+        # Timer text is drawn from pre-rendered glyphs, added after the background
+        print(f"[qt init][{threading.get_ident()}] Setting up timer glyphs...")
         font = QFont('Arial', 120)
         font.setWeight(75)
-        cls._timer.text_item.setFont(font)
-        cls._timer.scene.addItem(cls._timer.text_item)
+        cls._timer.glyphs = TimerGlyphs(font)
+        cls._timer.digits_item = QGraphicsPixmapItem()
+        cls._timer.digits_item.setPos(350, 145)
+        cls._timer.scene.addItem(cls._timer.digits_item)
             
         # Set up timer window dimensions and position
         width = 500
@@ -784,8 +780,8 @@ def init_timer(cls):
         )
             
         # Apply rotation to text
-        cls._timer.text_item.setTransform(QTransform())
-        cls._timer.text_item.setRotation(90)
+        cls._timer.digits_item.setTransform(QTransform())
+        cls._timer.digits_item.setRotation(90)
             
         print(f"[qt init][{threading.get_ident()}] Timer initialization complete")
 
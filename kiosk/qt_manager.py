@@ -122,15 +122,6 @@ class QtManager:
         Overlay.hide_view_image_button()
         Overlay.hide_view_solution_button()
 
-        # Clear hint text content directly (don't use QMetaObject.invokeMethod which causes errors)
-        if hasattr(Overlay, '_hint_text') and Overlay._hint_text and 'text_item' in Overlay._hint_text:
-            try:
-                # Direct call instead of using QMetaObject.invokeMethod
-                Overlay._hint_text['text_item'].setPlainText("")
-                if(self.message_handler.UI_DEBUG):print("[qt_manager] Cleared hint text content", flush=True)
-            except Exception as e:
-                print(f"[qt_manager] Error clearing hint text: {e}", flush=True)
-            
         # Reset hint data
         self.current_hint = None
         self.stored_image_data = None
@@ -260,7 +251,7 @@ class QtManager:
                 hint_text = text_or_data
             elif isinstance(text_or_data, dict):
                 hint_text = text_or_data.get('text', '')
-                self.stored_image_data = text_or_data.get('image') # Store potential image data
+                self.stored_image_data = text_or_data.get('image_path') # Path of the image hint, if any
                 # If image is a path or filename, store just the filename
                 img_val = text_or_data.get('image', None) or text_or_data.get('image_path', None)
                 if isinstance(img_val, str):
@@ -324,7 +315,7 @@ class QtManager:
             hint_text = self.current_hint
         elif isinstance(self.current_hint, dict):
             hint_text = self.current_hint.get('text', '')
-            image_data_exists = bool(self.current_hint.get('image'))
+            image_data_exists = bool(self.current_hint.get('image_path'))
             if image_data_exists and not hint_text:
                 hint_text = "Image hint received" # Restore placeholder text
 
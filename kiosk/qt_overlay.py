@@ -12,10 +12,6 @@ print("[qt_overlay] Importing PyQt5.QtWidgets...", flush=True)
 from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QGraphicsScene, QGraphicsView, QGraphicsTextItem, QGraphicsPixmapItem, QGraphicsRectItem, QGraphicsItem
 print("[qt_overlay] Imported PyQt5.QtWidgets.", flush=True)
 
-print("[qt_overlay] Importing PIL...", flush=True)
-from PIL import Image
-print("[qt_overlay] Imported PIL.", flush=True)
-
 print("[qt_overlay] Importing sys...", flush=True)
 import sys
 print("[qt_overlay] Imported sys.", flush=True)
@@ -32,10 +28,6 @@ print("[qt_overlay] Importing os...", flush=True)
 import os
 print("[qt_overlay] Imported os.", flush=True)
 
-print("[qt_overlay] Importing io...", flush=True)
-import io
-print("[qt_overlay] Imported io.", flush=True)
-
 print("[qt_overlay] Importing traceback...", flush=True)
 import traceback
 print("[qt_overlay] Imported traceback.", flush=True)
@@ -48,14 +40,6 @@ print("[qt_overlay] Importing config...", flush=True)
 from config import ROOM_CONFIG
 print("[qt_overlay] Imported config.", flush=True)
 
-print("[qt_overlay] Importing cv2...", flush=True)
-import cv2
-print("[qt_overlay] Imported cv2.", flush=True)
-
-print("[qt_overlay] Importing base64...", flush=True)
-import base64
-print("[qt_overlay] Imported base64.", flush=True)
-
 print("[qt_overlay] Importing qt_classes...", flush=True)
 from qt_classes import ClickableHintView, ClickableVideoView, TimerThread, TimerDisplay, HelpButtonThread, HintTextThread, HintRequestTextThread, VideoFrameItem
 print("[qt_overlay] Imported qt_classes.", flush=True)
@@ -64,6 +48,10 @@ print("[qt_overlay] Importing qt_init...", flush=True)
 from qt_init import init_fullscreen_hint, init_view_image_button, init_view_solution_button, init_video_display, init_hint_text_overlay, init_hint_request_text_overlay, init_gm_assistance_overlay, init_background, init_waiting_label, init_view_image_button, init_view_solution_button, init_timer, init_help_button
 print("[qt_overlay] Imported qt_init.", flush=True)
 
+print("[qt_overlay] Importing asset_cache...", flush=True)
+from asset_cache import asset_cache, text_layers
+print("[qt_overlay] Imported asset_cache.", flush=True)
+
 print("[qt_overlay] Importing threading...", flush=True)
 import threading
 print("[qt_overlay] Imported threading.", flush=True)
@@ -143,7 +131,7 @@ class OverlayBridge(QObject):
         # print("[qt_overlay] destroy_video_display_slot called")
         Overlay.destroy_video_display()
 
-    @pyqtSlot(object) # Frame data is a numpy array (object)
+    @pyqtSlot(object) # Frame data is a FrameSlot or numpy array (object)
     def update_video_frame_slot(self, frame_data):
         # print("[qt_overlay] update_video_frame_slot called") # Very noisy
         Overlay.update_video_frame(frame_data)
@@ -191,6 +179,7 @@ class OverlayBridge(QObject):
 
 def convert_cv_qt(cv_img):
     """Convert from an opencv image (assuming BGR) to QPixmap"""
+    import cv2 # Only needed here; kept off the overlay's import path
     try:
         rgb_image = cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGB)
         h, w, ch = rgb_image.shape
@@ -204,6 +193,10 @@ def convert_cv_qt(cv_img):
 
 class Overlay:
     TIMER_DEBUG = False
+    # Target sizes of the per-room images, shared by the loaders and prewarm_assets()
+    TIMER_BACKGROUND_SIZE = (500, 750)
+    BUTTON_SIZE = (320, 700)
+    BUTTON_SHADOW_SIZE = (440, 780)
     _app = None
     _window = None
     _parent_hwnd = None
@@ -214,6 +207,7 @@ class Overlay:
     _hint_text = None
     _hint_request_text = None
     _hint_request_text_thread = None
+    _cooldown_seconds = None # Number shown in the cooldown message, None when cleared
     _gm_assistance_overlay = None  # Add GM assistance overlay variable
     _victory_screen = None  # Victory screen data
     _loss_screen = None # Loss screen data
@@ -228,12 +222,15 @@ class Overlay:
     _video_is_initialized = False
     _bridge = None
     _last_frame = None
+    _video_frame_slot = None # VideoPlayer FrameSlot on screen, owned by the display until replaced
      # --- Fullscreen Hint ---
     _fullscreen_hint_window = None
     _fullscreen_hint_scene = None
     _fullscreen_hint_view = None
     _fullscreen_hint_pixmap_item = None
     _fullscreen_hint_pixmap = None # To store the loaded/scaled pixmap
+    _fullscreen_hint_size = None # Box hint images are scaled into (before the 90 degree rotation)
+    FULLSCREEN_HINT_MARGIN = 50
     _fullscreen_hint_ui_instance = None # To call restore_hint_view
     _fullscreen_hint_initialized = False
     # --- image/video buttons ---
@@ -276,7 +273,16 @@ class Overlay:
     _current_hint_text_color = "#ffffff"
     _current_timer_text_color = "#ffffff"
 
-    _hint_background_cache = {}
+    # Hint text backgrounds per room, in hint_backgrounds
+    _hint_backgrounds = {
+        1: "casino_heist.png",
+        2: "morning_after.png",
+        3: "wizard_trials.png",
+        4: "zombie_outbreak.png",
+        5: "haunted_manor.png",
+        6: "atlantis_rising.png",
+        7: "time_machine.png"
+    }
     
     @classmethod
     def init(cls):
@@ -346,6 +352,10 @@ class Overlay:
         cls._init_gm_assistance_overlay()
         cls._init_video_display() # Initialize video components
         cls._init_fullscreen_hint()
+        # When rotated 90 degrees, width is constrained by screen height and height by screen width
+        screen_geometry = QApplication.desktop().screenGeometry()
+        cls._fullscreen_hint_size = (screen_geometry.height() - 2 * cls.FULLSCREEN_HINT_MARGIN,
+                                     screen_geometry.width() - 2 * cls.FULLSCREEN_HINT_MARGIN)
 
         # Initialize timer and help button
         cls.init_timer()
@@ -366,6 +376,60 @@ class Overlay:
         print("[qt overlay] Initialization complete.")
         print("[qt_overlay] Overlay initialized.", flush=True)
     
+    @classmethod
+    def prewarm_assets(cls, room_number=None):
+        """
+        Loads every room's background, timer, hint and button images into the
+        asset cache on a background thread, at the sizes the overlays use, so
+        room switches and resets don't decode or scale anything. room_number,
+        if given, goes first. Files changed since they were cached are reloaded.
+        """
+        if not cls._initialized:
+            return
+        if cls._bridge and threading.current_thread() is not threading.main_thread():
+            # Widget sizes are read on the GUI thread (e.g. when called after a file sync)
+            QMetaObject.invokeMethod(cls._bridge, "execute_callback", Qt.QueuedConnection,
+                                     Q_ARG(object, lambda: cls.prewarm_assets(room_number)))
+            return
+        screen_size = cls._app.primaryScreen().size()
+        screen = (screen_size.width(), screen_size.height())
+        hint_size = None
+        if cls._hint_text and cls._hint_text.get('window'):
+            hint_size = (cls._hint_text['window'].width(), cls._hint_text['window'].height())
+        timer_backgrounds = cls._timer.timer_backgrounds if hasattr(cls, '_timer') else {}
+
+        rooms = sorted(ROOM_CONFIG['names'], key=lambda room: room != room_number)
+        assets = [(os.path.join("hint_button_backgrounds", "shadow.png"), cls.BUTTON_SHADOW_SIZE, 'fit')]
+        for room in rooms:
+            if room in ROOM_CONFIG['backgrounds']:
+                assets.append((os.path.join("Backgrounds", ROOM_CONFIG['backgrounds'][room]), screen, 'fill'))
+            if room in timer_backgrounds:
+                assets.append((os.path.join("timer_backgrounds", timer_backgrounds[room]), cls.TIMER_BACKGROUND_SIZE, 'stretch'))
+            if room in ROOM_CONFIG['buttons']:
+                assets.append((os.path.join("hint_button_backgrounds", ROOM_CONFIG['buttons'][room]), cls.BUTTON_SIZE, 'fit'))
+            if hint_size and room in cls._hint_backgrounds:
+                assets.append((os.path.join("hint_backgrounds", cls._hint_backgrounds[room]), hint_size, 'stretch'))
+
+        print(f"[qt overlay] Prewarming {len(assets)} overlay images...")
+        asset_cache.prewarm(assets, on_done=cls._promote_prewarmed_assets)
+
+    @classmethod
+    def _promote_prewarmed_assets(cls):
+        """Called from the prewarm thread. QPixmaps have to be made on the GUI thread."""
+        if cls._bridge:
+            QMetaObject.invokeMethod(cls._bridge, "execute_callback", Qt.QueuedConnection,
+                                     Q_ARG(object, asset_cache.promote_pending))
+
+    @classmethod
+    def prepare_hint_image(cls, image_path):
+        """
+        Decodes and scales a hint image to the fullscreen hint size on the
+        prewarm thread, so "View Image" shows it without decoding. Any thread.
+        """
+        if not cls._fullscreen_hint_size:
+            return
+        asset_cache.prewarm([(image_path, cls._fullscreen_hint_size, 'fit')], on_done=cls._promote_prewarmed_assets)
+
     @classmethod
     def set_kiosk_app(cls, kiosk_app):
         """Set the kiosk_app reference directly."""
@@ -380,12 +444,12 @@ class Overlay:
         print("[qt_overlay] Fullscreen hint initialized.", flush=True)
     
     @classmethod
-    def show_fullscreen_hint(cls, image_data_base64, ui_instance):
-        """Displays the base64 image data in a fullscreen Qt overlay."""
+    def show_fullscreen_hint(cls, image_path, ui_instance):
+        """Displays the hint image file in a fullscreen Qt overlay."""
         if not cls._initialized:
             print("[qt overlay] Overlay not initialized.")
             return
-        if not image_data_base64:
+        if not image_path:
             print("[qt overlay] No image data provided for fullscreen hint.")
             return
         if not ui_instance:
@@ -410,49 +474,20 @@ class Overlay:
             # Explicitly hide the view image button when showing fullscreen image
             cls.hide_view_image_button()
 
-            # 2. Decode and load image
-            image_bytes = base64.b64decode(image_data_base64)
-            q_image = QImage()
-            q_image.loadFromData(image_bytes)
-            if q_image.isNull():
-                print("[qt overlay] Failed to load image data into QImage.")
+            # 2. Get the image scaled to fit the screen (rotated); normally prepared when the hint arrived
+            scaled_pixmap = asset_cache.get_pixmap(image_path, cls._fullscreen_hint_size, 'fit')
+            if scaled_pixmap is None:
+                print(f"[qt overlay] Failed to load hint image: {image_path}")
                 cls._fullscreen_hint_ui_instance = None # Clear instance if failed
                 cls.show_all_overlays() # Restore UI on failure
                 return
-            pixmap = QPixmap.fromImage(q_image)
+            cls._fullscreen_hint_pixmap = scaled_pixmap # Store reference
+            new_width = scaled_pixmap.width()
+            new_height = scaled_pixmap.height()
 
-            # 3. Get screen dimensions for sizing calculations
+            # 3. Get screen dimensions for positioning
             screen_width = QApplication.desktop().screenGeometry().width()
             screen_height = QApplication.desktop().screenGeometry().height()
-            margin = 50 # Add some margin for padding
-
-            # For 90 degree rotation, we swap width/height in calculations
-            # The width becomes height, and height becomes width
-            available_width = screen_height - (2 * margin)  # When rotated, width is constrained by screen height
-            available_height = screen_width - (2 * margin)  # When rotated, height is constrained by screen width
-
-            # Get original dimensions
-            original_width = pixmap.width()
-            original_height = pixmap.height()
-
-            # Calculate scale factors for both dimensions
-            width_scale = available_width / original_width
-            height_scale = available_height / original_height
-
-            # Use the smaller scale factor to ensure image fits in both dimensions
-            scale_factor = min(width_scale, height_scale)
-
-            # Calculate new dimensions - we want this LARGE, not tiny
-            new_width = int(original_width * scale_factor)
-            new_height = int(original_height * scale_factor)
-
-            print(f"[qt overlay] Original image size: {original_width}x{original_height}")
-            print(f"[qt overlay] New image size: {new_width}x{new_height}")
-            print(f"[qt overlay] Scale factor: {scale_factor}")
-
-            # Scale the pixmap to the exact size we want
-            scaled_pixmap = pixmap.scaled(new_width, new_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            cls._fullscreen_hint_pixmap = scaled_pixmap # Store reference
 
             # 4. Configure scene and view for fullscreen display
             cls._fullscreen_hint_window.setGeometry(QApplication.desktop().screenGeometry())
@@ -761,6 +796,7 @@ class Overlay:
         cls._video_frame_item.setImage(None) # Set empty image in the custom item
         # --- END CHANGE ---
         cls._last_frame = None
+        cls._release_video_frame_slot()
 
         cls._video_frame_item.setPos(0,0)
 
@@ -803,6 +839,7 @@ class Overlay:
             if cls._video_frame_item:
                 cls._video_frame_item.setImage(None) # Clear the image
             cls._last_frame = None
+            cls._release_video_frame_slot()
 
     @classmethod
     def destroy_video_display(cls):
@@ -851,51 +888,88 @@ class Overlay:
             cls._video_frame_item = None
             cls._video_click_callback = None
             cls._last_frame = None
+            cls._release_video_frame_slot()
             cls._video_is_initialized = False
             print(f"[qt overlay][DESTROY_{thread_id}] Video display destroyed.")
         else:
             print(f"[qt overlay][DESTROY_{thread_id}] Video display not destroyed (window missing or not initialized).")
         print(f"[qt overlay][DESTROY_{thread_id}] --- destroy_video_display FINISHED (Thread: {thread_id}) ---") # ADDED PRINT
 
+    @classmethod
+    def _release_video_frame_slot(cls):
+        """Returns the frame slot on screen to the video player's ring."""
+        slot = cls._video_frame_slot
+        cls._video_frame_slot = None
+        if slot is not None:
+            slot.release()
+
+    @classmethod
+    def _frame_slot_qimage(cls, slot):
+        """Returns the QImage wrapping a frame slot's buffer, creating it once per slot."""
+        if slot.qimage is None:
+            height, width, channel = slot.array.shape
+            # The QImage points straight at the slot's preallocated buffer, no copy
+            slot.qimage = QImage(slot.array.data, width, height, channel * width, QImage.Format_BGR888)
+        return slot.qimage
+
     @classmethod
     def update_video_frame(cls, frame_data):
         """
-        Receives raw frame data (NumPy array BGR) and updates the display.
+        Receives a frame (a VideoPlayer FrameSlot, or a NumPy BGR array) and updates the display.
         MUST be called from the main GUI thread (via bridge slot).
+        A FrameSlot is owned by the display until the next frame replaces it.
         Scales the frame to fit the view while maintaining aspect ratio.
         """
+        frame_slot = frame_data if hasattr(frame_data, 'release') and hasattr(frame_data, 'array') else None
+
         if not cls._video_window or not cls._video_frame_item or not cls._video_is_initialized or not cls._video_window.isVisible():
+            if frame_slot is not None and frame_slot is not cls._video_frame_slot:
+                frame_slot.release()
             return
 
-        if frame_data is None or not isinstance(frame_data, np.ndarray):
+        if frame_data is None or (frame_slot is None and not isinstance(frame_data, np.ndarray)):
             # print("[qt overlay] Invalid or null frame data received.") # Can be noisy if video ends
             # If frame is None (e.g., end of video), ensure the last frame is cleared
             if frame_data is None and cls._video_frame_item:
                  cls._video_frame_item.setImage(None)
                  cls._last_frame = None
+                 cls._release_video_frame_slot()
                  if cls._video_view:
                      cls._video_view.viewport().update()
             return
 
         try:
-            height, width, channel = frame_data.shape
-            if channel != 3:
-                print(f"[qt overlay] Unexpected frame channel count: {channel}")
-                return
+            if frame_slot is not None:
+                if frame_slot is cls._video_frame_slot:
+                    return # Already on screen
+                q_image = cls._frame_slot_qimage(frame_slot)
+                cls._video_frame_item.setImage(q_image)
+                cls._last_frame = q_image
+                # The previous slot is no longer painted, give it back to the reader
+                previous_slot = cls._video_frame_slot
+                cls._video_frame_slot = frame_slot
+                if previous_slot is not None:
+                    previous_slot.release()
+            else:
+                height, width, channel = frame_data.shape
+                if channel != 3:
+                    print(f"[qt overlay] Unexpected frame channel count: {channel}")
+                    return
 
-            bytes_per_line = channel * width
-            if not frame_data.flags['C_CONTIGUOUS']:
-                frame_data = np.ascontiguousarray(frame_data)
+                bytes_per_line = channel * width
+                if not frame_data.flags['C_CONTIGUOUS']:
+                    frame_data = np.ascontiguousarray(frame_data)
 
-            # Create QImage wrapper (NO QPixmap!)
-            # Assuming BGR input from OpenCV's cap.read()
-            q_image = QImage(frame_data.data, width, height, bytes_per_line, QImage.Format_BGR888)
+                # Create QImage wrapper (NO QPixmap!)
+                # Assuming BGR input from OpenCV's cap.read()
+                q_image = QImage(frame_data.data, width, height, bytes_per_line, QImage.Format_BGR888)
 
-            # Set the QImage on the custom item
-            cls._video_frame_item.setImage(q_image)
+                # Set the QImage on the custom item
+                cls._video_frame_item.setImage(q_image)
 
-            # Keep the QImage reference alive (important!)
-            cls._last_frame = q_image
+                # Keep the QImage reference alive (important!)
+                cls._last_frame = q_image
+                cls._release_video_frame_slot()
 
             # --- SCALING LOGIC ---
             # Get the item and view references
@@ -978,9 +1052,10 @@ class Overlay:
                 cls._background_window.show()
                 cls._background_window.lower()  # Keep the background at the bottom
 
-            # Ensure the window itself is fully transparent
-            cls._hint_text['window'].setAttribute(Qt.WA_TranslucentBackground, True)
-            cls._hint_text['view'].viewport().setAutoFillBackground(False)
+            # Ensure the window itself is fully transparent (set once; toggling it can recreate the native window)
+            if not cls._hint_text['window'].testAttribute(Qt.WA_TranslucentBackground):
+                cls._hint_text['window'].setAttribute(Qt.WA_TranslucentBackground, True)
+                cls._hint_text['view'].viewport().setAutoFillBackground(False)
             
             # Make sure the hint text window has the correct size and position
             width = cls._hint_text['window'].width()
@@ -989,49 +1064,17 @@ class Overlay:
             # Update hint background only if a room number is present
             if room_number:
                 pixmap = None
-                # Check if the pixmap for this room is already in the cache
-                if room_number in cls._hint_background_cache:
-                    pixmap = cls._hint_background_cache[room_number]
-                else:
-                    # --- If not cached, do the expensive work ONCE ---
-                    background_name = None
-                    background_map = {
-                        1: "casino_heist.png",
-                        2: "morning_after.png",
-                        3: "wizard_trials.png",
-                        4: "zombie_outbreak.png",
-                        5: "haunted_manor.png",
-                        6: "atlantis_rising.png",
-                        7: "time_machine.png"
-                    }
-
-                    if room_number in background_map:
-                        background_name = background_map[room_number]
-
-                    if background_name:
-                       # Load and resize the background image
-                        bg_path = os.path.join("hint_backgrounds", background_name)
-                        if os.path.exists(bg_path):
-                            print(f"[qt overlay] Caching hint background for room {room_number}...")
-                            bg_img = Image.open(bg_path)
-                            bg_img = bg_img.resize((width, height))
-                            # Convert to QPixmap
-                            buf = io.BytesIO()
-                            bg_img.save(buf, format='PNG')
-                            qimg = QImage()
-                            qimg.loadFromData(buf.getvalue())
-                            pixmap = QPixmap.fromImage(qimg)
-                            # Store the generated pixmap in the cache
-                            cls._hint_background_cache[room_number] = pixmap
-                
+                background_name = cls._hint_backgrounds.get(room_number)
+                if background_name:
+                    # Scaled to the hint window; usually already prewarmed
+                    bg_path = os.path.join("hint_backgrounds", background_name)
+                    pixmap = asset_cache.get_pixmap(bg_path, (width, height), 'stretch')
+
                 # Now, use the (potentially cached) pixmap
                 if pixmap:
                     cls._hint_text['bg_image_item'].setPixmap(pixmap)
                     cls._hint_text['current_background'] = pixmap
                          
-            # Clear the existing text before updating
-            cls._hint_text['text_item'].setHtml("")
-
             # Wrap text every 33 characters, avoiding breaking words
             wrapped_text = ""
             remaining_text = text
@@ -1056,21 +1099,14 @@ class Overlay:
 
             # Use theme color for hint text
             color = cls._current_hint_text_color if hasattr(cls, '_current_hint_text_color') else '#ffffff'
-            # Set text with transparent background explicitly
-            cls._hint_text['text_item'].setHtml(
-                f'<div style="background-color: transparent; color: {color}; padding: 20px; text-align:center; width:{height-40}px">{wrapped_text}</div>'
-            )
-
-            cls._hint_text['text_item'].setTransform(QTransform())
-            cls._hint_text['text_item'].setRotation(90)
-            cls._hint_text['text_item'].setZValue(1)  # Text should be above the background
-
-            text_width = cls._hint_text['text_item'].boundingRect().width()
-            text_height = cls._hint_text['text_item'].boundingRect().height()
-            cls._hint_text['text_item'].setPos(
-                (width + text_height) / 2,
-                (height - text_width) / 2
+            # Rendered (already rotated) once per text, color and window size; re-showing a hint reuses it
+            layer = text_layers.html(
+                f'<div style="background-color: transparent; color: {color}; padding: 20px; text-align:center; width:{height-40}px">{wrapped_text}</div>',
+                cls._hint_text['font'], color, 90
             )
+            cls._hint_text['layer_item'].setPixmap(layer)
+            cls._hint_text['layer_item'].setPos((width - layer.width()) / 2, (height - layer.height()) / 2)
+            cls._hint_text['text'] = text
             
             # Only show if no video is playing.
             if not cls._kiosk_app.video_manager.is_playing:
@@ -1092,9 +1128,10 @@ class Overlay:
                 print(f"[qt overlay] Error hiding hint text window: {e}")
             
             # Clear the text content if it exists
-            if 'text_item' in cls._hint_text and cls._hint_text['text_item']:
+            if cls._hint_text.get('layer_item'):
                 try:
-                    cls._hint_text['text_item'].setPlainText("")
+                    cls._hint_text['layer_item'].setPixmap(QPixmap())
+                    cls._hint_text['text'] = ""
                     if(cls.TIMER_DEBUG): ("[qt overlay] Hint text content cleared")
                 except Exception as e:
                     print(f"[qt overlay] Error clearing hint text: {e}")
@@ -1124,83 +1161,24 @@ class Overlay:
                 print("[qt overlay]Error: Hint request text window not initialized")
                 return
 
-            # --- SIMPLIFIED SETUP ---
-            # We keep separate objects, but position them like the cooldown.
-
-            # Rebuild objects before updating (GOOD PRACTICE, KEEPS THINGS CLEAN)
-            if hasattr(cls, '_hint_request_text') and cls._hint_request_text:
-               if cls._hint_request_text.get('window'):
-                   cls._hint_request_text['window'].hide()
-                   cls._hint_request_text['window'].deleteLater()
-                   cls._hint_request_text['window'] = None
-               if cls._hint_request_text.get('scene'):
-                   cls._hint_request_text['scene'].clear()
-                   cls._hint_request_text['scene'] = None
-               if cls._hint_request_text.get('view'):
-                   cls._hint_request_text['view'].deleteLater()
-                   cls._hint_request_text['view'] = None
-               cls._hint_request_text['text_item'] = None
-
-
-            cls._hint_request_text['window'] = QWidget(cls._window)  # Parent to main window
-            cls._hint_request_text['window'].setAttribute(Qt.WA_TranslucentBackground)
-            cls._hint_request_text['window'].setWindowFlags(
-                Qt.FramelessWindowHint |
-                Qt.WindowStaysOnTopHint |
-                Qt.Tool |
-                Qt.WindowDoesNotAcceptFocus
-            )
-            cls._hint_request_text['window'].setAttribute(Qt.WA_ShowWithoutActivating)
-
-            cls._hint_request_text['scene'] = QGraphicsScene()
-            cls._hint_request_text['view'] = QGraphicsView(cls._hint_request_text['scene'], cls._hint_request_text['window'])
-            cls._hint_request_text['view'].setStyleSheet("""
-                QGraphicsView {
-                    background: transparent;
-                    border: none;
-                }
-            """)
-            cls._hint_request_text['view'].setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-            cls._hint_request_text['view'].setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-            cls._hint_request_text['view'].setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
-
-            cls._hint_request_text['text_item'] = QGraphicsTextItem()
-            cls._hint_request_text['text_item'].setDefaultTextColor(Qt.white) # Keep the color
-            font = QFont('Arial', 36)  # Keep the font
-            cls._hint_request_text['text_item'].setFont(font)
-            cls._hint_request_text['scene'].addItem(cls._hint_request_text['text_item'])
-
-            if cls._parent_hwnd:
-                style = win32gui.GetWindowLong(int(cls._hint_request_text['window'].winId()), win32con.GWL_EXSTYLE)
-                win32gui.SetWindowLong(
-                    int(cls._hint_request_text['window'].winId()),
-                    win32con.GWL_EXSTYLE,
-                    style | win32con.WS_EX_NOACTIVATE
-                )
-                
             # --- POSITIONING (LIKE show_hint_cooldown) ---
             width = 100  # Match cooldown width
             height = 1079  # Match cooldown height
 
-            cls._hint_request_text['window'].setGeometry(510, 0, width, height) # Same position as cooldown
-            cls._hint_request_text['view'].setGeometry(0, 0, width, height)
-            cls._hint_request_text['scene'].setSceneRect(QRectF(0, 0, width, height))
-
             # --- STYLING AND ROTATION (LIKE show_hint_cooldown) ---
-
-            cls._hint_request_text['text_item'].setHtml(
-                f'<div style="background-color: rgba(0, 0, 0, 180); padding: 20px;">{text}</div>'
+            # Rendered once (already rotated) and reused on every request
+            layer = text_layers.html(
+                f'<div style="background-color: rgba(0, 0, 0, 180); padding: 20px;">{text}</div>',
+                QFont('Arial', 36), '#ffffff', 90
             )
 
-            cls._hint_request_text['text_item'].setTransform(QTransform())
-            cls._hint_request_text['text_item'].setRotation(90) # Same rotation
+            # The window is built on the first request and kept; later requests only swap the layer
+            window = cls._hint_request_text.get('window')
+            if window is None or window is not cls._hint_request_text.get('layer_window') or not cls._hint_request_text.get('text_item'):
+                cls._build_hint_request_window(width, height)
 
-            text_width = cls._hint_request_text['text_item'].boundingRect().width()
-            text_height = cls._hint_request_text['text_item'].boundingRect().height()
-            cls._hint_request_text['text_item'].setPos(
-                (width + text_height) / 2,  # Center like cooldown
-                (height - text_width) / 2
-            )
+            cls._hint_request_text['text_item'].setPixmap(layer)
+            cls._hint_request_text['text_item'].setPos((width - layer.width()) / 2, (height - layer.height()) / 2)
 
             cls._hint_request_text['window'].show()
             cls._hint_request_text['window'].raise_()
@@ -1209,9 +1187,62 @@ class Overlay:
             print(f"[qt overlay]Error in _actual_hint_request_text_update: {e}")
             traceback.print_exc()
 
+    @classmethod
+    def _build_hint_request_window(cls, width, height):
+        """(Re)creates the hint request window, replacing the one made by init_hint_request_text_overlay."""
+        if cls._hint_request_text.get('window'):
+            cls._hint_request_text['window'].hide()
+            cls._hint_request_text['window'].deleteLater()
+            cls._hint_request_text['window'] = None
+        if cls._hint_request_text.get('scene'):
+            cls._hint_request_text['scene'].clear()
+            cls._hint_request_text['scene'] = None
+        if cls._hint_request_text.get('view'):
+            cls._hint_request_text['view'].deleteLater()
+            cls._hint_request_text['view'] = None
+        cls._hint_request_text['text_item'] = None
+
+        cls._hint_request_text['window'] = QWidget(cls._window)  # Parent to main window
+        cls._hint_request_text['window'].setAttribute(Qt.WA_TranslucentBackground)
+        cls._hint_request_text['window'].setWindowFlags(
+            Qt.FramelessWindowHint |
+            Qt.WindowStaysOnTopHint |
+            Qt.Tool |
+            Qt.WindowDoesNotAcceptFocus
+        )
+        cls._hint_request_text['window'].setAttribute(Qt.WA_ShowWithoutActivating)
+
+        cls._hint_request_text['scene'] = QGraphicsScene()
+        cls._hint_request_text['view'] = QGraphicsView(cls._hint_request_text['scene'], cls._hint_request_text['window'])
+        cls._hint_request_text['view'].setStyleSheet("""
+            QGraphicsView {
+                background: transparent;
+                border: none;
+            }
+        """)
+        cls._hint_request_text['view'].setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        cls._hint_request_text['view'].setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        cls._hint_request_text['view'].setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
+
+        cls._hint_request_text['text_item'] = QGraphicsPixmapItem()
+        cls._hint_request_text['scene'].addItem(cls._hint_request_text['text_item'])
+
+        if cls._parent_hwnd:
+            style = win32gui.GetWindowLong(int(cls._hint_request_text['window'].winId()), win32con.GWL_EXSTYLE)
+            win32gui.SetWindowLong(
+                int(cls._hint_request_text['window'].winId()),
+                win32con.GWL_EXSTYLE,
+                style | win32con.WS_EX_NOACTIVATE
+            )
+
+        cls._hint_request_text['window'].setGeometry(510, 0, width, height) # Same position as cooldown
+        cls._hint_request_text['view'].setGeometry(0, 0, width, height)
+        cls._hint_request_text['scene'].setSceneRect(QRectF(0, 0, width, height))
+        cls._hint_request_text['layer_window'] = cls._hint_request_text['window']
+
     @classmethod
     def hide_hint_request_text(cls):
-        """Hide the hint request text overlay and clear its content"""
+        """Hide the hint request text overlay. Its window and text layer are kept for the next request."""
         if hasattr(cls, '_hint_request_text') and cls._hint_request_text:
             # Hide the window if it exists
             if cls._hint_request_text.get('window'):
@@ -1219,14 +1250,6 @@ class Overlay:
                     cls._hint_request_text['window'].hide()
                 except Exception as e:
                     print(f"[qt overlay] Error hiding hint request window: {e}")
-            
-            # Clear the text content if it exists
-            if cls._hint_request_text.get('text_item'):
-                try:
-                    cls._hint_request_text['text_item'].setPlainText("")
-                    if(cls._app.kiosk_app_instance.UI_DEBUG): print("[qt overlay] Hint request text cleared")
-                except Exception as e:
-                    print(f"[qt overlay] Error clearing hint request text: {e}")
 
     @classmethod
     def show_hint_cooldown(cls, seconds):
@@ -1271,33 +1294,44 @@ class Overlay:
             cls._cooldown_view.setGeometry(0, 0, width, height)
             cls._cooldown_scene.setSceneRect(0, 0, width, height)
             
-            # Create text item
-            cls._cooldown_text = QGraphicsTextItem()
-            cls._cooldown_text.setDefaultTextColor(Qt.white)
-            font = QFont('Arial', 20)
-            cls._cooldown_text.setFont(font)
-            cls._cooldown_scene.addItem(cls._cooldown_text)
-        
+            # Rotated message box holding three cached text layers; a tick only swaps the number
+            cls._cooldown_font = QFont('Arial', 20)
+            cls._cooldown_box = QGraphicsRectItem()
+            cls._cooldown_box.setBrush(QColor(0, 0, 0, 180))
+            cls._cooldown_box.setPen(QPen(Qt.NoPen))
+            cls._cooldown_box.setRotation(90)
+            cls._cooldown_parts = [QGraphicsPixmapItem(cls._cooldown_box) for _ in range(3)]
+            cls._cooldown_scene.addItem(cls._cooldown_box)
+            cls._cooldown_seconds = None
+
         # Update cooldown message
-        message = f"Please wait {seconds} seconds until requesting the next hint."
-        cls._cooldown_text.setHtml(
-            f'<div style="background-color: rgba(0, 0, 0, 180); padding: 20px;">{message}</div>'
-        )
-        
-        # Rotate and position text
-        cls._cooldown_text.setTransform(QTransform())
-        cls._cooldown_text.setRotation(90)
-        
-        text_width = cls._cooldown_text.boundingRect().width()
-        text_height = cls._cooldown_text.boundingRect().height()
-        cls._cooldown_text.setPos(
-            (width + text_height) / 2,
-            (height - text_width) / 2
-        )
-        
+        if seconds != cls._cooldown_seconds:
+            cls._set_cooldown_message(seconds, width, height)
+
         # Show but don't raise
         cls._cooldown_window.show()
 
+    @classmethod
+    def _set_cooldown_message(cls, seconds, width, height):
+        """Lays out "Please wait N seconds until requesting the next hint." from cached layers."""
+        padding = 20
+        parts = ("Please wait ", str(seconds), " seconds until requesting the next hint.")
+        x = padding
+        for item, part in zip(cls._cooldown_parts, parts):
+            layer = text_layers.text(part, cls._cooldown_font, '#ffffff')
+            if item.pixmap().cacheKey() != layer.cacheKey():
+                item.setPixmap(layer)
+            if item.pos().x() != x:
+                item.setPos(x, padding)
+            x += layer.width()
+        box_width = x + padding
+        box_height = layer.height() + 2 * padding
+        if cls._cooldown_box.rect().width() != box_width:
+            cls._cooldown_box.setRect(0, 0, box_width, box_height)
+            # Centered like the other rotated overlays
+            cls._cooldown_box.setPos((width + box_height) / 2, (height - box_width) / 2)
+        cls._cooldown_seconds = seconds
+
     @classmethod
     def init_timer(cls):
         print("[qt_overlay] Initializing timer...", flush=True)
@@ -1312,8 +1346,8 @@ class Overlay:
         """Update timer display, but NOT if game is lost."""
         if(cls.TIMER_DEBUG): (f"\n[DEBUG OVERLAY] update_timer_display called with time: {time_str}")
         
-        if not hasattr(cls, '_timer') or not cls._timer.text_item:
-            print(f"[qt overlay][{thread_id}] Timer or text_item not initialized, returning.")
+        if not hasattr(cls, '_timer') or not cls._timer.digits_item:
+            print(f"[qt overlay][{thread_id}] Timer or digits_item not initialized, returning.")
             return
             
         if hasattr(cls, '_kiosk_app') and cls._kiosk_app and hasattr(cls._kiosk_app, 'timer'):
@@ -1373,12 +1407,12 @@ class Overlay:
         """Actual update method that runs in the main thread"""
         if(cls.TIMER_DEBUG): (f"\n[DEBUG OVERLAY] _actual_timer_update called with time: {time_str}")
         
-        if(cls.TIMER_DEBUG): (f"[qt_overlay][{thread_id}] Checking _timer and _timer.text_item existence...")
-        if hasattr(cls, '_timer') and cls._timer.text_item:
+        if(cls.TIMER_DEBUG): (f"[qt_overlay][{thread_id}] Checking _timer and _timer.digits_item existence...")
+        if hasattr(cls, '_timer') and cls._timer.digits_item:
             try:
                 color = cls._current_timer_text_color if hasattr(cls, '_current_timer_text_color') else '#ffffff'
-                cls._timer.text_item.setHtml(f'<div style="color: {color};">{time_str}</div>')
-                cls._timer.text_item.setPos(350, 145)
+                if time_str != cls._timer.time_str or color != cls._timer.time_color:
+                    cls._set_timer_glyphs(time_str, color)
                 if cls._timer_window:
                     cls._timer_window.show()
                     cls._timer_window.raise_()
@@ -1389,6 +1423,27 @@ class Overlay:
             print(f"[qt_overlay][{thread_id}] Timer or text_item not available for update.")
         if(cls.TIMER_DEBUG): (f"[qt_overlay][{thread_id}] _actual_timer_update EXITED.")
 
+    @classmethod
+    def _set_timer_glyphs(cls, time_str, color):
+        """Points each character item at its cached glyph; only changed characters are repainted."""
+        timer = cls._timer
+        x = 4 # Same inset as the QTextDocument margin the timer text used to have
+        for index, character in enumerate(time_str):
+            if index == len(timer.glyph_items):
+                timer.glyph_items.append(QGraphicsPixmapItem(timer.digits_item))
+            item = timer.glyph_items[index]
+            glyph = timer.glyphs.glyph(color, character)
+            if item.pixmap().cacheKey() != glyph.cacheKey():
+                item.setPixmap(glyph)
+            if item.pos().x() != x:
+                item.setPos(x, 4)
+            x += glyph.width()
+        for item in timer.glyph_items[len(time_str):]:
+            if not item.pixmap().isNull():
+                item.setPixmap(QPixmap())
+        timer.time_str = time_str
+        timer.time_color = color
+
     @classmethod
     def load_timer_background(cls, room_number):
         """Load the timer background for the specified room"""
@@ -1431,18 +1486,9 @@ class Overlay:
                 print(f"[qt overlay]Timer background not found: {bg_path}")
                 return
 
-            # Load and resize the background image
-            print("[qt overlay]Loading background image...")
-            bg_img = Image.open(bg_path)
-            bg_img = bg_img.resize((500,750))
-
-            # Convert to QPixmap
-            print("[qt overlay]Converting to QPixmap...")
-            buf = io.BytesIO()
-            bg_img.save(buf, format='PNG')
-            qimg = QImage()
-            qimg.loadFromData(buf.getvalue())
-            pixmap = QPixmap.fromImage(qimg)
+            pixmap = asset_cache.get_pixmap(bg_path, cls.TIMER_BACKGROUND_SIZE, 'stretch')
+            if pixmap is None:
+                return
 
             # Update the UI directly since we're in the main thread
             cls._actual_timer_background_update(pixmap)
@@ -1492,40 +1538,29 @@ class Overlay:
                 print(f"[qt overlay]Error: Button image not found at: {button_path}")
                 return False
 
-            # Use QImage to load directly
-            qimage = QImage(button_path)
-            if qimage.isNull():
+            button_pixmap = asset_cache.get_pixmap(button_path, cls.BUTTON_SIZE, 'fit')
+            if button_pixmap is None:
                 print("[qt overlay]Failed to load button image directly")
                 return False
-
-            # Convert to pixmap and scale
-            button_pixmap = QPixmap.fromImage(qimage).scaled(
-                320, 700, Qt.KeepAspectRatio, Qt.SmoothTransformation  # Keep adjusted scaling for button
-            )
             cls._button['bg_image_item'].setPixmap(button_pixmap)
 
-            # Load shadow image
+            # Shadow is scaled larger than the button
             shadow_path = os.path.join("hint_button_backgrounds", "shadow.png")
-            shadow_qimage = QImage(shadow_path)
-            if shadow_qimage.isNull():
+            shadow_pixmap = asset_cache.get_pixmap(shadow_path, cls.BUTTON_SHADOW_SIZE, 'fit')
+            if shadow_pixmap is None:
                 print("[qt overlay]Failed to load shadow image directly")
                 return False
-
-            # Convert to pixmap and scale (larger scaling for shadow)
-            shadow_pixmap = QPixmap.fromImage(shadow_qimage).scaled(
-                440, 780, Qt.KeepAspectRatio, Qt.SmoothTransformation  # Increased shadow size
-            )
             cls._button['shadow_item'].setPixmap(shadow_pixmap)
 
             # Set the origin for rotation to the center of the pixmap
             cls._button['bg_image_item'].setTransformOriginPoint(button_pixmap.width() / 2, button_pixmap.height() / 2)
 
             # Debug info
-            if(cls.TIMER_DEBUG): (f"[qt overlay]Image Debug:")
-            if(cls.TIMER_DEBUG): (f"[qt overlay]Button image format: {qimage.format()}")
-            if(cls.TIMER_DEBUG): (f"[qt overlay]Button image size: {qimage.size()}")
-            if(cls.TIMER_DEBUG): (f"[qt overlay]Button pixmap size: {button_pixmap.size()}")
-            if(cls.TIMER_DEBUG): (f"[qt overlay]Shadow pixmap size: {shadow_pixmap.size()}")
+            if cls.TIMER_DEBUG:
+                print("[qt overlay]Image Debug:")
+                print(f"[qt overlay]Button pixmap depth: {button_pixmap.depth()}")
+                print(f"[qt overlay]Button pixmap size: {button_pixmap.size()}")
+                print(f"[qt overlay]Shadow pixmap size: {shadow_pixmap.size()}")
 
             return True
 
@@ -1733,7 +1768,7 @@ class Overlay:
             # Timer (only if text exists and window is available)
             if hasattr(cls, '_timer_window') and cls._timer_window:
                 # Check if timer object and text item exist and have content
-                if hasattr(cls, '_timer') and cls._timer.text_item and cls._timer.text_item.toPlainText():
+                if hasattr(cls, '_timer') and cls._timer.digits_item and cls._timer.time_str:
                      # Show if not already visible
                      if not cls._timer_window.isVisible(): cls._timer_window.show()
                      cls._timer_window.raise_() # Ensure it's on top
@@ -1830,7 +1865,7 @@ class Overlay:
                 cooldown_text_valid = False
                 
                 # Check if cooldown text exists
-                if hasattr(cls, '_cooldown_text') and cls._cooldown_text and cls._cooldown_text.toPlainText().strip():
+                if cls._cooldown_seconds is not None:
                     cooldown_text_valid = True
                 
                 if cooldown_active and cooldown_text_valid:
@@ -1867,21 +1902,16 @@ class Overlay:
             if not cls._background_initialized:
                 cls._init_background()
             
-            # Load and scale image
-            pixmap = QPixmap(image_path)
-            if pixmap.isNull():
-                print(f"[qt_overlay] Failed to load background image: {image_path}")
-                return
-                
             # Get screen dimensions
             screen_size = cls._app.primaryScreen().size()
             screen_width = screen_size.width()
             screen_height = screen_size.height()
-            
-            # Scale pixmap to fit screen
-            scaled_pixmap = pixmap.scaled(screen_width, screen_height, 
-                                         Qt.KeepAspectRatioByExpanding, 
-                                         Qt.SmoothTransformation)
+
+            # Scaled to cover the screen; usually already prewarmed
+            scaled_pixmap = asset_cache.get_pixmap(image_path, (screen_width, screen_height), 'fill')
+            if scaled_pixmap is None:
+                print(f"[qt_overlay] Failed to load background image: {image_path}")
+                return
             
             # Update pixmap item
             if cls._background_pixmap_item:
@@ -2100,12 +2130,14 @@ class Overlay:
             cls._button_window.hide()
         if hasattr(cls, '_hint_text') and cls._hint_text and cls._hint_text['window']:
             cls._hint_text['window'].hide()
-            cls._hint_text['text_item'].setPlainText("")
+            cls._hint_text['layer_item'].setPixmap(QPixmap())
+            cls._hint_text['text'] = ""
         if hasattr(cls, '_hint_request_text') and cls._hint_request_text:
             if cls._hint_request_text['window']:
                 cls._hint_request_text['window'].hide()
             if cls._hint_request_text['scene']:
                 cls._hint_request_text['scene'].clear()
+                cls._hint_request_text['text_item'] = None # Deleted with the scene's items
         if hasattr(cls, '_cooldown_window') and cls._cooldown_window:
             cls._cooldown_window.hide()
         # Hide view solution button
@@ -2122,8 +2154,8 @@ class Overlay:
             cls._timer_thread.wait()
             cls._timer_thread = None
         if hasattr(cls, '_timer') and cls._timer:
-            if cls._timer.text_item:
-                cls._timer.text_item.setPlainText("")
+            if cls._timer.digits_item:
+                cls._set_timer_glyphs("", cls._timer.time_color)
             if cls._timer.bg_image_item:
                 cls._timer.bg_image_item.setPixmap(QPixmap())
             if hasattr(cls, '_timer_scene') and cls._timer.scene:
@@ -2159,13 +2191,8 @@ class Overlay:
             except Exception as e:
                 print(f"[qt overlay] Error hiding cooldown window: {e}")
             
-            # Clear the cooldown text content directly
-            if hasattr(cls, '_cooldown_text') and cls._cooldown_text:
-                try:
-                    cls._cooldown_text.setHtml("")
-                    print("[qt overlay] Cooldown text cleared")
-                except Exception as e:
-                    print(f"[qt overlay] Error clearing cooldown text: {e}")
+            # Forget the shown message; the layers stay cached for the next cooldown
+            cls._cooldown_seconds = None
         
         # For backwards compatibility, also handle older cooldown
         if hasattr(cls, '_window') and cls._window:
@@ -2466,4 +2493,7 @@ class Overlay:
     @classmethod
     def set_theme_colors(cls, hint_text_color, timer_text_color):
         cls._current_hint_text_color = hint_text_color
-        cls._current_timer_text_color = timer_text_color
\ No newline at end of file
+        cls._current_timer_text_color = timer_text_color
+        # Render this theme's timer digits now rather than on the first tick
+        if hasattr(cls, '_timer') and cls._timer.glyphs:
+            cls._timer.glyphs.prerender(timer_text_color)
\ No newline at end of file
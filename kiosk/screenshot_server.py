@@ -0,0 +1,473 @@
+# screenshot_server.py
+print("[screenshot server] Beginning imports ...", flush=True)
+print("[screenshot server] Importing socket...", flush=True)
+import socket
+print("[screenshot server] Imported socket.", flush=True)
+print("[screenshot server] Importing struct...", flush=True)
+import struct
+print("[screenshot server] Imported struct.", flush=True)
+print("[screenshot server] Importing threading...", flush=True)
+import threading
+print("[screenshot server] Imported threading.", flush=True)
+print("[screenshot server] Importing time...", flush=True)
+import time
+print("[screenshot server] Imported time.", flush=True)
+print("[screenshot server] Importing zlib...", flush=True)
+import zlib
+print("[screenshot server] Imported zlib.", flush=True)
+print("[screenshot server] Importing json...", flush=True)
+import json
+print("[screenshot server] Imported json.", flush=True)
+print("[screenshot server] Importing io...", flush=True)
+import io
+print("[screenshot server] Imported io.", flush=True)
+print("[screenshot server] Importing numpy...", flush=True)
+import numpy as np
+print("[screenshot server] Imported numpy.", flush=True)
+print("[screenshot server] Importing PIL...", flush=True)
+from PIL import Image, ImageGrab
+print("[screenshot server] Imported PIL.", flush=True)
+print("[screenshot server] Ending imports ...", flush=True)
+
+# Client -> kiosk: struct "Q" length + JSON lease request, {"type": "subscribe",
+# "interval": seconds, "height": pixels, "seconds": lease length} or {"type": "cancel"}.
+# Kiosk -> client: each message is struct "Q" size + payload (as in the video stream).
+# A zero-length message means nothing changed and the link is alive.
+# Payload: FRAME_HEADER (kind, width, height, tile size, tile count), then tile
+# count little-endian uint16 tile indexes (row-major), then one JPEG holding the
+# listed tiles packed row-major into a grid as wide as the frame.
+FRAME_FULL = 1
+FRAME_DELTA = 2
+FRAME_HEADER = struct.Struct("<BHHHH")
+UNCHANGED_MARKER = struct.pack("Q", 0)
+
+def downscale_to_portrait(screen, height):
+    """
+    Scales a landscape screen grab to a portrait image height pixels high.
+    The reduction happens first, on the unrotated image (an integer box
+    reduce followed by a bilinear pass, via reducing_gap), and only the
+    small result is rotated, with a lossless transpose.
+    """
+    width = max(1, int(screen.height * height / screen.width))
+    small = screen.resize((height, width), Image.Resampling.BILINEAR, reducing_gap=2.0)
+    return small.transpose(Image.Transpose.ROTATE_90)
+
+def frame_signature(image):
+    """
+    Cheap perceptual hash of a downscaled frame: a quarter-size grayscale
+    thumbnail quantized to 6 bits. Equal signatures mean nothing visible
+    changed, so the frame needn't be tiled or encoded.
+    """
+    thumb = np.asarray(image.convert('L').reduce(4))
+    return zlib.crc32(np.right_shift(thumb, 2).tobytes())
+
+class TileDiffEncoder:
+    """
+    Splits each frame into square tiles, hashes every tile and JPEG-encodes
+    only the tiles whose hash changed since the previous frame. The changed
+    tiles are packed into one image, so a delta costs one encode and one JPEG
+    header however many tiles it carries.
+    """
+    def __init__(self, tile_size=32, quality=75):
+        self.tile_size = tile_size # A multiple of 16 keeps JPEG blocks from straddling tiles
+        self.quality = quality
+        self.shape = None
+        self.hashes = None
+        # Reused between frames of the same size
+        self._padded = None
+        self._tiles = None
+
+    def reset(self):
+        """Forces the next frame to be sent in full."""
+        self.hashes = None
+
+    def encode(self, frame, full=False):
+        """
+        frame: (height, width, 3) uint8 RGB. Returns the payload, or None when
+        no tile changed and a full frame wasn't asked for.
+        """
+        height, width = frame.shape[:2]
+        size = self.tile_size
+        rows = -(-height // size)
+        cols = -(-width // size)
+        if self.shape != (height, width):
+            self.shape = (height, width)
+            self.hashes = None
+            self._padded = np.empty((rows * size, cols * size, 3), dtype=np.uint8)
+            self._tiles = np.empty((rows, cols, size, size, 3), dtype=np.uint8)
+        full = full or self.hashes is None
+
+        # Pad to whole tiles by repeating the last row and column
+        padded = self._padded
+        padded[:height, :width] = frame
+        padded[height:, :width] = padded[height - 1:height, :width]
+        padded[:, width:] = padded[:, width - 1:width]
+        np.copyto(self._tiles, padded.reshape(rows, size, cols, size, 3).swapaxes(1, 2))
+        tiles = self._tiles.reshape(rows * cols, size, size, 3)
+        hashes = np.fromiter((zlib.crc32(tile) for tile in tiles), dtype=np.uint32, count=len(tiles))
+
+        changed = np.arange(len(tiles)) if full else np.flatnonzero(hashes != self.hashes)
+        self.hashes = hashes
+        if len(changed) == 0:
+            return None
+
+        # Pack the changed tiles into a grid as wide as the frame
+        grid_rows = -(-len(changed) // cols)
+        grid = np.zeros((grid_rows * cols, size, size, 3), dtype=np.uint8)
+        grid[:len(changed)] = tiles[changed]
+        grid = grid.reshape(grid_rows, cols, size, size, 3).swapaxes(1, 2).reshape(grid_rows * size, cols * size, 3)
+
+        buf = io.BytesIO()
+        Image.fromarray(grid).save(buf, format='JPEG', quality=self.quality)
+        header = FRAME_HEADER.pack(FRAME_FULL if full else FRAME_DELTA, width, height, size, len(changed))
+        return header + changed.astype('<u2').tobytes() + buf.getvalue()
+
+class ScreenshotServer:
+    """
+    Streams the kiosk screen to the admin over a persistent TCP connection.
+
+    Nothing is captured until a client takes a lease: it sends a subscribe
+    message with a frame interval, a frame height and a duration, and renews
+    it by subscribing again before it runs out. The capture thread runs on
+    its own timer, grabbing the screen only while some lease is live and
+    only as often as the fastest lease asks. Each connection gets only the
+    tiles that changed since its last frame, plus a full frame every
+    FULL_REFRESH_SECONDS so a lost or corrupt tile heals.
+
+    Each connection has its own sender thread, which owns its encoder. The
+    capture thread only hands it the latest frame (replacing one it hasn't
+    taken yet), so a stalled admin delays only its own preview. Lease changes
+    are passed to the sender as a reset flag rather than touching the encoder.
+    """
+    DEFAULT_HEIGHT = 330 # Rotated to portrait and scaled to the admin's preview height
+    MIN_INTERVAL = 0.1
+    MAX_HEIGHT = 1920
+    MAX_LEASE_SECONDS = 120.0
+    FULL_REFRESH_SECONDS = 10.0
+    KEEPALIVE_SECONDS = 2.0
+    SEND_TIMEOUT = 2.0
+
+    def __init__(self, port=8092):
+        self.port = port
+        self.running = False
+        self.server_socket = None
+        self.clients = {} # socket -> per-connection state, including its lease
+        self.clients_lock = threading.Lock()
+        self._wake = threading.Event() # Set when a lease is taken so the capture timer reschedules
+        self._capture_thread = None
+        self.should_capture = None # Optional callable; captures are skipped while it returns False
+        self.frames_captured = 0
+        self.frames_unchanged = 0 # Captures whose signature matched the last one, so nothing was encoded
+        self.frames_skipped = 0 # Frames replaced by a newer one before a slow client's sender took them
+        self.bytes_sent = 0
+        self.capture_ms = 0.0
+
+    def start(self):
+        """Non-blocking server start"""
+        def startup():
+            try:
+                print("[screenshot server] Creating socket...", flush=True)
+                self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                self.server_socket.bind(('', self.port))
+                self.server_socket.listen(5)
+                self.running = True
+                print(f"[screenshot server] Listening on port {self.port}.", flush=True)
+                self._capture_thread = threading.Thread(target=self._capture_loop, daemon=True, name="ScreenshotCapture")
+                self._capture_thread.start()
+                self.accept_connections()
+            except Exception as e:
+                print(f"[screenshot server] Failed to start screenshot server: {e}", flush=True)
+
+        threading.Thread(target=startup, daemon=True).start()
+
+    def accept_connections(self):
+        self.server_socket.settimeout(1.0)
+        while self.running:
+            try:
+                client, addr = self.server_socket.accept()
+            except socket.timeout:
+                continue
+            except Exception as e:
+                if self.running:
+                    print(f"[screenshot server] Connection error: {e}", flush=True)
+                break
+            print(f"[screenshot server] New screenshot connection from {addr}", flush=True)
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            client.settimeout(self.SEND_TIMEOUT)
+            state = {
+                'addr': addr,
+                'encoder': TileDiffEncoder(), # Used only by this client's sender thread
+                'signature': None, # Signature of the last frame this client's encoder was given
+                'reset_pending': False, # Set by a new or resized lease; the sender resets the encoder
+                'outbox': None, # Latest (frame, signature, time) waiting for the sender
+                'ready': threading.Event(),
+                'closed': False,
+                'lease_expires': 0.0, # No frames until the client subscribes
+                'interval': 1.0,
+                'height': self.DEFAULT_HEIGHT,
+                'next_due': 0.0,
+                'last_full': 0.0,
+                'last_send': 0.0,
+                'frames': 0,
+                'bytes': 0,
+            }
+            with self.clients_lock:
+                self.clients[client] = state
+            threading.Thread(target=self._send_loop, args=(client, state), daemon=True, name=f"ScreenshotSend-{addr[0]}").start()
+            threading.Thread(target=self._read_requests, args=(client,), daemon=True).start()
+
+    def _read_requests(self, client):
+        """Reads lease messages (struct "Q" length + JSON) from one client until it disconnects."""
+        try:
+            while self.running:
+                header = self._recv_exactly(client, struct.calcsize("Q"))
+                if not header:
+                    break
+                length = struct.unpack("Q", header)[0]
+                if length == 0 or length > 4096:
+                    print(f"[screenshot server] Invalid request length {length}, closing.", flush=True)
+                    break
+                body = self._recv_exactly(client, length)
+                if not body:
+                    break
+                self._handle_request(client, json.loads(bytes(body).decode('utf-8')))
+        except Exception as e:
+            if self.running:
+                print(f"[screenshot server] Request read error: {e}", flush=True)
+        self._drop_client(client)
+
+    def _recv_exactly(self, client, size):
+        data = bytearray()
+        while len(data) < size and self.running:
+            try:
+                packet = client.recv(size - len(data))
+            except socket.timeout:
+                continue
+            if not packet:
+                return None
+            data.extend(packet)
+        return data if len(data) == size else None
+
+    def _handle_request(self, client, request):
+        now = time.time()
+        with self.clients_lock:
+            state = self.clients.get(client)
+            if state is None:
+                return
+            if request.get('type') == 'subscribe':
+                interval = max(self.MIN_INTERVAL, float(request.get('interval', 1.0)))
+                height = max(32, min(self.MAX_HEIGHT, int(request.get('height', self.DEFAULT_HEIGHT))))
+                seconds = max(0.0, min(self.MAX_LEASE_SECONDS, float(request.get('seconds', 10.0))))
+                if state['lease_expires'] <= now or height != state['height']:
+                    state['next_due'] = now # New or resized lease: send a frame right away
+                    state['reset_pending'] = True # Applied by the sender, which owns the encoder
+                state['interval'] = interval
+                state['height'] = height
+                state['lease_expires'] = now + seconds
+            elif request.get('type') == 'cancel':
+                state['lease_expires'] = 0.0
+        self._wake.set()
+
+    def capture_image(self, height=None):
+        """Grabs the screen, rotated to the kiosk's portrait orientation, as a PIL image height pixels high."""
+        return downscale_to_portrait(ImageGrab.grab(), height or self.DEFAULT_HEIGHT)
+
+    def capture_frame(self, height=None):
+        """
+        Captures an RGB array height pixels high. Returns (frame, signature); each
+        client compares the signature with the last frame it was sent.
+        """
+        image = self.capture_image(height or self.DEFAULT_HEIGHT)
+        return np.asarray(image.convert('RGB')), frame_signature(image)
+
+    def _capture_loop(self):
+        """The capture timer: sleeps until the earliest lease is due, then captures once per requested height."""
+        while self.running:
+            now = time.time()
+            with self.clients_lock:
+                leased = [(client, state) for client, state in self.clients.items() if state['lease_expires'] > now]
+            if not leased:
+                self._wake.wait(1.0)
+                self._wake.clear()
+                continue
+
+            due = [(client, state) for client, state in leased if state['next_due'] <= now]
+            if not due:
+                self._wake.wait(min(state['next_due'] for _, state in leased) - now)
+                self._wake.clear()
+                continue
+
+            frames = {}
+            capture_allowed = self.should_capture is None or self.should_capture()
+            for client, state in due:
+                state['next_due'] = max(state['next_due'] + state['interval'], now)
+                frame, signature = None, None
+                if capture_allowed:
+                    if state['height'] not in frames:
+                        started = time.perf_counter()
+                        try:
+                            frames[state['height']] = self.capture_frame(state['height'])
+                            self.frames_captured += 1
+                            self.capture_ms += 0.1 * ((time.perf_counter() - started) * 1000.0 - self.capture_ms)
+                        except Exception as e:
+                            print(f"[screenshot server] Capture error: {e}", flush=True)
+                            frames[state['height']] = (None, None)
+                    frame, signature = frames[state['height']]
+                # With no frame only a keepalive goes out, so the admin knows the stream is alive
+                self._post_frame(state, frame, now, signature)
+
+    def _post_frame(self, state, frame, now, signature=None):
+        """Hands the latest frame to the client's sender, replacing one it hasn't taken yet."""
+        with self.clients_lock:
+            if state['outbox'] is not None and state['outbox'][0] is not None:
+                self.frames_skipped += 1
+            state['outbox'] = (frame, signature, now)
+        state['ready'].set()
+
+    def _send_loop(self, client, state):
+        """One client's sender: encodes and sends whatever the capture thread last posted."""
+        while self.running and not state['closed']:
+            state['ready'].wait(1.0)
+            state['ready'].clear()
+            with self.clients_lock:
+                posted, state['outbox'] = state['outbox'], None
+            if posted is not None and not state['closed']:
+                frame, signature, now = posted
+                self._send_frame(client, state, frame, now, signature)
+
+    def _send_frame(self, client, state, frame, now, signature=None):
+        """
+        Sends the changed tiles of frame (or a keepalive if nothing changed or
+        frame is None). Called only from the client's sender thread.
+        """
+        with self.clients_lock:
+            reset, state['reset_pending'] = state['reset_pending'], False
+        if reset:
+            state['encoder'].reset()
+            state['signature'] = None
+        full = frame is not None and now - state['last_full'] >= self.FULL_REFRESH_SECONDS
+        # Compared per client: clients on other schedules may not have been sent the last capture
+        unchanged = signature is not None and signature == state['signature']
+        if unchanged and not full and state['encoder'].hashes is not None:
+            frame = None # Same picture as this client last got: skip tiling and encoding altogether
+            self.frames_unchanged += 1
+        payload = None
+        if frame is not None:
+            payload = state['encoder'].encode(frame, full=full)
+            state['signature'] = signature
+        if payload is None and now - state['last_send'] < self.KEEPALIVE_SECONDS:
+            return
+        message = UNCHANGED_MARKER if payload is None else struct.pack("Q", len(payload)) + payload
+        try:
+            client.sendall(message)
+        except (socket.timeout, socket.error) as e:
+            print(f"[screenshot server] Client {state['addr']} dropped: {e}", flush=True)
+            self._drop_client(client)
+            return
+        state['last_send'] = now
+        if full:
+            state['last_full'] = now
+        if payload is not None:
+            state['frames'] += 1
+            state['bytes'] += len(message)
+            self.bytes_sent += len(message)
+
+    def _drop_client(self, client):
+        with self.clients_lock:
+            state = self.clients.pop(client, None)
+        if state:
+            state['closed'] = True
+            state['ready'].set() # Let the sender thread exit
+            print(f"[screenshot server] Closing stream to {state['addr']} (sent {state['frames']} frames, "
+                  f"{state['bytes'] // 1024} KB)", flush=True)
+        try:
+            client.close()
+        except:
+            pass
+
+    def get_stats(self):
+        now = time.time()
+        with self.clients_lock:
+            clients = len(self.clients)
+            leases = sum(1 for state in self.clients.values() if state['lease_expires'] > now)
+        return {
+            'clients': clients,
+            'leases': leases,
+            'frames_captured': self.frames_captured,
+            'frames_unchanged': self.frames_unchanged,
+            'frames_skipped': self.frames_skipped,
+            'bytes_sent': self.bytes_sent,
+            'capture_ms': round(self.capture_ms, 1),
+        }
+
+    def stop(self):
+        print("[screenshot server] Stopping screenshot server", flush=True)
+        self.running = False
+        self._wake.set()
+        with self.clients_lock:
+            clients = list(self.clients)
+        for client in clients:
+            self._drop_client(client)
+        if self.server_socket:
+            try:
+                self.server_socket.close()
+            except:
+                pass
+
+def benchmark(runs=30, screen_size=(1920, 1080), height=ScreenshotServer.DEFAULT_HEIGHT):
+    """
+    Times the capture pipeline on a synthetic screen (ImageGrab itself is
+    left out, it costs the same either way). Returns ms per capture for the
+    original rotate-then-LANCZOS path, the reduce-then-rotate path, and a
+    full fast capture (downscale, signature, tile diff and encode) of a
+    changed and an unchanged frame.
+    """
+    rng = np.random.default_rng(1)
+    width, screen_height = screen_size
+    # Flat panels with gradients and text-like noise, roughly what a kiosk screen looks like
+    base = np.zeros((screen_height, width, 3), dtype=np.uint8)
+    base[:, :, 0] = np.linspace(20, 90, width, dtype=np.uint8)
+    base[:, :, 2] = np.linspace(60, 140, screen_height, dtype=np.uint8)[:, None]
+    base[400:700, 300:1600] = rng.integers(0, 255, (300, 1300, 3), dtype=np.uint8)
+    screens = [Image.fromarray(base)]
+    for i in range(1, 4):
+        changed = base.copy()
+        changed[100 + i * 50:160 + i * 50, 800:1100] = 255 # A "timer" that changes every capture
+        screens.append(Image.fromarray(changed))
+
+    def time_ms(fn):
+        start = time.perf_counter()
+        for i in range(runs):
+            fn(i)
+        return (time.perf_counter() - start) * 1000.0 / runs
+
+    def original(i):
+        screen = screens[i % len(screens)].rotate(90, expand=True)
+        ratio = height / screen.height
+        screen = screen.resize((max(1, int(screen.width * ratio)), height), Image.Resampling.LANCZOS)
+        buf = io.BytesIO()
+        screen.save(buf, format='JPEG', quality=30)
+
+    encoder = TileDiffEncoder()
+    signatures = {}
+    def fast_capture(screen):
+        image = downscale_to_portrait(screen, height)
+        signature = frame_signature(image)
+        if signatures.get(height) != signature or encoder.hashes is None:
+            signatures[height] = signature
+            encoder.encode(np.asarray(image.convert('RGB')))
+
+    return {
+        'original_ms': time_ms(original),
+        'downscale_ms': time_ms(lambda i: downscale_to_portrait(screens[i % len(screens)], height)),
+        'fast_changed_ms': time_ms(lambda i: fast_capture(screens[i % len(screens)])),
+        'fast_unchanged_ms': time_ms(lambda i: fast_capture(screens[0])),
+    }
+
+if __name__ == "__main__":
+    # python screenshot_server.py [runs]
+    import sys
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    for name, ms in benchmark(runs).items():
+        print(f"{name:<18} {ms:8.2f} ms per capture")
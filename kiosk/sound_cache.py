@@ -0,0 +1,148 @@
+# sound_cache.py
+print("[sound cache] Beginning imports ...", flush=True)
+print("[sound cache] Importing os...", flush=True)
+import os
+print("[sound cache] Imported os.", flush=True)
+print("[sound cache] Importing threading...", flush=True)
+import threading
+print("[sound cache] Imported threading.", flush=True)
+print("[sound cache] Importing time...", flush=True)
+import time
+print("[sound cache] Imported time.", flush=True)
+print("[sound cache] Importing OrderedDict from collections...", flush=True)
+from collections import OrderedDict
+print("[sound cache] Imported OrderedDict from collections.", flush=True)
+print("[sound cache] Importing pygame...", flush=True)
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "1"
+import pygame # type: ignore
+print("[sound cache] Imported pygame.", flush=True)
+print("[sound cache] Ending imports ...", flush=True)
+
+class SoundCache:
+    """
+    In-memory cache of decoded pygame.mixer.Sound objects.
+    Each file is decoded once and kept until the total decoded size exceeds
+    max_bytes, at which point the least recently used sounds are dropped.
+    Entries remember the file's size and mtime, so a file replaced on disk is
+    decoded again on its next use; invalidate() drops everything after a sync.
+    """
+    MAX_BYTES = 64 * 1024 * 1024  # 64 MB of decoded PCM, ~6 minutes of 44.1 kHz stereo
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes if max_bytes is not None else self.MAX_BYTES
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # {abs path: (sound, decoded bytes, (size, mtime))}, least recently used first
+        self._total_bytes = 0
+        self._preload_thread = None
+        self._preload_queue = []
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _file_identity(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime)
+
+    @staticmethod
+    def _decoded_bytes(sound):
+        """Size of a Sound's decoded buffer, computed from its length and the mixer format."""
+        init_params = pygame.mixer.get_init()
+        if not init_params:
+            return 0
+        frequency, sample_format, channels = init_params
+        return int(sound.get_length() * frequency) * channels * (abs(sample_format) // 8)
+
+    def get(self, path):
+        """Returns the Sound for path, decoding it on a miss. Returns None if the file is missing."""
+        key = os.path.abspath(path)
+        identity = self._file_identity(key)
+        if identity is None:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] == identity:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        # Decode outside the lock so a slow load doesn't block cached playback
+        start = time.perf_counter()
+        sound = pygame.mixer.Sound(key)
+        size = self._decoded_bytes(sound)
+        print(f"[sound cache] Decoded {os.path.basename(key)} ({size // 1024} KB) in {(time.perf_counter() - start) * 1000:.0f} ms", flush=True)
+
+        with self._lock:
+            self.misses += 1
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous[1]
+            self._entries[key] = (sound, size, identity)
+            self._total_bytes += size
+            self._evict_locked(keep=key)
+        return sound
+
+    def _evict_locked(self, keep=None):
+        """Drops least recently used sounds until the cache fits within max_bytes. Caller holds the lock."""
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, (_, size, _) = next(iter(self._entries.items()))
+            if key == keep:
+                break
+            del self._entries[key]
+            self._total_bytes -= size
+            print(f"[sound cache] Evicted {os.path.basename(key)}", flush=True)
+
+    def invalidate(self, paths=None):
+        """Drops the given paths, or every cached sound if paths is None."""
+        with self._lock:
+            if paths is None:
+                count = len(self._entries)
+                self._entries.clear()
+                self._total_bytes = 0
+            else:
+                count = 0
+                for path in paths:
+                    entry = self._entries.pop(os.path.abspath(path), None)
+                    if entry is not None:
+                        self._total_bytes -= entry[1]
+                        count += 1
+        print(f"[sound cache] Invalidated {count} sound(s)", flush=True)
+
+    def preload(self, paths):
+        """Decodes the given files in a background thread."""
+        paths = [str(p) for p in paths if p and os.path.exists(p)]
+        if not paths:
+            return
+        with self._lock:
+            for path in paths:
+                if path not in self._preload_queue:
+                    self._preload_queue.append(path)
+            if self._preload_thread and self._preload_thread.is_alive():
+                return
+            self._preload_thread = threading.Thread(target=self._preload_worker, daemon=True, name="SoundPreload")
+            self._preload_thread.start()
+
+    def _preload_worker(self):
+        while True:
+            with self._lock:
+                if not self._preload_queue:
+                    self._preload_thread = None
+                    break
+                path = self._preload_queue.pop(0)
+            try:
+                if pygame.mixer.get_init():
+                    self.get(path)
+            except Exception as e:
+                print(f"[sound cache] Preload error for {path}: {e}", flush=True)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'sounds': len(self._entries),
+                'bytes': self._total_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
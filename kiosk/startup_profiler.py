@@ -0,0 +1,219 @@
+import os
+import re
+import sys
+import time
+import json
+import datetime
+import threading
+import builtins
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+class StartupProfiler:
+    """
+    Profiling mode for startup. When enabled (--profile-startup on the command
+    line, or PROFILE_STARTUP=1 in the environment) it records the wall time and
+    Python memory delta of every module's first import and of every block
+    wrapped in measure(), e.g. a component's constructor.
+
+    Imports are timed by wrapping builtins.__import__, so import it before
+    anything else. Each import records its total time and its self time, which
+    excludes the modules it imported in turn. Memory is measured with
+    tracemalloc. That only counts Python allocations. It is process-wide, so
+    deltas of steps that overlap on other threads include each other's
+    allocations, and it slows allocation-heavy imports down somewhat.
+
+    write_report() saves a report sorted by cost and a Chrome trace-event JSON
+    file (chrome://tracing or ui.perfetto.dev) to the logs directory, then
+    removes the hook. While profiling, the "Importing X..." / "Imported X."
+    console lines are dropped: the report replaces them, and they would
+    otherwise add console writes to the times being measured.
+    """
+    IMPORT_CHATTER = re.compile(r"^\[[^\]]*\]\s*(Importing |Imported |Beginning imports|Ending imports)")
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.origin = time.perf_counter()
+        self.records = [] # dicts: kind, name, parent, nested, start_ms, total_ms, self_ms, memory_kb, thread, tid
+        self._lock = threading.Lock()
+        self._local = threading.local() # Per-thread stack of open records
+        self._original_import = None
+        self._original_stdout = None
+
+    @classmethod
+    def from_environment(cls):
+        return cls(enabled="--profile-startup" in sys.argv or os.environ.get("PROFILE_STARTUP") == "1")
+
+    def install(self):
+        if not self.enabled or self._original_import is not None:
+            return
+        tracemalloc.start()
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+        self._original_stdout = sys.stdout
+        sys.stdout = _ChatterFilter(sys.stdout, self.IMPORT_CHATTER)
+
+    def uninstall(self):
+        if self._original_import is None:
+            return
+        builtins.__import__ = self._original_import
+        self._original_import = None
+        if isinstance(sys.stdout, _ChatterFilter):
+            sys.stdout = self._original_stdout
+        else:
+            # Something (the logger) wrapped the filter since; let it pass everything through
+            _ChatterFilter.active = False
+        tracemalloc.stop()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _open(self, kind, name):
+        stack = self._stack()
+        record = {
+            'kind': kind,
+            'name': name,
+            'parent': stack[-1]['name'] if stack else None,
+            'nested': bool(stack) and stack[-1]['kind'] == 'import', # Already counted in its importer's time
+            'start_ms': (time.perf_counter() - self.origin) * 1000,
+            'thread': threading.current_thread().name,
+            'tid': threading.get_ident(),
+            '_memory': tracemalloc.get_traced_memory()[0],
+            '_children_ms': 0.0
+        }
+        stack.append(record)
+        return record
+
+    def _close(self, record):
+        record['total_ms'] = (time.perf_counter() - self.origin) * 1000 - record['start_ms']
+        record['self_ms'] = record['total_ms'] - record.pop('_children_ms')
+        memory = record.pop('_memory')
+        if tracemalloc.is_tracing(): # Profiling may have stopped while this step ran on another thread
+            memory = tracemalloc.get_traced_memory()[0] - memory
+        else:
+            memory = 0
+        record['memory_kb'] = memory / 1024
+        stack = self._stack()
+        stack.pop()
+        if stack:
+            stack[-1]['_children_ms'] += record['total_ms']
+        with self._lock:
+            self.records.append(record)
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # Only first imports are timed; repeated imports are dictionary lookups
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+        record = self._open('import', name)
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._close(record)
+
+    @contextmanager
+    def measure(self, name):
+        """Times the block as a component, e.g. with profiler.measure("VideoManager"): ..."""
+        if self._original_import is None:
+            yield
+            return
+        record = self._open('component', name)
+        try:
+            yield
+        finally:
+            self._close(record)
+
+    def report(self, top=40):
+        """The report as text lines: components, then the slowest imports by self time."""
+        with self._lock:
+            records = list(self.records)
+        components = sorted((r for r in records if r['kind'] == 'component'), key=lambda r: -r['total_ms'])
+        imports = sorted((r for r in records if r['kind'] == 'import'), key=lambda r: -r['self_ms'])
+        import_ms = sum(r['total_ms'] for r in imports if not r['nested'])
+        lines = [f"Startup profile: {len(imports)} imports ({import_ms:.0f} ms), {len(components)} components"]
+        lines.append("")
+        lines.append(f"{'component':<40}{'total ms':>10}{'self ms':>10}{'memory KB':>11}  thread")
+        for r in components:
+            lines.append(f"{r['name']:<40}{r['total_ms']:>10.1f}{r['self_ms']:>10.1f}{r['memory_kb']:>11.0f}  {r['thread']}")
+        lines.append("")
+        lines.append(f"{'import':<40}{'total ms':>10}{'self ms':>10}{'memory KB':>11}  imported by")
+        for r in imports[:top]:
+            lines.append(f"{r['name']:<40}{r['total_ms']:>10.1f}{r['self_ms']:>10.1f}{r['memory_kb']:>11.0f}  {r['parent'] or '-'}")
+        if len(imports) > top:
+            lines.append(f"... {len(imports) - top} more imports in the trace file")
+        return lines
+
+    def trace_events(self):
+        """The records as Chrome trace events; nesting shows as stacked slices per thread."""
+        with self._lock:
+            records = list(self.records)
+        threads = {r['tid']: r['thread'] for r in records}
+        events = [{'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid, 'args': {'name': name}}
+                  for tid, name in threads.items()]
+        return {'traceEvents': events + [{
+            'name': r['name'],
+            'cat': r['kind'],
+            'ph': 'X',
+            'ts': round(r['start_ms'] * 1000),
+            'dur': round(r['total_ms'] * 1000),
+            'pid': os.getpid(),
+            'tid': r['tid'],
+            'args': {'self_ms': round(r['self_ms'], 3), 'memory_kb': round(r['memory_kb'], 1), 'parent': r['parent']}
+        } for r in records], 'displayTimeUnit': 'ms'}
+
+    def write_report(self, app_name, log_dir="logs"):
+        """Writes <app>_startup_profile_<time>.txt and .json, prints the report and stops profiling."""
+        if not self.enabled or self._original_import is None:
+            return None
+        self.uninstall()
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            base = Path(log_dir) / f"{app_name}_startup_profile_{timestamp}"
+            lines = self.report()
+            with open(f"{base}.txt", 'w', encoding='utf-8') as f:
+                f.write("\n".join(lines) + "\n")
+            with open(f"{base}.json", 'w', encoding='utf-8') as f:
+                json.dump(self.trace_events(), f)
+            print(f"[startup profiler] Report written to {base}.txt and {base}.json", flush=True)
+            for line in lines:
+                print(f"[startup profiler] {line}", flush=True)
+            return base
+        except Exception as e:
+            print(f"[startup profiler] Error writing report: {e}", flush=True)
+            return None
+
+class _ChatterFilter:
+    """stdout wrapper that drops whole lines matching a pattern while active."""
+    active = True
+
+    def __init__(self, stream, pattern):
+        self._stream = stream
+        self._pattern = pattern
+        self._partial = ""
+
+    def write(self, text):
+        if not _ChatterFilter.active:
+            return self._stream.write(text)
+        self._partial += text
+        while "\n" in self._partial:
+            line, self._partial = self._partial.split("\n", 1)
+            if not self._pattern.match(line):
+                self._stream.write(line + "\n")
+        return len(text)
+
+    def flush(self):
+        if self._partial:
+            self._stream.write(self._partial)
+            self._partial = ""
+        self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+# Shared by every module; installed now so all later imports are timed
+profiler = StartupProfiler.from_environment()
+profiler.install()
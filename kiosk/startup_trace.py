@@ -0,0 +1,119 @@
+# startup_trace.py
+print("[startup trace] Beginning imports ...", flush=True)
+print("[startup trace] Importing time...", flush=True)
+import time
+print("[startup trace] Imported time.", flush=True)
+
+print("[startup trace] Importing threading...", flush=True)
+import threading
+print("[startup trace] Imported threading.", flush=True)
+
+print("[startup trace] Importing traceback...", flush=True)
+import traceback
+print("[startup trace] Imported traceback.", flush=True)
+
+print("[startup trace] Importing contextlib...", flush=True)
+from contextlib import contextmanager
+print("[startup trace] Imported contextlib.", flush=True)
+
+print("[startup trace] Importing profiler from startup_profiler...", flush=True)
+from startup_profiler import profiler
+print("[startup trace] Imported profiler from startup_profiler.", flush=True)
+print("[startup trace] Ending imports ...", flush=True)
+
+class StartupTask:
+    """A startup step running on its own thread; result() waits for it."""
+    def __init__(self, name, thread):
+        self.name = name
+        self._thread = thread
+        self.value = None
+        self.error = None
+
+    def done(self):
+        return not self._thread.is_alive()
+
+    def wait(self, timeout=None):
+        """Waits for the step without raising. Returns True once it has finished."""
+        self._thread.join(timeout)
+        return self.done()
+
+    def result(self, timeout=None):
+        """Waits for the step and returns its value, re-raising anything it raised."""
+        self._thread.join(timeout)
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+class StartupTrace:
+    """
+    Per-phase timings of kiosk startup, in ms since launch. phase() times a step
+    on the calling thread, spawn() runs one on a background thread, and mark()
+    records a milestone such as the first paint. report() prints them all in
+    the order they started, so restart-to-playable time can be read off the log.
+    In profiling mode every phase is also measured by the startup profiler.
+    """
+    def __init__(self, origin=None):
+        self.origin = origin if origin is not None else time.perf_counter()
+        self._phases = [] # (name, start_ms, duration_ms, thread name)
+        self._marks = [] # (name, ms)
+        self._lock = threading.Lock()
+
+    def _now_ms(self):
+        return (time.perf_counter() - self.origin) * 1000
+
+    def add(self, name, start_ms, duration_ms, thread_name=None):
+        with self._lock:
+            self._phases.append((name, start_ms, duration_ms, thread_name or threading.current_thread().name))
+
+    @contextmanager
+    def phase(self, name):
+        start = self._now_ms()
+        try:
+            with profiler.measure(name):
+                yield
+        finally:
+            self.add(name, start, self._now_ms() - start)
+
+    def spawn(self, name, fn, *args):
+        """Runs fn(*args) as phase name on a daemon thread. Errors are printed and kept on the task."""
+        def run():
+            with self.phase(name):
+                try:
+                    task.value = fn(*args)
+                except Exception as e:
+                    print(f"[startup trace] Startup step '{name}' failed: {e}", flush=True)
+                    traceback.print_exc()
+                    task.error = e
+        thread = threading.Thread(target=run, daemon=True, name=f"Startup-{name}")
+        task = StartupTask(name, thread)
+        thread.start()
+        return task
+
+    def mark(self, name):
+        with self._lock:
+            self._marks.append((name, self._now_ms()))
+
+    def mark_ms(self, name):
+        """ms since launch of a mark, or None if it hasn't happened."""
+        with self._lock:
+            for mark, ms in self._marks:
+                if mark == name:
+                    return ms
+        return None
+
+    def report(self):
+        """Returns the trace as text lines: phases by start time, then the milestones."""
+        with self._lock:
+            phases = sorted(self._phases, key=lambda phase: phase[1])
+            marks = list(self._marks)
+        lines = [f"{'phase':<28}{'start ms':>10}{'took ms':>10}  thread"]
+        for name, start, duration, thread_name in phases:
+            lines.append(f"{name:<28}{start:>10.0f}{duration:>10.0f}  {thread_name}")
+        for name, ms in marks:
+            lines.append(f"* {name:<26}{ms:>10.0f}")
+        return lines
+
+    def print_report(self, title="Startup trace"):
+        print(f"[startup trace] {title}:", flush=True)
+        for line in self.report():
+            print(f"[startup trace]   {line}", flush=True)
@@ -1,9 +1,93 @@
-import sounddevice as sd
+try:
+    import sounddevice as sd
+except Exception:
+    sd = None # Only needed when no capture hub is passed (and not at all for offline evaluation)
 import numpy as np
 import time
 from collections import deque
 import threading
 
+class OnsetDetector:
+    """
+    Vectorized tap onset detector.
+
+    Each block is pre-emphasized (a first difference, which suppresses the
+    bass-heavy background music and keeps the broadband click of a tap), cut
+    into HOP-sample frames and turned into a dB energy envelope. A frame is an
+    onset when it is THRESHOLD_DB above the adaptive noise floor, RISE_DB above
+    the loudest of the previous few frames, and the frame before it wasn't
+    already loud. Partial frames and edge state carry over between blocks, so
+    a tap that straddles a block boundary is still seen once, with a timestamp
+    accurate to one frame (~1.5 ms at 44.1 kHz) instead of one block.
+
+    The noise floor follows a low percentile of each block's envelope: it
+    falls quickly when things get quieter and rises slowly, so a run of taps
+    doesn't raise it but music starting up does.
+    """
+    HOP = 64
+    PRE_EMPHASIS = 0.97
+    THRESHOLD_DB = 12.0
+    RISE_DB = 8.0
+    MIN_LEVEL_DB = -45.0 # Absolute gate in dBFS so a silent room's hiss never triggers
+    FLOOR_PERCENTILE = 30
+    FLOOR_RISE = 0.02 # Per-block smoothing when the floor goes up
+    FLOOR_FALL = 0.3 # ... and when it goes down
+    REFERENCE_FRAMES = 4
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.samples_in = 0 # Total samples fed; onset positions are indexes in this stream
+        self.noise_floor_db = None
+        self._prev_sample = 0.0
+        self._leftover = np.zeros(0, dtype=np.float32)
+        self._frames_done = 0
+        self._history_db = np.full(self.REFERENCE_FRAMES, -120.0, dtype=np.float32)
+        self._was_above = False
+
+    def process(self, block):
+        """Feeds one block of float samples; returns the sample index of each onset found."""
+        x = np.asarray(block, dtype=np.float32).reshape(-1)
+        if x.size == 0:
+            return np.zeros(0, dtype=np.int64)
+        self.samples_in += x.size
+
+        emphasized = np.empty_like(x)
+        emphasized[0] = x[0] - self.PRE_EMPHASIS * self._prev_sample
+        emphasized[1:] = x[1:] - self.PRE_EMPHASIS * x[:-1]
+        self._prev_sample = float(x[-1])
+
+        buf = np.concatenate((self._leftover, emphasized))
+        frame_count = buf.size // self.HOP
+        self._leftover = buf[frame_count * self.HOP:]
+        if frame_count == 0:
+            return np.zeros(0, dtype=np.int64)
+        frames = buf[:frame_count * self.HOP].reshape(frame_count, self.HOP)
+        energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-12)
+
+        block_floor = float(np.percentile(energy_db, self.FLOOR_PERCENTILE))
+        if self.noise_floor_db is None:
+            self.noise_floor_db = block_floor
+        else:
+            smoothing = self.FLOOR_RISE if block_floor > self.noise_floor_db else self.FLOOR_FALL
+            self.noise_floor_db += smoothing * (block_floor - self.noise_floor_db)
+
+        # Loudest of the preceding REFERENCE_FRAMES frames, for every frame
+        history = np.concatenate((self._history_db, energy_db))
+        reference = history[:frame_count].copy()
+        for lag in range(1, self.REFERENCE_FRAMES):
+            np.maximum(reference, history[lag:lag + frame_count], out=reference)
+        self._history_db = history[-self.REFERENCE_FRAMES:]
+
+        above = (energy_db > self.noise_floor_db + self.THRESHOLD_DB) & (energy_db > self.MIN_LEVEL_DB)
+        rising = energy_db - reference > self.RISE_DB
+        previous_above = np.concatenate(([self._was_above], above[:-1]))
+        self._was_above = bool(above[-1])
+
+        onset_frames = np.flatnonzero(above & rising & ~previous_above)
+        first_frame = self._frames_done
+        self._frames_done += frame_count
+        return (first_frame + onset_frames) * self.HOP
+
 class TapDetector:
     """
     Listens for a specific tap pattern on an audio input device and
@@ -13,7 +97,8 @@ class TapDetector:
 
     # --- 1. TUNABLE PARAMETERS ---
 
-    # The volume threshold for detecting a "tap". You'll need to adjust this.
+    # Block-norm threshold of the original detector; only used as the baseline in offline evaluation.
+    # Onset sensitivity is set by OnsetDetector.THRESHOLD_DB / RISE_DB.
     LOUDNESS_THRESHOLD = 140
 
     # The sample rate of your microphone
@@ -39,18 +124,26 @@ class TapDetector:
     # The pattern we are looking for: 1 tap, then 2, then 3. Total of 6 taps.
     PATTERN_LENGTH = 6
 
-    def __init__(self, pattern_callback=None):
+    # Re-anchor the sample clock to wall time if they drift apart by more than this (e.g. after a stall)
+    CLOCK_RESYNC = 0.25
+
+    def __init__(self, pattern_callback=None, capture_hub=None):
         """
         Initializes the tap detector.
         :param pattern_callback: A function to call when the pattern is detected.
+        :param capture_hub: Shared MicCaptureHub to listen through; None opens a sounddevice stream.
         """
         self.pattern_callback = pattern_callback
-        
+        self.capture_hub = capture_hub
+        self.subscription = None
+
         # --- 2. STATE MANAGEMENT ---
         self.tap_timestamps = deque(maxlen=self.PATTERN_LENGTH)
         self.last_tap_time = 0
         self.stream = None
         self.is_running = False
+        self.onset_detector = OnsetDetector(self.SAMPLE_RATE)
+        self._clock_anchor = None # Wall time of sample 0 of the onset detector's stream
 
     def _check_for_pattern(self):
         """Analyzes the timestamps to see if they match the desired rhythm."""
@@ -72,6 +165,30 @@ class TapDetector:
 
         return False
 
+    def _register_tap(self, tap_time):
+        """
+        Records a tap at tap_time (seconds) and checks the pattern.
+        Returns True if this tap completed the pattern.
+        """
+        if tap_time - self.last_tap_time <= self.MIN_TAP_INTERVAL:
+            return False
+        self.last_tap_time = tap_time
+
+        # Reset the pattern if the new tap is too long after the previous one
+        if self.tap_timestamps and tap_time - self.tap_timestamps[-1] > self.PATTERN_TIMEOUT:
+            if(self.DEBUG):print("\n--- Tap pattern timed out, starting over. ---", flush=True)
+            self.tap_timestamps.clear()
+
+        # Add the new tap time to our history
+        self.tap_timestamps.append(tap_time)
+        if(self.DEBUG):print(f"Tap detected! ({len(self.tap_timestamps)}/{self.PATTERN_LENGTH})", flush=True)
+
+        if self._check_for_pattern():
+            if(self.DEBUG):print("\n*** !!! PATTERN DETECTED: Tap, Tap-Tap, Tap-Tap-Tap !!! ***\n", flush=True)
+            self.tap_timestamps.clear()
+            return True
+        return False
+
     def _audio_callback(self, indata, frames, time_info, status):
         """
         This function is called for each new chunk of audio from the microphone.
@@ -80,30 +197,21 @@ class TapDetector:
             if(self.DEBUG):print(f"[TapDetector] Audio Status: {status}", flush=True)
 
         try:
-            volume_norm = np.linalg.norm(indata) * 10
-            
-            if volume_norm > self.LOUDNESS_THRESHOLD:
-                current_time = time.time()
-                
-                if current_time - self.last_tap_time > self.MIN_TAP_INTERVAL:
-                    self.last_tap_time = current_time
-                    
-                    # Reset the pattern if the new tap is too long after the previous one
-                    if self.tap_timestamps and current_time - self.tap_timestamps[-1] > self.PATTERN_TIMEOUT:
-                        if(self.DEBUG):print("\n--- Tap pattern timed out, starting over. ---", flush=True)
-                        self.tap_timestamps.clear()
-
-                    # Add the new tap time to our history
-                    self.tap_timestamps.append(current_time)
-                    if(self.DEBUG):print(f"Tap detected! ({len(self.tap_timestamps)}/{self.PATTERN_LENGTH})", flush=True)
-
-                    if self._check_for_pattern():
-                        if(self.DEBUG):print("\n*** !!! PATTERN DETECTED: Tap, Tap-Tap, Tap-Tap-Tap !!! ***\n", flush=True)
-                        self.tap_timestamps.clear()
-                        # Call the callback function if it was provided
-                        if self.pattern_callback:
-                            # Run callback in a new thread to avoid blocking the audio stream
-                            threading.Thread(target=self.pattern_callback, daemon=True).start()
+            onsets = self.onset_detector.process(indata)
+
+            # Tap times come from the sample count, so intervals between taps are exact;
+            # the anchor maps them onto wall time and is reset if capture stalled
+            now = time.time()
+            stream_seconds = self.onset_detector.samples_in / float(self.SAMPLE_RATE)
+            if self._clock_anchor is None or abs(self._clock_anchor + stream_seconds - now) > self.CLOCK_RESYNC:
+                self._clock_anchor = now - stream_seconds
+
+            for sample_index in onsets:
+                if self._register_tap(self._clock_anchor + sample_index / float(self.SAMPLE_RATE)):
+                    # Call the callback function if it was provided
+                    if self.pattern_callback:
+                        # Run callback in a new thread to avoid blocking the audio stream
+                        threading.Thread(target=self.pattern_callback, daemon=True).start()
         except Exception as e:
             if(self.DEBUG):print(f"[TapDetector] Error in audio callback: {e}", flush=True)
 
@@ -114,16 +222,31 @@ class TapDetector:
             return
 
         if(self.DEBUG):print("[TapDetector] Starting...", flush=True)
+        if self.capture_hub is not None:
+            try:
+                self.subscription = self.capture_hub.subscribe(
+                    "tap_detector", chunk_frames=self.CHUNK_SIZE, rate=self.SAMPLE_RATE,
+                    callback=lambda chunk: self._audio_callback(chunk, len(chunk), None, None))
+                self.is_running = True
+                if(self.DEBUG):print("[TapDetector] Listening for taps via capture hub...", flush=True)
+            except Exception as e:
+                if(self.DEBUG):print(f"[TapDetector] An error occurred during start: {e}", flush=True)
+                self.subscription = None
+                self.is_running = False
+            return
+
         try:
+            if sd is None:
+                raise RuntimeError("sounddevice is not available")
             # Check if a microphone is available
             if not sd.query_devices(kind='input'):
                 if(self.DEBUG):print("[TapDetector] WARNING: No input audio device found. Tap detector will not start.", flush=True)
                 return
 
             self.stream = sd.InputStream(
-                callback=self._audio_callback, 
-                channels=1, 
-                samplerate=self.SAMPLE_RATE, 
+                callback=self._audio_callback,
+                channels=1,
+                samplerate=self.SAMPLE_RATE,
                 blocksize=self.CHUNK_SIZE
             )
             self.stream.start()
@@ -140,6 +263,9 @@ class TapDetector:
             return
 
         if(self.DEBUG):print("[TapDetector] Stopping...", flush=True)
+        if self.subscription:
+            self.subscription.close()
+            self.subscription = None
         if self.stream:
             try:
                 self.stream.stop()
@@ -148,4 +274,106 @@ class TapDetector:
             except Exception as e:
                 if(self.DEBUG):print(f"[TapDetector] Error stopping stream: {e}", flush=True)
         self.stream = None
-        self.is_running = False
\ No newline at end of file
+        self.is_running = False
+
+def _read_wav(path):
+    """Loads a WAV file as mono float32 samples in [-1, 1]; returns (samples, rate)."""
+    import wave
+    with wave.open(path, 'rb') as wf:
+        rate = wf.getframerate()
+        channels = wf.getnchannels()
+        width = wf.getsampwidth()
+        raw = wf.readframes(wf.getnframes())
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768.0
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype='<i4').astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported sample width {width} in {path}")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples, rate
+
+def _read_labels(wav_path):
+    """Reads '<name>.taps.txt' next to the WAV: one tap time in seconds per line. None if absent."""
+    import os
+    label_path = os.path.splitext(wav_path)[0] + ".taps.txt"
+    if not os.path.exists(label_path):
+        return None
+    with open(label_path) as f:
+        return sorted(float(line.split()[0]) for line in f if line.strip() and not line.startswith('#'))
+
+def _score(detected, labels, tolerance):
+    """Greedy one-to-one matching of detections to labels within tolerance seconds."""
+    unmatched = list(labels)
+    hits, errors = 0, []
+    for t in detected:
+        best = min(unmatched, key=lambda label: abs(label - t), default=None)
+        if best is not None and abs(best - t) <= tolerance:
+            unmatched.remove(best)
+            hits += 1
+            errors.append(abs(best - t))
+    return {
+        'hits': hits,
+        'false_alarms': len(detected) - hits,
+        'misses': len(unmatched),
+        'precision': hits / len(detected) if detected else 1.0,
+        'recall': hits / len(labels) if labels else 1.0,
+        'mean_error_ms': (sum(errors) / len(errors) * 1000.0) if errors else 0.0,
+    }
+
+def evaluate_file(path, tolerance=0.05, chunk_size=TapDetector.CHUNK_SIZE):
+    """
+    Runs the onset detector and the original block-norm detector over a WAV
+    file in kiosk-sized chunks. Returns a result dict per detector.
+    """
+    samples, rate = _read_wav(path)
+    labels = _read_labels(path)
+    seconds = len(samples) / float(rate)
+    blocks = [samples[i:i + chunk_size] for i in range(0, len(samples), chunk_size)]
+    results = {}
+
+    def run(name, detect_block):
+        tapper = TapDetector()
+        detected, patterns = [], 0
+        start = time.process_time()
+        for index, block in enumerate(blocks):
+            for tap_time in detect_block(index, block):
+                if tap_time - tapper.last_tap_time > TapDetector.MIN_TAP_INTERVAL:
+                    detected.append(tap_time)
+                if tapper._register_tap(tap_time):
+                    patterns += 1
+        cpu = time.process_time() - start
+        result = {'taps': len(detected), 'patterns': patterns, 'cpu_ms_per_s': cpu * 1000.0 / seconds if seconds else 0.0}
+        if labels is not None:
+            result.update(_score(detected, labels, tolerance))
+        results[name] = result
+
+    onset_detector = OnsetDetector(rate)
+    run('onset', lambda index, block: [s / float(rate) for s in onset_detector.process(block)])
+    # Original detector: whole-block norm against a fixed threshold, timestamped at the block's end
+    run('block_norm', lambda index, block: [(index * chunk_size + len(block)) / float(rate)]
+        if np.linalg.norm(block) * 10 > TapDetector.LOUDNESS_THRESHOLD else [])
+    return {'file': path, 'seconds': seconds, 'labels': len(labels) if labels is not None else None, 'detectors': results}
+
+if __name__ == "__main__":
+    # Offline evaluation: python tap_detector.py recording.wav [more.wav ...] [--tolerance 0.05]
+    # Ground truth, if present, is read from recording.taps.txt (tap times in seconds, one per line).
+    import argparse
+    parser = argparse.ArgumentParser(description="Evaluate tap detection on recorded WAV files.")
+    parser.add_argument('wav_files', nargs='+')
+    parser.add_argument('--tolerance', type=float, default=0.05, help="Seconds a detection may be off from a label")
+    args = parser.parse_args()
+
+    for wav_path in args.wav_files:
+        report = evaluate_file(wav_path, args.tolerance)
+        label_note = f"{report['labels']} labelled taps" if report['labels'] is not None else "no labels"
+        print(f"{report['file']}: {report['seconds']:.1f} s, {label_note}")
+        for name, r in report['detectors'].items():
+            line = f"  {name:<10} taps={r['taps']:<4} patterns={r['patterns']:<3} cpu={r['cpu_ms_per_s']:.2f} ms/s"
+            if 'recall' in r:
+                line += (f" precision={r['precision']:.2f} recall={r['recall']:.2f}"
+                         f" misses={r['misses']} false_alarms={r['false_alarms']} error={r['mean_error_ms']:.1f} ms")
+            print(line)
@@ -0,0 +1,223 @@
+# video_audio_cache.py
+print("[video audio cache] Beginning imports ...", flush=True)
+print("[video audio cache] Importing os...", flush=True)
+import os
+print("[video audio cache] Imported os.", flush=True)
+print("[video audio cache] Importing hashlib...", flush=True)
+import hashlib
+print("[video audio cache] Imported hashlib.", flush=True)
+print("[video audio cache] Importing threading...", flush=True)
+import threading
+print("[video audio cache] Imported threading.", flush=True)
+print("[video audio cache] Importing subprocess...", flush=True)
+import subprocess
+print("[video audio cache] Imported subprocess.", flush=True)
+print("[video audio cache] Importing time...", flush=True)
+import time
+print("[video audio cache] Imported time.", flush=True)
+print("[video audio cache] Importing traceback...", flush=True)
+import traceback
+print("[video audio cache] Imported traceback.", flush=True)
+print("[video audio cache] Importing Path from pathlib...", flush=True)
+from pathlib import Path
+print("[video audio cache] Imported Path from pathlib.", flush=True)
+print("[video audio cache] Ending imports ...", flush=True)
+
+class VideoAudioCache:
+    """
+    Persistent cache of audio tracks extracted from videos.
+    Entries are WAV files keyed by (path, size, mtime) so a synced file with new
+    content gets a new entry. File mtimes double as LRU timestamps: a hit touches
+    the entry, and eviction removes the least recently touched files until the
+    cache fits within max_bytes.
+    """
+    MAX_BYTES = 1024 * 1024 * 1024  # 1 GB
+
+    def __init__(self, ffmpeg_path, cache_dir=None, max_bytes=None):
+        print("[video audio cache] Initializing VideoAudioCache...", flush=True)
+        self.ffmpeg_path = ffmpeg_path
+        self.cache_dir = Path(cache_dir) if cache_dir else Path(__file__).parent / "data" / "audio_cache"
+        self.max_bytes = max_bytes if max_bytes is not None else self.MAX_BYTES
+        self._lock = threading.Lock()
+        self._in_progress = {}  # {cache key: threading.Event} for extractions underway
+        self._prefetch_thread = None
+        self._prefetch_queue = []
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        except Exception as e:
+            print(f"[video audio cache] Error creating cache directory {self.cache_dir}: {e}", flush=True)
+        print(f"[video audio cache] Cache directory: {self.cache_dir} (limit {self.max_bytes // (1024 * 1024)} MB)", flush=True)
+
+    def _cache_key(self, video_path):
+        """Returns the cache key for a video, or None if the file is missing."""
+        try:
+            stat = os.stat(video_path)
+        except OSError:
+            return None
+        identity = f"{os.path.abspath(video_path)}|{stat.st_size}|{int(stat.st_mtime)}"
+        return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key):
+        return self.cache_dir / f"{key}.wav"
+
+    def get(self, video_path):
+        """Returns the cached audio path for a video without extracting, or None."""
+        key = self._cache_key(video_path)
+        if key is None:
+            return None
+        entry = self._entry_path(key)
+        if entry.exists():
+            try:
+                os.utime(entry, None)  # Mark as recently used
+            except OSError:
+                pass
+            return str(entry)
+        return None
+
+    def get_or_extract(self, video_path):
+        """Returns the cached audio path for a video, extracting it on a miss."""
+        key = self._cache_key(video_path)
+        if key is None:
+            print(f"[video audio cache] Video not found: {video_path}", flush=True)
+            return None
+
+        while True:
+            cached = self.get(video_path)
+            if cached:
+                print(f"[video audio cache] Cache hit for {video_path}", flush=True)
+                return cached
+
+            with self._lock:
+                pending = self._in_progress.get(key)
+                if pending is None:
+                    pending = threading.Event()
+                    self._in_progress[key] = pending
+                    owner = True
+                else:
+                    owner = False
+
+            if not owner:
+                # Another thread (usually the prefetcher) is extracting this video
+                print(f"[video audio cache] Waiting for in-progress extraction of {video_path}", flush=True)
+                pending.wait(timeout=60)
+                if self.get(video_path) is None:
+                    return None
+                continue
+
+            try:
+                print(f"[video audio cache] Cache miss for {video_path}, extracting...", flush=True)
+                result = self._extract(video_path, self._entry_path(key))
+                if result:
+                    self._evict()
+                return result
+            finally:
+                with self._lock:
+                    self._in_progress.pop(key, None)
+                pending.set()
+
+    def _extract(self, video_path, entry):
+        """Runs ffmpeg to write the audio track to a temp file, then moves it into place."""
+        temp_path = entry.with_name(f"{entry.stem}.{threading.get_ident()}.tmp.wav")
+        command = [
+            self.ffmpeg_path, "-hide_banner", "-loglevel", "error",
+            "-i", str(video_path),
+            "-vn",                  # No video
+            "-acodec", "pcm_s16le", # Standard WAV codec
+            "-ar", "44100",         # Audio sample rate
+            "-ac", "1",             # Mono audio
+            "-y",                   # Overwrite output file without asking
+            str(temp_path),
+        ]
+        start = time.perf_counter()
+        try:
+            startupinfo = None
+            if os.name == 'nt': # Hide console window on Windows
+                startupinfo = subprocess.STARTUPINFO()
+                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+                startupinfo.wShowWindow = subprocess.SW_HIDE
+
+            result = subprocess.run(command, capture_output=True, text=True, check=False, startupinfo=startupinfo, encoding='utf-8', errors='ignore')
+            if result.returncode != 0:
+                print(f"[video audio cache] ffmpeg error (code {result.returncode}): {result.stderr}", flush=True)
+                self._safe_remove(temp_path)
+                return None
+            if not temp_path.exists() or temp_path.stat().st_size <= 1024: # Basic sanity check
+                print(f"[video audio cache] Extracted audio missing or too small for {video_path} (no audio track?)", flush=True)
+                self._safe_remove(temp_path)
+                return None
+
+            os.replace(temp_path, entry)
+            print(f"[video audio cache] Extracted {video_path} in {(time.perf_counter() - start) * 1000:.0f} ms", flush=True)
+            return str(entry)
+        except FileNotFoundError:
+            print(f"[video audio cache] Error: ffmpeg executable not found at '{self.ffmpeg_path}'.", flush=True)
+            return None
+        except Exception as e:
+            print(f"[video audio cache] Audio extraction error: {e}", flush=True)
+            traceback.print_exc()
+            self._safe_remove(temp_path)
+            return None
+
+    def _evict(self):
+        """Removes least recently used entries until the cache fits within max_bytes."""
+        try:
+            entries = []
+            total = 0
+            for entry in self.cache_dir.glob("*.wav"):
+                if entry.name.endswith(".tmp.wav"):
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry))
+                total += stat.st_size
+
+            if total <= self.max_bytes:
+                return
+
+            entries.sort()  # Oldest use first
+            for _, size, entry in entries:
+                if total <= self.max_bytes:
+                    break
+                if self._safe_remove(entry):
+                    total -= size
+                    print(f"[video audio cache] Evicted {entry.name}", flush=True)
+        except Exception as e:
+            print(f"[video audio cache] Error during eviction: {e}", flush=True)
+
+    def prefetch(self, video_paths):
+        """Extracts audio for the given videos in a background thread."""
+        paths = [str(p) for p in video_paths if p and os.path.exists(p)]
+        if not paths:
+            return
+        with self._lock:
+            for path in paths:
+                if path not in self._prefetch_queue:
+                    self._prefetch_queue.append(path)
+            if self._prefetch_thread and self._prefetch_thread.is_alive():
+                return
+            self._prefetch_thread = threading.Thread(target=self._prefetch_worker, daemon=True, name="VideoAudioPrefetch")
+            self._prefetch_thread.start()
+
+    def _prefetch_worker(self):
+        print("[video audio cache] Prefetch thread started.", flush=True)
+        while True:
+            with self._lock:
+                if not self._prefetch_queue:
+                    self._prefetch_thread = None
+                    break
+                path = self._prefetch_queue.pop(0)
+            try:
+                self.get_or_extract(path)
+            except Exception as e:
+                print(f"[video audio cache] Prefetch error for {path}: {e}", flush=True)
+        print("[video audio cache] Prefetch thread finished.", flush=True)
+
+    def _safe_remove(self, filepath):
+        try:
+            os.remove(filepath)
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            # Common issue on Windows is file lock, log as warning
+            print(f"[video audio cache] Warning: Could not remove file {filepath}: {e}", flush=True)
+            return False
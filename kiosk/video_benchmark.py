@@ -0,0 +1,364 @@
+# video_benchmark.py
+"""
+Headless playback benchmark for VideoPlayer.
+
+Plays test videos through the real reader and player threads into a frame
+sink and reports start latency, decode and display rates, A/V sync counters,
+CPU use (the Python process plus the ffmpeg decoder child, whose share is
+also shown on its own) and peak RSS for every configuration. Each configuration runs in its
+own process so peak RSS is not shared between runs. Needs no display or sound
+card, so playback changes can be measured on any Linux box:
+
+    python video_benchmark.py intro_videos/intro.mp4 --decoders cv2 ffmpeg --sinks null qt
+
+Sinks:
+    null     releases every frame immediately (reader/player cost only)
+    qt       paints frames on an offscreen QGraphicsView the way the kiosk's
+             video window does (QImage over the frame slot, fitInView)
+    overlay  the real Overlay.update_video_frame (Windows kiosks only, as
+             qt_overlay imports win32gui)
+"""
+import os
+# Must be set before Qt and pygame are imported
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import sys
+import json
+import time
+import argparse
+import itertools
+import subprocess
+import tempfile
+import threading
+import traceback
+
+RESULT_MARKER = "VIDEO_BENCHMARK_RESULT "
+SINKS = ('null', 'qt', 'overlay')
+AUDIO_CACHE_DIR = os.path.join(tempfile.gettempdir(), "kiosk_video_benchmark_audio")
+
+def _peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if unavailable."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024.0 * 1024.0) if sys.platform == 'darwin' else peak / 1024.0
+    except ImportError:
+        try:
+            import psutil
+            info = psutil.Process().memory_info()
+            return getattr(info, 'peak_wset', info.rss) / (1024.0 * 1024.0)
+        except Exception:
+            return None
+
+class PlaybackRecorder:
+    """Timestamps frames as the sink displays them."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.play_called = None
+        self.first_frame = None
+        self.last_frame = None
+        self.frames = 0
+
+    def frame_displayed(self):
+        now = time.perf_counter()
+        with self._lock:
+            if self.first_frame is None:
+                self.first_frame = now
+            self.last_frame = now
+            self.frames += 1
+
+    def start_latency_ms(self):
+        if self.first_frame is None or self.play_called is None:
+            return None
+        return (self.first_frame - self.play_called) * 1000.0
+
+    def display_fps(self):
+        if self.frames < 2 or self.last_frame <= self.first_frame:
+            return None
+        return (self.frames - 1) / (self.last_frame - self.first_frame)
+
+class NullSink:
+    needs_qt = False
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+
+    def deliver(self, slot):
+        self.recorder.frame_displayed()
+        slot.release()
+
+    def finish(self):
+        pass
+
+def _make_qt_sink_classes():
+    """Defines the Qt sinks on first use so the null sink runs without PyQt5."""
+    from PyQt5.QtCore import QObject, Qt, QMetaObject, Q_ARG, pyqtSlot
+    from PyQt5.QtGui import QImage, QPainter
+    from PyQt5.QtWidgets import QGraphicsScene, QGraphicsView
+    from qt_classes import VideoFrameItem
+
+    class QtSink(QObject):
+        """Mirrors the kiosk video window: a VideoFrameItem in a full-screen QGraphicsView."""
+        needs_qt = True
+
+        def __init__(self, recorder, width, height):
+            super().__init__()
+            self.recorder = recorder
+            self.current_slot = None
+            self.scene = QGraphicsScene()
+            self.view = QGraphicsView(self.scene)
+            self.view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+            self.view.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+            self.view.setRenderHint(QPainter.Antialiasing, False)
+            self.view.setCacheMode(QGraphicsView.CacheNone)
+            self.view.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+            self.item = VideoFrameItem()
+            self.scene.addItem(self.item)
+            self.view.setGeometry(0, 0, width, height)
+            self.scene.setSceneRect(0, 0, width, height)
+            self.view.show()
+
+        def deliver(self, slot):
+            QMetaObject.invokeMethod(self, "show_frame", Qt.QueuedConnection, Q_ARG(object, slot))
+
+        @pyqtSlot(object)
+        def show_frame(self, slot):
+            if slot.qimage is None:
+                height, width, channel = slot.array.shape
+                slot.qimage = QImage(slot.array.data, width, height, channel * width, QImage.Format_BGR888)
+            self.item.setImage(slot.qimage)
+            previous_slot = self.current_slot
+            self.current_slot = slot
+            if previous_slot is not None and previous_slot is not slot:
+                previous_slot.release()
+            item_rect = self.item.boundingRect()
+            if not item_rect.isEmpty():
+                self.view.fitInView(item_rect, Qt.KeepAspectRatio)
+            self.view.viewport().update()
+            self.recorder.frame_displayed()
+
+        def finish(self):
+            self.item.setImage(None)
+            if self.current_slot is not None:
+                self.current_slot.release()
+                self.current_slot = None
+
+    class OverlaySink(QObject):
+        """Feeds frames to the real Overlay video display."""
+        needs_qt = True
+
+        def __init__(self, recorder):
+            super().__init__()
+            from qt_overlay import Overlay
+            self.recorder = recorder
+            self.overlay = Overlay
+            Overlay._init_video_display()
+            Overlay.prepare_video_display(False, None)
+            Overlay.show_video_display()
+
+        def deliver(self, slot):
+            QMetaObject.invokeMethod(self, "show_frame", Qt.QueuedConnection, Q_ARG(object, slot))
+
+        @pyqtSlot(object)
+        def show_frame(self, slot):
+            self.overlay.update_video_frame(slot)
+            self.recorder.frame_displayed()
+
+        def finish(self):
+            self.overlay.destroy_video_display()
+
+    return QtSink, OverlaySink
+
+def run_configuration(config):
+    """Plays one video with one configuration in this process and returns the result dict."""
+    from pygame import mixer
+    mixer.init(frequency=44100, buffer=4096) # Same settings as VideoManager
+    import imageio_ffmpeg
+    from video_player import VideoPlayer, benchmark_decoder, child_cpu_seconds
+    from video_audio_cache import VideoAudioCache
+
+    video_path = config['video']
+    ffmpeg_path = imageio_ffmpeg.get_ffmpeg_exe()
+    result = dict(config)
+
+    audio_path = None
+    if config['audio']:
+        # Extracted once and reused across runs, outside the measured window
+        audio_path = VideoAudioCache(ffmpeg_path, cache_dir=AUDIO_CACHE_DIR).get_or_extract(video_path)
+
+    app = None
+    recorder = PlaybackRecorder()
+    if config['sink'] == 'null':
+        sink = NullSink(recorder)
+    else:
+        from PyQt5.QtWidgets import QApplication
+        app = QApplication.instance() or QApplication([])
+        QtSink, OverlaySink = _make_qt_sink_classes()
+        if config['sink'] == 'qt':
+            sink = QtSink(recorder, config['width'], config['height'])
+        else:
+            sink = OverlaySink(recorder)
+
+    player = VideoPlayer(ffmpeg_path, decoder=config['decoder'])
+    player.target_width = config['width'] # Same output size on every machine
+    player.target_height = config['height']
+
+    if config['warm']:
+        start = time.perf_counter()
+        if not player.preload(video_path, audio_path):
+            raise RuntimeError(f"preload failed for {video_path}")
+        result['preload_ms'] = (time.perf_counter() - start) * 1000.0
+
+    deadline_seconds = config['max_seconds']
+    cpu_start = time.process_time()
+    # The ffmpeg decoder runs in a child process; its CPU is counted once the player has reaped it.
+    # A warm start's decoder was started by preload(), so its prefill is counted too.
+    child_start = child_cpu_seconds()
+    recorder.play_called = time.perf_counter()
+    player.play_video(video_path, audio_path, sink.deliver, lambda: None)
+
+    if app is None:
+        while player.is_playing:
+            if deadline_seconds and time.perf_counter() - recorder.play_called >= deadline_seconds:
+                break
+            time.sleep(0.02)
+    else:
+        from PyQt5.QtCore import QTimer
+        poll = QTimer()
+        def check_finished():
+            if not player.is_playing or (deadline_seconds and time.perf_counter() - recorder.play_called >= deadline_seconds):
+                app.quit()
+        poll.timeout.connect(check_finished)
+        poll.start(20)
+        app.exec_()
+        poll.stop()
+
+    wall_seconds = time.perf_counter() - recorder.play_called
+    completed = not player.is_playing
+    if player.is_playing:
+        player.stop_video(wait=True)
+    sink.finish()
+    player.release_preload()
+    python_cpu = time.process_time() - cpu_start
+    child_cpu = child_cpu_seconds() - child_start if child_start is not None else None
+    peak_rss = _peak_rss_mb() # Before the decode pass below
+
+    stats = player.get_playback_stats()
+    result.update({
+        'completed': completed,
+        'seconds': wall_seconds,
+        'start_latency_ms': recorder.start_latency_ms(),
+        'frames_displayed': recorder.frames,
+        'display_fps': recorder.display_fps(),
+        'video_fps': player.frame_rate,
+        'dropped_frames': stats['dropped_frames'],
+        'late_frames': stats['late_frames'],
+        'repeated_frames': stats['repeated_frames'],
+        'max_drift_ms': stats['max_drift_ms'],
+        'clock': stats['clock'],
+        'python_cpu_percent': 100.0 * python_cpu / wall_seconds if wall_seconds > 0 else None,
+        'child_cpu_percent': 100.0 * child_cpu / wall_seconds if wall_seconds > 0 and child_cpu is not None else None,
+        # Python process plus decoder child, the number to compare backends by
+        'cpu_percent': 100.0 * (python_cpu + child_cpu) / wall_seconds if wall_seconds > 0 and child_cpu is not None else None,
+        'peak_rss_mb': peak_rss,
+    })
+
+    if config['decode_frames']:
+        # Unpaced decode with the same backend and output size: sustained decode rate
+        decode = benchmark_decoder(video_path, config['decoder'], config['width'], config['height'],
+                                   ffmpeg_path, max_frames=config['decode_frames'])
+        result['decode_fps'] = decode['fps'] if decode else None
+    return result
+
+def _run_child(config, verbose):
+    """Runs one configuration in a fresh interpreter and returns its result dict."""
+    command = [sys.executable, os.path.abspath(__file__), "--child", json.dumps(config)]
+    completed = subprocess.run(command, capture_output=True, text=True, encoding='utf-8', errors='ignore')
+    if verbose:
+        sys.stdout.write(completed.stdout)
+        sys.stderr.write(completed.stderr)
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    error_lines = (completed.stderr or completed.stdout).strip().splitlines()
+    failed = dict(config)
+    failed['error'] = error_lines[-1] if error_lines else f"exit code {completed.returncode}"
+    return failed
+
+def _fmt(value, spec):
+    return format(value, spec) if isinstance(value, (int, float)) else "-"
+
+def print_report(results):
+    header = (f"{'video':<22} {'decoder':<7} {'sink':<7} {'start':<5} {'start ms':>8} {'decode':>7} {'display':>7} "
+              f"{'dropped':>7} {'late':>5} {'drift ms':>8} {'cpu %':>6} {'child%':>6} {'rss MB':>7}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        name = os.path.basename(r['video'])[:22]
+        start = 'warm' if r['warm'] else 'cold'
+        if 'error' in r:
+            print(f"{name:<22} {r['decoder']:<7} {r['sink']:<7} {start:<5} error: {r['error']}")
+            continue
+        print(f"{name:<22} {r['decoder']:<7} {r['sink']:<7} {start:<5} {_fmt(r['start_latency_ms'], '8.1f')} "
+              f"{_fmt(r.get('decode_fps'), '7.1f')} {_fmt(r['display_fps'], '7.1f')} {r['dropped_frames']:>7} "
+              f"{r['late_frames']:>5} {_fmt(r['max_drift_ms'], '8.1f')} {_fmt(r['cpu_percent'], '6.1f')} "
+              f"{_fmt(r.get('child_cpu_percent'), '6.1f')} "
+              f"{_fmt(r['peak_rss_mb'], '7.1f')}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless VideoPlayer playback benchmark")
+    parser.add_argument("videos", nargs="*")
+    parser.add_argument("--decoders", nargs="+", default=['cv2', 'ffmpeg'], choices=['cv2', 'ffmpeg'])
+    parser.add_argument("--sinks", nargs="+", default=['null', 'qt'], choices=SINKS)
+    parser.add_argument("--start", choices=['cold', 'warm', 'both'], default='both',
+                        help="Play from a fresh player, after VideoPlayer.preload(), or both")
+    parser.add_argument("--no-audio", action="store_true", help="Play without the audio track (wall clock sync)")
+    parser.add_argument("--max-seconds", type=float, default=20.0, help="Stop each run after this long (0 = whole video)")
+    parser.add_argument("--decode-frames", type=int, default=300, help="Frames for the unpaced decode pass (0 = skip)")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show the player's own logging")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        try:
+            result = run_configuration(json.loads(args.child))
+        except Exception:
+            traceback.print_exc()
+            sys.exit(1)
+        print(RESULT_MARKER + json.dumps(result), flush=True)
+        return
+
+    if not args.videos:
+        parser.error("at least one video is required")
+
+    starts = {'cold': [False], 'warm': [True], 'both': [False, True]}[args.start]
+    results = []
+    for video, decoder, sink, warm in itertools.product(args.videos, args.decoders, args.sinks, starts):
+        config = {
+            'video': video,
+            'decoder': decoder,
+            'sink': sink,
+            'warm': warm,
+            'audio': not args.no_audio,
+            'max_seconds': args.max_seconds,
+            'decode_frames': args.decode_frames,
+            'width': args.width,
+            'height': args.height,
+        }
+        print(f"[video benchmark] {os.path.basename(video)}: {decoder} decoder, {sink} sink, {'warm' if warm else 'cold'} start...", flush=True)
+        results.append(_run_child(config, args.verbose))
+
+    print()
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n[video benchmark] Results written to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -34,6 +34,15 @@ print("[video_manager] Imported Overlay from qt_overlay.", flush=True)
 print("[video_manager] Importing VideoPlayer from video_player...", flush=True)
 from video_player import VideoPlayer # Import the refactored VideoPlayer
 print("[video_manager] Imported VideoPlayer from video_player.", flush=True)
+print("[video_manager] Importing VideoAudioCache from video_audio_cache...", flush=True)
+from video_audio_cache import VideoAudioCache
+print("[video_manager] Imported VideoAudioCache from video_audio_cache.", flush=True)
+print("[video_manager] Importing ROOM_CONFIG from config...", flush=True)
+from config import ROOM_CONFIG
+print("[video_manager] Imported ROOM_CONFIG from config.", flush=True)
+print("[video_manager] Importing Path from pathlib...", flush=True)
+from pathlib import Path
+print("[video_manager] Imported Path from pathlib.", flush=True)
 print("[video_manager] Importing subprocess...", flush=True)
 import subprocess
 print("[video_manager] Imported subprocess.", flush=True)
@@ -44,6 +53,9 @@ print("[video_manager] Imported Qt classes from PyQt5.QtCore.", flush=True)
 print("[video_manager] Ending imports ...", flush=True)
 
 class VideoManager:
+    # Intro video types the admin can request (see KioskApp.play_video)
+    INTRO_VIDEO_TYPES = ('intro', 'late', 'recent')
+
     def __init__(self, root=None):
         print("[video manager] Initializing VideoManager", flush=True)
         # root is kept for compatibility but no longer used
@@ -54,12 +66,23 @@ class VideoManager:
         self.completion_callback = None # Callback for when playback finishes *and cleanup is done*
         self.resetting = False # Flag for hard resets
         self.video_player = None # Instance of VideoPlayer
+        self.room = None # Room this kiosk is assigned to
+        self.decoder = 'cv2' # VideoPlayer decoder backend, chosen per room
+        self.last_playback_stats = None # A/V sync counters of the current or last video, shared with its player
+        self.warm_player = None # VideoPlayer preloaded for warm_video_path, handed to play_video on a match
+        self.warm_video_path = None
+        self._warm_request = None # Path of the latest preload request; preloads finishing for another path are discarded
+        self._warm_lock = threading.Lock()
+        self.audio_engine = None # AudioEngine set by KioskApp; video audio then plays on its 'video' bus
 
         # Get ffmpeg path from imageio-ffmpeg
         print("[video manager] Getting ffmpeg path from imageio-ffmpeg...", flush=True)
         self.ffmpeg_path = imageio_ffmpeg.get_ffmpeg_exe()
         print(f"[video manager] Using ffmpeg from: {self.ffmpeg_path}", flush=True)
 
+        # Persistent cache of extracted audio tracks, shared by all players
+        self.audio_cache = VideoAudioCache(self.ffmpeg_path)
+
         # Initialize Pygame mixer (idempotent)
         try:
             print("[video manager] Initializing Pygame mixer...", flush=True)
@@ -79,8 +102,135 @@ class VideoManager:
         print("[video manager] VideoManager initialization complete.", flush=True)
 
 
+    def get_room_video_paths(self, room):
+        """Returns the intro and game video paths that exist for a room."""
+        video_dir = Path("intro_videos")
+        paths = [video_dir / f"{video_type}.mp4" for video_type in self.INTRO_VIDEO_TYPES]
+        if room is not None and room in ROOM_CONFIG['backgrounds']:
+            paths.append(video_dir / ROOM_CONFIG['backgrounds'][room].replace('.png', '.mp4'))
+        return [p for p in paths if p.exists()]
+
+    def get_video_path(self, video_type, room=None):
+        """Returns the path of an admin video type ('intro', 'late', 'recent' or 'game'), or None if missing."""
+        room = self.room if room is None else room
+        video_dir = Path("intro_videos")
+        if video_type == 'game':
+            if room is None or room not in ROOM_CONFIG['backgrounds']:
+                return None
+            path = video_dir / ROOM_CONFIG['backgrounds'][room].replace('.png', '.mp4')
+        elif video_type in self.INTRO_VIDEO_TYPES:
+            path = video_dir / f"{video_type}.mp4"
+        else:
+            return None
+        return path if path.exists() else None
+
+    def assign_room(self, room):
+        """Selects the decoder backend for the room and starts warming its videos."""
+        if room != self.room:
+            self.release_preload() # Warmed for the previous room's decoder/videos
+        self.room = room
+        self.decoder = ROOM_CONFIG.get('video_decoders', {}).get(room, 'cv2')
+        print(f"[video manager] Room {room} assigned, using {self.decoder} video decoder.", flush=True)
+        self.prefetch_room_audio(room)
+        self.preload_video_type('intro')
+
+    def preload_video_type(self, video_type):
+        """Warm-starts the video an admin video command of this type would play first."""
+        path = self.get_video_path(video_type)
+        if path is None:
+            print(f"[video manager] No '{video_type}' video to preload for room {self.room}.", flush=True)
+            return
+        self.preload_video(path)
+
+    def preload_video(self, video_path):
+        """
+        Prepares a VideoPlayer for video_path in the background (frame source
+        open, first second decoded, audio staged) so play_video can start it
+        without any setup. Only one video is kept warm at a time.
+        """
+        video_path = str(video_path)
+        with self._warm_lock:
+            if self._warm_request == video_path:
+                return # Already warm or warming
+            self._warm_request = video_path
+            stale_player = self.warm_player
+            self.warm_player = None
+            self.warm_video_path = None
+        if stale_player:
+            stale_player.release_preload()
+        threading.Thread(target=self._preload_worker, args=(video_path,), daemon=True, name="VideoPreload").start()
+
+    def _preload_worker(self, video_path):
+        start = time.perf_counter()
+        player = None
+        warmed = False
+        try:
+            player = self._new_player()
+            audio_path = self.audio_cache.get_or_extract(video_path)
+            warmed = player.preload(video_path, audio_path)
+        except Exception as e:
+            print(f"[video manager] Error preloading {video_path}: {e}", flush=True)
+            traceback.print_exc()
+
+        with self._warm_lock:
+            keep = warmed and self._warm_request == video_path
+            if keep:
+                self.warm_player = player
+                self.warm_video_path = video_path
+            elif self._warm_request == video_path:
+                self._warm_request = None # Failed; allow a later retry
+        if keep:
+            print(f"[video manager] {video_path} warm in {(time.perf_counter() - start) * 1000:.0f} ms", flush=True)
+        elif player:
+            player.release_preload()
+
+    def _take_warm_player(self, video_path):
+        """Returns the warm player for video_path, or None. Any other warm player is kept."""
+        with self._warm_lock:
+            if self._warm_request != video_path:
+                return None
+            self._warm_request = None # Consumed, or discarded when its preload finishes
+            player = self.warm_player
+            self.warm_player = None
+            self.warm_video_path = None
+        return player
+
+    def release_preload(self):
+        """Releases the warm player's decoder, frames and staged audio."""
+        with self._warm_lock:
+            self._warm_request = None
+            player = self.warm_player
+            self.warm_player = None
+            self.warm_video_path = None
+        if player:
+            player.release_preload()
+
+    def prefetch_room_audio(self, room):
+        """Extracts audio for the room's videos in the background so playback starts immediately."""
+        try:
+            paths = self.get_room_video_paths(room)
+            print(f"[video manager] Prefetching audio for {len(paths)} video(s) of room {room}", flush=True)
+            self.audio_cache.prefetch(paths)
+        except Exception as e:
+            print(f"[video manager] Error prefetching room audio: {e}", flush=True)
+
+    def get_playback_stats(self):
+        """Returns the A/V sync counters of the current or last video, or None if nothing has played."""
+        if self.last_playback_stats is None:
+            return None
+        return dict(self.last_playback_stats)
+
+    def _new_player(self):
+        audio_channel = self.audio_engine.channel('video') if self.audio_engine else None
+        return VideoPlayer(self.ffmpeg_path, decoder=self.decoder, audio_channel=audio_channel)
+
     def _fade_background_music(self, target_volume, duration=0.2, steps=10):
         """Gradually changes background music volume."""
+        if self.audio_engine:
+            # Ducking is a separate gain on the music bus, ramped by the engine (streamed music follows it):
+            # it returns immediately and leaves the operator's music volume alone
+            self.audio_engine.duck('music', target_volume, duration)
+            return
         try:
             # Check if music is actually playing and mixer is initialized
             if not mixer.get_init() or not mixer.music.get_busy():
@@ -178,9 +328,12 @@ class VideoManager:
 
         # --- Start new video playback (OUTSIDE the lock) ---
         try:
-            # 1. Fade out background music
+            # 1. Fade out background music (in the background so the video starts immediately)
             print("[video manager] Fading out background music...", flush=True)
-            self._fade_background_music(0.3)
+            if self.audio_engine:
+                self._fade_background_music(0.3)
+            else:
+                threading.Thread(target=self._fade_background_music, args=(0.3,), daemon=True, name="MusicFade").start()
 
             # 2. Prepare Qt video display
             is_skippable = "video_solutions" in video_path.lower().replace("\\", "/")
@@ -198,14 +351,22 @@ class VideoManager:
             QMetaObject.invokeMethod(Overlay._bridge, "show_video_display_slot", Qt.QueuedConnection)
             print("[video manager] show_video_display_slot invoked.", flush=True)
 
-            # 4. Instantiate VideoPlayer
-            print("[video manager] Instantiating VideoPlayer...", flush=True)
-            self.video_player = VideoPlayer(self.ffmpeg_path)
-            print("[video manager] VideoPlayer instantiated.", flush=True)
-
-            # 5. Extract audio
-            print("[video manager] Extracting audio...", flush=True)
-            audio_path = self.video_player.extract_audio(video_path)
+            # 4. Use the warm player if this video was preloaded, otherwise instantiate one
+            warm_player = self._take_warm_player(video_path)
+            if warm_player:
+                print("[video manager] Using preloaded VideoPlayer.", flush=True)
+                self.video_player = warm_player
+            else:
+                print("[video manager] Instantiating VideoPlayer...", flush=True)
+                self.video_player = self._new_player()
+                print("[video manager] VideoPlayer instantiated.", flush=True)
+
+            # 5. Get audio from the persistent cache (extracting on a miss)
+            print("[video manager] Getting audio track...", flush=True)
+            audio_path = self.audio_cache.get_or_extract(video_path)
+            if not audio_path:
+                print("[video manager] Audio cache unavailable, extracting to temp file...", flush=True)
+                audio_path = self.video_player.extract_audio(video_path)
             if audio_path:
                 print(f"[video manager] Audio extracted successfully: {audio_path}", flush=True)
             else:
@@ -219,6 +380,7 @@ class VideoManager:
                 frame_update_cb=self._handle_frame_update,
                 on_complete_cb=self._on_player_complete
             )
+            self.last_playback_stats = self.video_player.playback_stats # Kept after the player is released
             print("[video manager] Video player started.", flush=True)
 
         except Exception as e:
@@ -228,8 +390,9 @@ class VideoManager:
 
 
     def _handle_frame_update(self, frame_data):
-        """Callback received from VideoPlayer with a new frame."""
+        """Callback received from VideoPlayer with a new frame (a FrameSlot we now own)."""
         if not self.is_playing or self.should_stop or self.resetting or not Overlay._bridge:
+             frame_data.release() # Hand the slot back to the reader instead of displaying it
              return # Don't process frames if not playing or bridge missing
 
         # Use QueuedConnection for asynchronous update
@@ -237,7 +400,7 @@ class VideoManager:
             Overlay._bridge, # +++ Target the bridge instance +++
             "update_video_frame_slot", # +++ Call the slot +++
             Qt.QueuedConnection,
-            Q_ARG(object, frame_data) # Pass the frame data (numpy array)
+            Q_ARG(object, frame_data) # Pass the FrameSlot; the overlay releases it once replaced
         )
 
     def _handle_video_skip_request(self):
@@ -400,7 +563,8 @@ class VideoManager:
          if bridge_exists:
               QMetaObject.invokeMethod(Overlay._bridge, "destroy_video_display_slot", Qt.BlockingQueuedConnection)
          # Restore music immediately
-         if mixer.get_init(): mixer.music.set_volume(1.0)
+         if self.audio_engine: self.audio_engine.duck('music', 1.0, 0)
+         elif mixer.get_init(): mixer.music.set_volume(1.0)
          # Show other overlays (if bridge exists)
          if bridge_exists:
               QMetaObject.invokeMethod(Overlay._bridge, "show_all_overlays_slot", Qt.QueuedConnection)
@@ -492,7 +656,10 @@ class VideoManager:
             
             # Step 2: Restore music volume immediately
             print("[video manager][FORCE_STOP] Force restoring music volume...", flush=True)
-            if mixer.get_init():
+            if self.audio_engine:
+                 self.audio_engine.duck('music', 1.0, 0)
+                 print("[video manager][FORCE_STOP] Music bus un-ducked", flush=True)
+            elif mixer.get_init():
                  mixer.music.set_volume(1.0) # Set volume directly
                  print("[video manager][FORCE_STOP] Music volume restored to 1.0", flush=True)
             else:
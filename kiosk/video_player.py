@@ -1,8 +1,5 @@
 # video_player.py
 print("[video_player] Beginning imports...", flush=True)
-print("[video_player] Importing cv2...", flush=True)
-import cv2
-print("[video_player] Imported cv2.", flush=True)
 print("[video_player] Importing threading...", flush=True)
 import threading
 print("[video_player] Imported threading.", flush=True)
@@ -39,26 +36,317 @@ try:
     import pyautogui # For screen size detection
     PYAUTOGUI_AVAILABLE = True
     print("[video_player] Imported pyautogui successfully.", flush=True)
-except ImportError:
+except Exception: # ImportError, or no display to connect to on a headless Linux box
     PYAUTOGUI_AVAILABLE = False
     print("[video player] Warning: pyautogui not found. Screen size detection unavailable, assuming 1920x1080.", flush=True)
 
 print("[video_player] Ending imports.", flush=True)
 
+class FrameSlot:
+    """One preallocated frame buffer in a FrameRing."""
+    __slots__ = ('ring', 'index', 'array', 'view', 'qimage', 'in_use', 'pts')
+
+    def __init__(self, ring, index, array):
+        self.ring = ring
+        self.index = index
+        self.array = array # Contiguous BGR uint8 array, (height, width, 3)
+        self.view = memoryview(array.reshape(-1)) # Flat byte view for readinto()
+        self.qimage = None # QImage wrapping array, created once by the display
+        self.in_use = False
+        self.pts = 0.0 # Presentation time in seconds from the start of the video
+
+    def release(self):
+        """Returns the slot to its ring. Safe to call more than once."""
+        self.ring.release(self)
+
+class FrameRing:
+    """
+    Fixed pool of preallocated frame buffers shared by the reader, the player
+    and the Qt display, so playback does no per-frame allocation.
+
+    Ownership protocol: the reader acquire()s a free slot and decodes into it,
+    then passes it through the frame queue to the player, which hands it to the
+    display callback. The display owns the slot until it shows a newer one and
+    then release()s it. Whoever drops a slot instead of passing it on (queue
+    drains on stop, frames skipped by the player, display already gone) must
+    release it, otherwise the reader eventually starves.
+    """
+    def __init__(self, width, height, count):
+        self.width = width
+        self.height = height
+        self._lock = threading.Lock()
+        self._free = queue.Queue()
+        self.slots = [FrameSlot(self, i, np.empty((height, width, 3), dtype=np.uint8)) for i in range(count)]
+        for slot in self.slots:
+            self._free.put(slot)
+
+    def acquire(self, timeout=None):
+        """Takes a free slot for decoding, or returns None on timeout."""
+        try:
+            slot = self._free.get(block=True, timeout=timeout)
+        except queue.Empty:
+            return None
+        slot.in_use = True
+        return slot
+
+    def release(self, slot):
+        with self._lock:
+            if not slot.in_use:
+                return
+            slot.in_use = False
+        self._free.put(slot)
+
+    def free_count(self):
+        return self._free.qsize()
+
+def _sanitize_frame_rate(fps):
+    """Returns a usable frame rate, defaulting to 30 when the container reports nonsense."""
+    if fps is None or not (0.1 < fps < 121.0):
+        print(f"[video player] Warning: Invalid/unreliable FPS ({fps}) from video. Using default 30.", flush=True)
+        return 30.0
+    return float(fps)
+
+cv2 = None # Imported by load_cv2() when the first video opens, not at kiosk startup
+
+def load_cv2():
+    """Imports cv2 on first use; the module is only needed once a video is decoded."""
+    global cv2
+    if cv2 is None:
+        print("[video_player] Importing cv2...", flush=True)
+        import cv2 as cv2_module
+        cv2 = cv2_module
+        print("[video_player] Imported cv2.", flush=True)
+    return cv2
+
+class Cv2FrameSource:
+    """Decodes with cv2.VideoCapture at source resolution, downscaling in Python if needed."""
+    name = 'cv2'
+
+    def __init__(self, video_path, target_width, target_height):
+        self.video_path = video_path
+        self.target_width = target_width
+        self.target_height = target_height
+        self.cap = None
+        self.source_width = 0
+        self.source_height = 0
+        self.output_width = 0
+        self.output_height = 0
+        self.frame_rate = 30.0
+        self.needs_resizing = False
+        self._scratch = None # Reused decode buffer when downscaling
+
+    def open(self):
+        load_cv2()
+        self.cap = cv2.VideoCapture(self.video_path) # Stick to default
+        if not self.cap.isOpened():
+            return False
+        self.source_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.source_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.frame_rate = _sanitize_frame_rate(self.cap.get(cv2.CAP_PROP_FPS))
+        # Resize *only* if the source dimensions are *larger* than the target dimensions.
+        self.needs_resizing = (self.source_width > self.target_width or
+                               self.source_height > self.target_height)
+        if self.needs_resizing:
+            self.output_width, self.output_height = self.target_width, self.target_height
+        else:
+            self.output_width, self.output_height = self.source_width, self.source_height
+        return self.source_width > 0 and self.source_height > 0
+
+    def read_into(self, slot):
+        """Decodes the next frame into slot.array. Returns False at end of stream."""
+        out = slot.array
+        if self.needs_resizing:
+            ret, frame = self.cap.read(self._scratch)
+            if not ret:
+                return False
+            self._scratch = frame
+            # Using INTER_LINEAR is a balance between speed and quality for downscaling.
+            cv2.resize(frame, (self.output_width, self.output_height), dst=out, interpolation=cv2.INTER_LINEAR)
+            return True
+
+        ret, frame = self.cap.read(out)
+        if not ret:
+            return False
+        if frame is not out:
+            # Decoder produced a different size than the container reported
+            if frame.shape == out.shape:
+                np.copyto(out, frame)
+            else:
+                cv2.resize(frame, (self.output_width, self.output_height), dst=out, interpolation=cv2.INTER_LINEAR)
+        return True
+
+    def close(self):
+        if self.cap is not None and self.cap.isOpened():
+            self.cap.release()
+        self.cap = None
+
+class FfmpegFrameSource:
+    """
+    Decodes with an ffmpeg subprocess that scales to the target size and writes
+    raw BGR frames to a pipe, read straight into the caller's frame slots.
+    """
+    name = 'ffmpeg'
+
+    def __init__(self, video_path, target_width, target_height, ffmpeg_path):
+        self.video_path = video_path
+        self.target_width = target_width
+        self.target_height = target_height
+        self.ffmpeg_path = ffmpeg_path
+        self.process = None
+        self.source_width = 0
+        self.source_height = 0
+        self.output_width = 0
+        self.output_height = 0
+        self.frame_rate = 30.0
+        self.needs_resizing = False
+        self.frame_bytes = 0
+
+    def _probe(self):
+        """Reads size and frame rate from the container without decoding."""
+        load_cv2()
+        cap = cv2.VideoCapture(self.video_path)
+        try:
+            if not cap.isOpened():
+                return False
+            self.source_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            self.source_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            self.frame_rate = _sanitize_frame_rate(cap.get(cv2.CAP_PROP_FPS))
+            return self.source_width > 0 and self.source_height > 0
+        finally:
+            cap.release()
+
+    def open(self):
+        if not self.ffmpeg_path:
+            try:
+                self.ffmpeg_path = imageio_ffmpeg.get_ffmpeg_exe()
+            except Exception as e:
+                print(f"[video player] Error finding ffmpeg via imageio_ffmpeg: {e}", flush=True)
+                return False
+        if not self._probe():
+            return False
+
+        self.needs_resizing = (self.source_width > self.target_width or
+                               self.source_height > self.target_height)
+        if self.needs_resizing:
+            self.output_width, self.output_height = self.target_width, self.target_height
+        else:
+            self.output_width, self.output_height = self.source_width, self.source_height
+        self.frame_bytes = self.output_width * self.output_height * 3
+
+        command = [
+            self.ffmpeg_path, "-hide_banner", "-loglevel", "error", "-nostdin",
+            "-i", self.video_path,
+            "-an", "-sn",                 # Video only
+            "-vf", f"scale={self.output_width}:{self.output_height}:flags=bilinear",
+            "-f", "rawvideo",
+            "-pix_fmt", "bgr24",
+            "-",
+        ]
+        try:
+            startupinfo = None
+            if os.name == 'nt': # Hide console window on Windows
+                startupinfo = subprocess.STARTUPINFO()
+                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+                startupinfo.wShowWindow = subprocess.SW_HIDE
+            self.process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                            stdin=subprocess.DEVNULL, bufsize=self.frame_bytes,
+                                            startupinfo=startupinfo)
+            return True
+        except Exception as e:
+            print(f"[video player] Error starting ffmpeg decoder: {e}", flush=True)
+            self.process = None
+            return False
+
+    def read_into(self, slot):
+        """Reads the next frame from the pipe into slot.array. Returns False at end of stream."""
+        if self.process is None:
+            return False
+        view = slot.view
+        filled = 0
+        while filled < self.frame_bytes:
+            count = self.process.stdout.readinto(view[filled:])
+            if not count:
+                if filled:
+                    print(f"[video player] ffmpeg decoder: discarded truncated final frame ({filled}/{self.frame_bytes} bytes).", flush=True)
+                return False
+            filled += count
+        return True
+
+    def close(self):
+        process = self.process
+        self.process = None
+        if process is None:
+            return
+        try:
+            if process.poll() is None:
+                process.kill()
+            process.stdout.close()
+            process.wait(timeout=1.0)
+        except Exception as e:
+            print(f"[video player] Error closing ffmpeg decoder: {e}", flush=True)
+
+class PlaybackClock:
+    """
+    Master clock that video frames are presented against.
+
+    An AudioEngine channel reports the position of the samples it has played,
+    which is used directly. pygame channels expose no playback position, so
+    for those the audio position is estimated from the moment play() was
+    called, less the mixer's output buffer latency. When there is no audio, or
+    the channel stops before the video ends, the clock carries on from the same
+    origin on the wall clock so playback never stalls or jumps.
+    """
+    def __init__(self, channel=None, latency=0.0):
+        self.channel = channel
+        self.latency = latency if channel is not None else 0.0
+        self.start = time.perf_counter()
+        self.source = 'audio' if channel is not None else 'wall'
+        self._sample_clock = hasattr(channel, 'get_position')
+
+    def position(self):
+        """Seconds of media that should have been presented by now."""
+        if self.source == 'audio':
+            try:
+                busy = self.channel.get_busy()
+            except Exception:
+                busy = False
+            if not busy:
+                self.source = 'wall'
+            elif self._sample_clock:
+                audio_position = self.channel.get_position()
+                # Keep the wall clock aligned so a switch to it continues from here
+                self.start = time.perf_counter() - audio_position - self.latency
+                return audio_position
+        return max(0.0, time.perf_counter() - self.start - self.latency)
+
 class VideoPlayer:
     # --- Constants ---
     FRAME_QUEUE_SIZE = 30 # Number of frames to buffer ahead
-
-    def __init__(self, ffmpeg_path):
-        print("[video player] Initializing VideoPlayer (Optimized)", flush=True)
+    SPARE_FRAME_BUFFERS = 4 # Ring slots beyond the queue: frame being shown plus frames in flight to Qt
+    DECODERS = ('cv2', 'ffmpeg')
+    AUDIO_BUFFER_SAMPLES = 4096 # Matches the buffer passed to pygame.mixer.init by the managers
+    DROP_THRESHOLD_FRAMES = 1.5 # Drop a frame once it is this many frame times behind the clock
+    MAX_CLOCK_WAIT = 0.25 # Longest single sleep while a frame waits for its presentation time
+    PRELOAD_SECONDS = 1.0 # Frames decoded ahead by preload(), capped at FRAME_QUEUE_SIZE
+
+    def __init__(self, ffmpeg_path, decoder='cv2', audio_channel=None):
+        print(f"[video player] Initializing VideoPlayer (Optimized, decoder: {decoder})", flush=True)
         self.ffmpeg_path = ffmpeg_path
+        if decoder not in self.DECODERS:
+            print(f"[video player] Unknown decoder '{decoder}', using cv2.", flush=True)
+            decoder = 'cv2'
+        self.decoder = decoder
         self.is_playing = False
         self.should_stop = False # Flag to signal threads to stop
         self.playback_complete = True # Indicates if the last playback finished normally
 
-        print("[video player] Getting mixer Channel 0...", flush=True)
-        self.video_sound_channel = mixer.Channel(0)
-        print("[video player] Got mixer Channel 0.", flush=True)
+        if audio_channel is not None:
+            # AudioEngine channel with the same play/stop/get_busy interface
+            self.video_sound_channel = audio_channel
+        else:
+            print("[video player] Getting mixer Channel 0...", flush=True)
+            self.video_sound_channel = mixer.Channel(0)
+            print("[video player] Got mixer Channel 0.", flush=True)
         self.current_audio_path = None
         
         print("[video player] Creating temporary directory...", flush=True)
@@ -72,6 +360,9 @@ class VideoPlayer:
         self.video_reader_thread = None
         self.video_player_thread = None
         self.frame_queue = None # Will be initialized in play_video
+        self.frame_ring = None # FrameRing allocated by the reader once the video size is known
+        self.playback_stats = self._new_playback_stats()
+        self._warm = None # State left by preload() for a matching play_video()
 
         # Callbacks
         self.on_complete_callback = None
@@ -90,6 +381,21 @@ class VideoPlayer:
         self.needs_resizing = False # Will be True only if source > target
         print("[video player] VideoPlayer initialization complete.", flush=True)
 
+    @staticmethod
+    def _new_playback_stats():
+        return {
+            'frames_shown': 0,
+            'dropped_frames': 0, # Late frames discarded to catch up with the clock
+            'late_frames': 0, # Frames shown more than one frame time behind the clock
+            'repeated_frames': 0, # Frame intervals where the previous frame was held because video ran ahead
+            'max_drift_ms': 0.0, # Largest absolute clock/frame difference seen at presentation
+            'clock': None, # 'audio' or 'wall'
+        }
+
+    def get_playback_stats(self):
+        """Returns a copy of the A/V sync counters for the current or last playback."""
+        return dict(self.playback_stats)
+
     def _update_target_dimensions(self):
         """Attempts to get screen size, falls back to default."""
         if PYAUTOGUI_AVAILABLE:
@@ -106,21 +412,130 @@ class VideoPlayer:
         else:
              print(f"[video player] pyautogui not available. Using default screen size {self.target_width}x{self.target_height}.", flush=True)
 
-    def _reader_thread_func(self, video_path):
+    def _create_frame_source(self, video_path):
+        """Builds the frame source for the configured decoder backend."""
+        if self.decoder == 'ffmpeg':
+            return FfmpegFrameSource(video_path, self.target_width, self.target_height, self.ffmpeg_path)
+        return Cv2FrameSource(video_path, self.target_width, self.target_height)
+
+    def _open_frame_source(self, video_path):
+        """Opens a frame source, falling back to cv2 if the ffmpeg pipe cannot start."""
+        source = self._create_frame_source(video_path)
+        if source.open():
+            return source
+        source.close()
+        if source.name != 'cv2':
+            print(f"[video player] {source.name} decoder failed to start, falling back to cv2.", flush=True)
+            source = Cv2FrameSource(video_path, self.target_width, self.target_height)
+            if source.open():
+                return source
+            source.close()
+        return None
+
+    def preload(self, video_path, audio_path=None, seconds=None):
         """
-        Reads frames from video, resizes IF SOURCE IS LARGER than target,
-        puts them in the queue.
+        Warms the player for a later play_video() of the same file: opens the
+        frame source, decodes the first `seconds` of frames into a frame ring
+        and loads the audio track into a mixer Sound. Must not be called while
+        playing. Returns True if the video could be opened.
         """
-        print(f"[video player] Reader thread starting for: {video_path}", flush=True)
-        cap = None
+        if self.is_playing:
+            print("[video player] Cannot preload while playing.", flush=True)
+            return False
+        self.release_preload()
+        seconds = self.PRELOAD_SECONDS if seconds is None else seconds
+        start = time.perf_counter()
+
+        source = self._open_frame_source(video_path)
+        if source is None:
+            print(f"[video player] Preload: failed to open {video_path}", flush=True)
+            return False
+
+        ring = FrameRing(source.output_width, source.output_height, self.FRAME_QUEUE_SIZE + self.SPARE_FRAME_BUFFERS)
+        frame_time = 1.0 / source.frame_rate
+        count = min(self.FRAME_QUEUE_SIZE, max(1, int(round(seconds * source.frame_rate))))
+        frames = []
+        ended = False
+        try:
+            for index in range(count):
+                slot = ring.acquire(timeout=0)
+                if slot is None:
+                    break
+                if not source.read_into(slot):
+                    slot.release()
+                    ended = True
+                    break
+                slot.pts = index * frame_time
+                frames.append(slot)
+        except Exception as e:
+            print(f"[video player] Preload: error decoding {video_path}: {e}", flush=True)
+            for slot in frames:
+                slot.release()
+            source.close()
+            return False
+
+        sound = None
+        if audio_path and os.path.exists(audio_path):
+            try:
+                if mixer.get_init():
+                    sound = mixer.Sound(audio_path)
+            except Exception as e:
+                print(f"[video player] Preload: could not stage audio {audio_path}: {e}", flush=True)
+
+        self._warm = {
+            'video_path': video_path,
+            'audio_path': audio_path,
+            'source': source,
+            'ring': ring,
+            'frames': frames,
+            'ended': ended, # Whole video fit in the preloaded frames
+            'sound': sound,
+        }
+        print(f"[video player] Preloaded {len(frames)} frame(s){' and audio' if sound else ''} of {os.path.basename(video_path)} "
+              f"in {(time.perf_counter() - start) * 1000:.0f} ms", flush=True)
+        return True
+
+    def is_preloaded(self, video_path):
+        return self._warm is not None and self._warm['video_path'] == video_path
+
+    def release_preload(self):
+        """Closes the preloaded frame source and frees its frames and staged audio."""
+        warm = self._warm
+        self._warm = None
+        if warm is None:
+            return
+        for slot in warm['frames']:
+            slot.release()
+        warm['source'].close()
+        print(f"[video player] Released preload of {os.path.basename(warm['video_path'])}", flush=True)
+
+    def _take_preload(self, video_path):
+        """Hands the preloaded state to a play_video() of the same file, releasing any other preload."""
+        if self._warm is not None and self._warm['video_path'] == video_path:
+            warm = self._warm
+            self._warm = None
+            return warm
+        self.release_preload()
+        return None
+
+    def _reader_thread_func(self, video_path, warm=None):
+        """
+        Reads frames from the frame source (downscaled only if the source is
+        larger than the target) and puts them in the queue.
+        """
+        print(f"[video player] Reader thread starting for: {video_path} (decoder: {self.decoder}, warm: {warm is not None})", flush=True)
+        source = None
         processed_frame_count = 0
         read_successful = False
 
         try:
-            print(f"[video player] Opening video file: {video_path}", flush=True)
-            cap = cv2.VideoCapture(video_path) # Stick to default
+            if warm:
+                source = warm['source'] # Already open and positioned after the preloaded frames
+            else:
+                print(f"[video player] Opening video file: {video_path}", flush=True)
+                source = self._open_frame_source(video_path)
 
-            if not cap.isOpened():
+            if source is None:
                 print(f"[video player] CRITICAL: Failed to open video in reader thread: {video_path}", flush=True)
                 if self.frame_queue:
                     try: self.frame_queue.put(None, timeout=0.5)
@@ -131,69 +546,62 @@ class VideoPlayer:
             read_successful = True
 
             # --- Get Video Properties ---
-            self.source_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            self.source_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            _fps = cap.get(cv2.CAP_PROP_FPS)
-
-            if _fps is None or not (0.1 < _fps < 121.0):
-                print(f"[video player] Warning: Invalid/unreliable FPS ({_fps}) from video. Using default 30.", flush=True)
-                self.frame_rate = 30.0
-            else:
-                self.frame_rate = float(_fps)
+            self.source_width = source.source_width
+            self.source_height = source.source_height
+            self.frame_rate = source.frame_rate
             self.frame_time = 1.0 / self.frame_rate
+            self.needs_resizing = source.needs_resizing
 
             print(f"[video player] Video properties: {self.source_width}x{self.source_height} @ {self.frame_rate:.2f} FPS (Frame Time: {self.frame_time:.4f}s)", flush=True)
-
-            # --- Determine if resizing (downscaling) is needed ONCE ---
-            # Resize *only* if the source dimensions are *larger* than the target dimensions.
-            self.needs_resizing = (self.source_width > self.target_width or
-                                   self.source_height > self.target_height)
-
             if self.needs_resizing:
-                print(f"[video player] Downscaling needed: Source {self.source_width}x{self.source_height} -> Target {self.target_width}x{self.target_height}", flush=True)
-                # Using INTER_LINEAR is a balance between speed and quality for downscaling.
-                resize_interpolation = cv2.INTER_LINEAR
-            elif self.source_width == self.target_width and self.source_height == self.target_height:
-                 print("[video player] No resizing needed (source matches target).", flush=True)
+                print(f"[video player] Downscaling needed: Source {self.source_width}x{self.source_height} -> Target {self.target_width}x{self.target_height} ({source.name})", flush=True)
             else:
-                 # Source is smaller or equal in both dimensions (but not exact match)
-                 print(f"[video player] No resizing needed (source {self.source_width}x{self.source_height} <= target {self.target_width}x{self.target_height}).", flush=True)
-                 # The frame_update_callback receiver will need to handle scaling if fullscreen display is desired.
+                print(f"[video player] No resizing needed (source {self.source_width}x{self.source_height}, target {self.target_width}x{self.target_height}).", flush=True)
+                # The frame_update_callback receiver will need to handle scaling if fullscreen display is desired.
+
+            # --- Allocate the frame ring once for the whole playback ---
+            if warm:
+                ring = warm['ring']
+            else:
+                ring = FrameRing(source.output_width, source.output_height, self.FRAME_QUEUE_SIZE + self.SPARE_FRAME_BUFFERS)
+            self.frame_ring = ring
+
+            frame_index = 0 # Decoded frames, including any the queue had no room for
+            if warm:
+                # Hand over the frames decoded by preload() first
+                for slot in warm['frames']:
+                    try:
+                        self.frame_queue.put(slot, block=True, timeout=1.0)
+                        processed_frame_count += 1
+                    except queue.Full:
+                        slot.release()
+                frame_index = len(warm['frames'])
 
             print("[video player] Starting frame reading loop...", flush=True)
             # --- Frame Reading Loop ---
-            while not self.should_stop:
-                ret, frame = cap.read()
-
-                if not ret:
+            while not self.should_stop and not (warm and warm['ended']):
+                slot = ring.acquire(timeout=1.0)
+                if slot is None:
+                    # Every slot is queued or on screen; the player is behind or paused
+                    continue
+
+                if not source.read_into(slot):
+                    slot.release()
                     print("[video player] Reader: End of video stream reached.", flush=True)
                     break
-
-                # --- Process Frame (Downscaling if needed) ---
-                if self.needs_resizing:
-                    # Only resize (downscale) if source is larger than target
-                    processed_frame = cv2.resize(frame, (self.target_width, self.target_height), interpolation=resize_interpolation)
-                else:
-                    # Use frame directly (BGR) at its original resolution
-                    processed_frame = frame
-
-                # --- Convert to RGB ---
-                # REVERTED: Sending BGR directly as Qt likely expects it or handles conversion.
-                # # Assuming the display layer (Qt) prefers RGB format.
-                # try:
-                #     processed_frame_rgb = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
-                # except cv2.error as cvt_err:
-                #     print(f"[video player] Reader: Error converting frame to RGB: {cvt_err}. Sending BGR.")
-                #     processed_frame_rgb = processed_frame # Send original BGR if conversion fails
+                slot.pts = frame_index * self.frame_time
+                frame_index += 1
 
                 # --- Put Frame in Queue ---
                 try:
-                    # Send the original BGR frame
-                    self.frame_queue.put(processed_frame, block=True, timeout=1.0)
+                    # Hand the BGR frame slot to the player
+                    self.frame_queue.put(slot, block=True, timeout=1.0)
                     processed_frame_count += 1
                 except queue.Full:
+                    slot.release()
                     print("[video player] Reader: Frame queue full. Player might be lagging or stopped.", flush=True)
                 except Exception as q_err:
+                     slot.release()
                      print(f"[video player] Reader: Error putting frame in queue: {q_err}", flush=True)
                      self.should_stop = True # Signal stop on queue error
 
@@ -206,10 +614,10 @@ class VideoPlayer:
             self.should_stop = True
         finally:
             print("[video player] Reader thread cleaning up...", flush=True)
-            if cap and cap.isOpened():
-                print("[video player] Releasing video capture...", flush=True)
-                cap.release()
-                print("[video player] Reader: Released video capture.", flush=True)
+            if source:
+                print("[video player] Closing frame source...", flush=True)
+                source.close()
+                print("[video player] Reader: Closed frame source.", flush=True)
 
             if self.frame_queue:
                  try:
@@ -229,7 +637,7 @@ class VideoPlayer:
             print("[video player] Reader thread finished.", flush=True)
 
 
-    def _player_thread_func(self, audio_path):
+    def _player_thread_func(self, audio_path, warm=None):
         """
         Takes frames from the queue, handles timing/sync, plays audio,
         and calls the frame update callback.
@@ -238,9 +646,10 @@ class VideoPlayer:
         """
         print("[video player] Player thread starting.", flush=True)
         frame_count = 0
-        playback_start_perf_counter = -1.0 # Initialize later
         audio_started = False
         got_first_frame = False
+        current_frame = None
+        frame_is_new = False
 
         try:
             # --- Wait for the first frame ---
@@ -252,7 +661,7 @@ class VideoPlayer:
                 self.playback_complete = True
                 return
 
-            print(f"[video player] Player: Received first frame (resolution: {first_frame.shape[1]}x{first_frame.shape[0]}). Frame Time: {self.frame_time:.4f}s")
+            print(f"[video player] Player: Received first frame (resolution: {first_frame.array.shape[1]}x{first_frame.array.shape[0]}). Frame Time: {self.frame_time:.4f}s")
             got_first_frame = True
 
             # --- Audio Playback ---
@@ -261,6 +670,8 @@ class VideoPlayer:
                     # Initialize mixer here to ensure it's ready before use
                     desired_freq = 44100
                     init_params = mixer.get_init() # Check current status
+                    # Audio staged by preload() is only valid if the mixer is not re-initialized
+                    staged_sound = warm['sound'] if warm and warm['audio_path'] == audio_path else None
 
                     if not init_params:
                         print(f"[video player] Player: Initializing Pygame mixer (Freq: {desired_freq})...")
@@ -270,11 +681,12 @@ class VideoPlayer:
                         print(f"[video player] Player: Re-initializing Pygame mixer. Current freq: {init_params[0]}, Target: {desired_freq}")
                         mixer.quit()
                         mixer.init(frequency=desired_freq)
+                        staged_sound = None
                     # else: # Already initialized with the correct frequency
                     #    print(f"[video player] Player: Mixer already initialized with correct frequency ({desired_freq}).")
 
 
-                    video_sound = mixer.Sound(audio_path)
+                    video_sound = staged_sound if staged_sound is not None else mixer.Sound(audio_path)
                     self.video_sound_channel.play(video_sound)
                     audio_started = True
                     print("[video player] Player: Started audio playback.")
@@ -286,10 +698,19 @@ class VideoPlayer:
             else:
                 print("[video player] Player: No valid audio path or file missing.")
 
-            # --- Start Playback Timing ---
-            playback_start_perf_counter = time.perf_counter()
-            # Initialize the expected display time for the *first* frame
-            expected_display_time = playback_start_perf_counter
+            # --- Start Playback Clock ---
+            # Audio is the master: each frame is shown when the clock reaches its pts,
+            # dropped when it has fallen too far behind, and held back while it is early.
+            audio_latency = 0.0
+            if audio_started and not hasattr(self.video_sound_channel, 'get_position'):
+                init_params = mixer.get_init()
+                if init_params:
+                    audio_latency = self.AUDIO_BUFFER_SAMPLES / float(init_params[0])
+            clock = PlaybackClock(self.video_sound_channel if audio_started else None, audio_latency)
+            stats = self.playback_stats
+            stats['clock'] = clock.source
+            drop_threshold = self.frame_time * self.DROP_THRESHOLD_FRAMES
+            print(f"[video player] Player: Syncing to {clock.source} clock (output latency {audio_latency * 1000:.0f} ms).")
 
             # --- Pre-Loop Checks ---
             # Check callback existence once before the loop
@@ -301,69 +722,67 @@ class VideoPlayer:
 
             # --- Playback Loop ---
             current_frame = first_frame
+            frame_is_new = True # current_frame has not been handed to the display yet
+            hold_counted = False # Whether the wait for current_frame was already counted as repeats
             while True: # Loop until sentinel or stop signal
                 if self.should_stop:
                     print("[video player] Player: Stop flag detected. Breaking loop.")
                     break
 
                 # --- Process Current Frame ---
-                if current_frame is not None:
-                    try:
-                        # Frame is RGB numpy array (potentially original size if < target)
-                        if callback_exists:
-                            # The callback function is responsible for any necessary
-                            # display scaling if current_frame dimensions != screen dimensions
-                            self.frame_update_callback(current_frame)
-                        # No 'else' needed here because we checked existence before the loop
-                        frame_count += 1
-                    except Exception as frame_err:
-                         # Check for the specific Qt object deleted error during shutdown
-                         # This often happens if the main GUI closes while the thread is still sending frames
-                         err_str = str(frame_err).lower()
-                         if "c++ object" in err_str and "deleted" in err_str:
-                             if not self.should_stop: # Only log if not already stopping
-                                 print(f"[video player] Player: GUI object likely deleted during shutdown. Stopping. (Error: {frame_err})")
-                             self.should_stop = True # Ensure loop terminates
-                             break # Exit loop immediately
-                         else:
-                            print(f"[video player] Player: Error processing/sending frame {frame_count}: {frame_err}")
-                            # Decide if we should stop on other frame errors too
-                            # self.should_stop = True
-
-
-                # --- Timing Calculation ---
-                # Increment expected time for the *next* frame BEFORE getting current time
-                expected_display_time += self.frame_time
-                current_time = time.perf_counter()
-                time_until_next_frame = expected_display_time - current_time
+                # Only new frames are sent: the display keeps showing (and owning) the last one
+                if current_frame is not None and frame_is_new:
+                    drift = clock.position() - current_frame.pts # Positive when the frame is late
+                    if drift < -0.002:
+                        # Video is ahead of the clock: the previous frame stays up until this one is due
+                        if not hold_counted:
+                            stats['repeated_frames'] += int(-drift / self.frame_time)
+                            hold_counted = True
+                        time.sleep(min(-drift, self.MAX_CLOCK_WAIT))
+                        continue
+
+                    frame_is_new = False
+                    stats['max_drift_ms'] = max(stats['max_drift_ms'], abs(drift) * 1000.0)
+                    if drift > drop_threshold and not self.frame_queue.empty():
+                        # Too far behind and a newer frame is ready: skip this one to catch up
+                        current_frame.release()
+                        current_frame = None
+                        stats['dropped_frames'] += 1
+                    else:
+                        if drift > self.frame_time:
+                            stats['late_frames'] += 1
+                        try:
+                            # Frame is a FrameSlot holding a BGR array (potentially original size if < target)
+                            if callback_exists:
+                                # The callback takes ownership of the slot and is responsible for any
+                                # display scaling if current_frame dimensions != screen dimensions
+                                self.frame_update_callback(current_frame)
+                            else:
+                                current_frame.release()
+                            frame_count += 1
+                            stats['frames_shown'] += 1
+                        except Exception as frame_err:
+                             # Check for the specific Qt object deleted error during shutdown
+                             # This often happens if the main GUI closes while the thread is still sending frames
+                             err_str = str(frame_err).lower()
+                             if "c++ object" in err_str and "deleted" in err_str:
+                                 if not self.should_stop: # Only log if not already stopping
+                                     print(f"[video player] Player: GUI object likely deleted during shutdown. Stopping. (Error: {frame_err})")
+                                 self.should_stop = True # Ensure loop terminates
+                                 break # Exit loop immediately
+                             else:
+                                print(f"[video player] Player: Error processing/sending frame {frame_count}: {frame_err}")
+                                # Decide if we should stop on other frame errors too
+                                # self.should_stop = True
 
                 # --- Get Next Frame (or wait) ---
                 next_frame = None
-                get_timeout = self.frame_time # Default timeout if not sleeping
-
                 try:
-                    # --- Sleep if ahead --- 
-                    if time_until_next_frame > 0.002:
-                        sleep_duration = max(0, time_until_next_frame - 0.002)
-                        time.sleep(sleep_duration)
-                        # Use a shorter timeout after sleeping, e.g., 80% of frame time
-                        get_timeout = self.frame_time * 0.8
-                    # If not ahead (time_until_next_frame <= 0.002), 
-                    # get_timeout remains self.frame_time
-                    
-                    # --- Always block with timeout --- 
-                    # Ensure timeout is minimally positive
-                    effective_timeout = max(0.001, get_timeout)
-                    next_frame = self.frame_queue.get(block=True, timeout=effective_timeout)
-
+                    # Block for at most one frame time; the loop re-checks the clock either way
+                    next_frame = self.frame_queue.get(block=True, timeout=max(0.001, self.frame_time))
                 except queue.Empty:
                     # Timeout occurred. This is expected if the reader lags or finishes.
-                    # Only log if we were significantly behind schedule, maybe?
-                    if time_until_next_frame < -0.1: # Log if more than 100ms behind
-                         lag_time = -time_until_next_frame
-                         # print(f"[video player] Player: Lag detected ({lag_time:.3f}s), queue empty on get({effective_timeout:.3f}s timeout).")
-                    # No need to do anything else here, next_frame remains None,
-                    # the loop continues, effectively displaying the previous frame.
+                    # next_frame remains None and the previous frame stays on screen.
                     pass
                 except Exception as q_err:
                      print(f"[video player] Player: Error getting frame from queue: {q_err}")
@@ -398,6 +817,8 @@ class VideoPlayer:
                 # Only update current_frame if we actually got a new one
                 if next_frame is not None:
                     current_frame = next_frame
+                    frame_is_new = True
+                    hold_counted = False
                 # If next_frame was None (due to timeout/lag), current_frame remains the same,
                 # effectively displaying the previous frame again while waiting.
 
@@ -411,7 +832,11 @@ class VideoPlayer:
             self.playback_complete = False # Mark as abnormal completion
         finally:
             print("[video player][PLAYER_FINALLY_1] Entering player thread finally block.")
+            if got_first_frame and frame_is_new and current_frame is not None:
+                current_frame.release() # Fetched but never handed to the display
             print(f"[video player] Player thread cleaning up... (Processed approx {frame_count} frames)")
+            stats = self.playback_stats
+            print(f"[video player] Player: Sync stats ({stats['clock']} clock): {stats['frames_shown']} shown, {stats['dropped_frames']} dropped, {stats['late_frames']} late, {stats['repeated_frames']} repeated, max drift {stats['max_drift_ms']:.1f} ms")
             if not got_first_frame:
                  print("[video player] Player: Never received the first frame.")
                  # Ensure state reflects this wasn't a normal completion if we expected playback
@@ -580,6 +1005,9 @@ class VideoPlayer:
         self.source_width = 0
         self.source_height = 0
         self.frame_queue = queue.Queue(maxsize=self.FRAME_QUEUE_SIZE)
+        self.frame_ring = None
+        self.playback_stats = self._new_playback_stats()
+        warm = self._take_preload(video_path)
 
         self.frame_update_callback = frame_update_cb
         self.on_complete_callback = on_complete_cb
@@ -589,13 +1017,13 @@ class VideoPlayer:
         # --- Start Threads ---
         self.video_reader_thread = threading.Thread(
             target=self._reader_thread_func,
-            args=(video_path,),
+            args=(video_path, warm),
             daemon=True,
             name=f"VideoReader-{os.path.basename(video_path)}"
         )
         self.video_player_thread = threading.Thread(
             target=self._player_thread_func,
-            args=(audio_path,),
+            args=(audio_path, warm),
             daemon=True,
             name=f"VideoPlayer-{os.path.basename(video_path)}"
         )
@@ -638,7 +1066,9 @@ class VideoPlayer:
             try:
                 while not self.frame_queue.empty():
                     try:
-                        self.frame_queue.get_nowait()
+                        slot = self.frame_queue.get_nowait()
+                        if slot is not None:
+                            slot.release()
                         drained_count += 1
                     except queue.Empty:
                         break
@@ -702,7 +1132,10 @@ class VideoPlayer:
         if self.frame_queue:
             try:
                 while not self.frame_queue.empty():
-                    try: self.frame_queue.get_nowait()
+                    try:
+                        slot = self.frame_queue.get_nowait()
+                        if slot is not None:
+                            slot.release()
                     except queue.Empty: break
                 self.frame_queue.put(None, block=False)
                 print("[video player][FORCE_STOP] Frame queue drained and sentinel added.", flush=True)
@@ -740,6 +1173,7 @@ class VideoPlayer:
         self.video_reader_thread = None
         self.video_player_thread = None
         self.frame_queue = None
+        self.frame_ring = None
         self.on_complete_callback = None
         self.frame_update_callback = None
         self.needs_resizing = False
@@ -761,9 +1195,11 @@ class VideoPlayer:
 
     # --- _cleanup_resources --- (No changes needed here)
     def _cleanup_resources(self):
-        """Clean up temporary audio files."""
+        """Clean up the temporary audio file, and a preload only if it staged that file."""
         audio_to_remove = self.current_audio_path
         self.current_audio_path = None
+        if audio_to_remove and self._warm is not None and self._warm['audio_path'] == audio_to_remove:
+            self.release_preload()
         self._safe_remove(audio_to_remove)
 
 
@@ -779,6 +1215,7 @@ class VideoPlayer:
                  self.is_playing = False # Assume stopped immediately for cleanup logic
                  # Don't join threads in __del__
 
+            self.release_preload()
             self._cleanup_resources()
 
             temp_dir_to_remove = getattr(self, 'temp_dir', None)
@@ -795,4 +1232,100 @@ class VideoPlayer:
             # Make sure mixer is quit *if* this instance initialized it and nothing else needs it
             # This is tricky - safer to leave mixer management outside the player instance
             # Or use a shared initialization counter. For now, leave it.
-            pass
\ No newline at end of file
+            pass
+
+def child_cpu_seconds():
+    """
+    CPU seconds used by this process's children that have exited and been waited
+    for, such as closed ffmpeg decoders. None on Windows, which doesn't report them.
+    """
+    if os.name == 'nt':
+        return None
+    times = os.times()
+    return times.children_user + times.children_system
+
+def _process_cpu_seconds(process):
+    """CPU seconds of a running subprocess via psutil, or None if psutil isn't installed."""
+    try:
+        import psutil
+        times = psutil.Process(process.pid).cpu_times()
+        return times.user + times.system
+    except Exception:
+        return None
+
+def benchmark_decoder(video_path, decoder, target_width=1920, target_height=1080, ffmpeg_path=None, max_frames=None):
+    """
+    Decodes a video as fast as possible with one backend and returns timing stats.
+    cpu_seconds includes the ffmpeg child process; it is None when the child's
+    CPU can't be measured (Windows without psutil).
+    """
+    if decoder == 'ffmpeg':
+        source = FfmpegFrameSource(video_path, target_width, target_height, ffmpeg_path or imageio_ffmpeg.get_ffmpeg_exe())
+    else:
+        source = Cv2FrameSource(video_path, target_width, target_height)
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    child_start = child_cpu_seconds()
+    child_cpu = 0.0 if decoder != 'ffmpeg' else None
+    frames = 0
+    first_frame_ms = None
+    try:
+        if not source.open():
+            return None
+        ring = FrameRing(source.output_width, source.output_height, 1)
+        slot = ring.acquire()
+        while max_frames is None or frames < max_frames:
+            if not source.read_into(slot):
+                break
+            frames += 1
+            if first_frame_ms is None:
+                first_frame_ms = (time.perf_counter() - wall_start) * 1000
+    finally:
+        if child_start is None and decoder == 'ffmpeg' and source.process is not None:
+            child_cpu = _process_cpu_seconds(source.process) # Read before close() kills it
+        source.close()
+
+    wall = time.perf_counter() - wall_start
+    # process_time() excludes the ffmpeg child process; it is counted once close() has reaped it
+    cpu = time.process_time() - cpu_start
+    if child_start is not None:
+        child_cpu = child_cpu_seconds() - child_start
+    return {
+        'decoder': decoder,
+        'frames': frames,
+        'seconds': wall,
+        'fps': frames / wall if wall > 0 else 0.0,
+        'first_frame_ms': first_frame_ms or 0.0,
+        'python_cpu_seconds': cpu,
+        'child_cpu_seconds': child_cpu,
+        'cpu_seconds': cpu + child_cpu if child_cpu is not None else None,
+        'video_fps': source.frame_rate,
+        'source_size': f"{source.source_width}x{source.source_height}",
+    }
+
+def _format_seconds(seconds):
+    return f"{seconds:.2f}s" if seconds is not None else "n/a"
+
+if __name__ == "__main__":
+    # Compare decoder backends: python video_player.py <video> [<video> ...] [--width W --height H --frames N]
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark VideoPlayer decoder backends")
+    parser.add_argument("videos", nargs="+")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--frames", type=int, default=None, help="Stop after this many frames")
+    args = parser.parse_args()
+
+    for video in args.videos:
+        print(f"\n=== {video} -> {args.width}x{args.height} ===")
+        for backend in VideoPlayer.DECODERS:
+            stats = benchmark_decoder(video, backend, args.width, args.height, max_frames=args.frames)
+            if stats is None:
+                print(f"{backend:>7}: failed to open")
+                continue
+            realtime = stats['fps'] / stats['video_fps'] if stats['video_fps'] else 0
+            print(f"{backend:>7}: {stats['frames']} frames in {stats['seconds']:.2f}s = {stats['fps']:.1f} fps "
+                  f"({realtime:.1f}x realtime), first frame {stats['first_frame_ms']:.0f} ms, "
+                  f"CPU {_format_seconds(stats['cpu_seconds'])} (python {stats['python_cpu_seconds']:.2f}s, "
+                  f"ffmpeg {_format_seconds(stats['child_cpu_seconds'])}), source {stats['source_size']}")
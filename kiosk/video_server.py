@@ -19,6 +19,37 @@ import time
 print("[video server] Imported time.", flush=True)
 print("[video server] Ending imports ...", flush=True)
 
+# A zero-length frame tells the client the scene is unchanged and the link is alive
+UNCHANGED_MARKER = struct.pack("Q", 0)
+
+class FrameChangeDetector:
+    """Cheap scene-change test on a downsampled grayscale copy of each frame"""
+    def __init__(self, threshold=4.0, pixel_delta=12, size=(64, 48)):
+        self.threshold = threshold  # Percent of thumbnail pixels that must change
+        self.pixel_delta = pixel_delta  # Per-pixel grayscale difference treated as change
+        self.size = size
+        self.reference = None
+
+    def _thumbnail(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, self.size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def has_changed(self, frame):
+        """Returns True if the frame differs meaningfully from the last accepted one"""
+        thumb = self._thumbnail(frame)
+        if self.reference is None:
+            self.reference = thumb
+            return True
+        changed = np.count_nonzero(np.abs(thumb - self.reference) > self.pixel_delta)
+        if changed * 100.0 / thumb.size >= self.threshold:
+            self.reference = thumb
+            return True
+        return False
+
+    def accept(self, frame):
+        """Makes this frame the new comparison reference (used for keepalive frames)"""
+        self.reference = self._thumbnail(frame)
+
 class VideoServer:
     DEBUG = False
     def __init__(self, port=8089):
@@ -29,6 +60,9 @@ class VideoServer:
         self.clients_lock = threading.Lock()  # Lock for thread-safe client management
         self.fps_limit = 15
         self.frame_time = 1/self.fps_limit
+        self.skip_unchanged = True  # Skip encoding frames when the scene is static
+        self.keepalive_interval = 5.0  # Send a full frame at least this often (seconds)
+        self.marker_interval = 1.0  # Minimum spacing of "unchanged" markers (seconds)
         self.camera = None
         self.camera_lock = threading.Lock()  # Lock for camera access
 
@@ -163,6 +197,11 @@ class VideoServer:
         """Streams video to a single client"""
         print(f"[video server]Starting video stream to {addr}", flush=True)
         client.settimeout(2.0)  # Add a timeout to the client socket
+        detector = FrameChangeDetector()
+        last_frame_sent = 0
+        last_marker_sent = 0
+        frames_sent = 0
+        frames_skipped = 0
         try:
             while self.running:
                 with self.camera_lock:
@@ -180,6 +219,21 @@ class VideoServer:
                     if(self.DEBUG): print("[video server] Frame captured.", flush=True)
 
                 if ret:
+                    now = time.time()
+                    if self.skip_unchanged:
+                        if now - last_frame_sent >= self.keepalive_interval:
+                            detector.accept(frame)
+                        elif not detector.has_changed(frame):
+                            frames_skipped += 1
+                            if now - last_marker_sent >= self.marker_interval:
+                                try:
+                                    client.sendall(UNCHANGED_MARKER)
+                                    last_marker_sent = now
+                                except (socket.timeout, socket.error) as e:
+                                    if(self.DEBUG): print(f"[video server]Client {addr} marker send failed: {e}", flush=True)
+                                    break
+                            continue
+
                     if(self.DEBUG): print("[video server] Encoding frame...", flush=True)
                     encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), 60]
                     _, buffer = cv2.imencode('.jpg', frame, encode_param)
@@ -191,6 +245,9 @@ class VideoServer:
                         if(self.DEBUG): print("[video server] Sending frame data...", flush=True)
                         client.sendall(buffer)
                         if(self.DEBUG): print("[video server] Frame sent successfully.", flush=True)
+                        last_frame_sent = now
+                        last_marker_sent = now
+                        frames_sent += 1
                     except socket.timeout: # Catch Timeout
                         if(self.DEBUG): print(f"[video server] Client {addr} sendall timeout", flush=True)
                         break
@@ -204,7 +261,7 @@ class VideoServer:
         except Exception as e:
             print(f"[video server]Streaming error to {addr}: {e}", flush=True)
         finally:
-            print(f"[video server]Closing video stream to {addr}", flush=True)
+            print(f"[video server]Closing video stream to {addr} (sent {frames_sent} frames, skipped {frames_skipped} unchanged)", flush=True)
             try:
                 client.close()
             except: